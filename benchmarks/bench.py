@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Benchmarks of the corba recoders and client.
+
+Run the benchmarks and store the results:
+
+    python benchmarks/bench.py --output results.json
+
+Compare the results with a baseline, exits with non-zero status if any benchmark is slower than the threshold:
+
+    python benchmarks/bench.py --compare baseline.json --threshold 1.2
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from datetime import datetime
+
+from fred_idl.Registry import IsoDate, IsoDateTime
+from mock import sentinel
+
+import pyfco
+from pyfco.client import CorbaClient
+from pyfco.recoder import CorbaRecoder, IterativeCorbaRecoder, decode_iso_date, decode_iso_datetime
+from pyfco.tests.test_recoder import NodeStruct, SampleCorbaStruct
+
+BENCHMARKS = []
+
+
+def benchmark(function):
+    """Register benchmark - function which returns a callable to be timed."""
+    BENCHMARKS.append(function)
+    return function
+
+
+def _make_row(index):
+    return SampleCorbaStruct(
+        id=index, ico=b'', dic=b'', varSymb=b'', vat=False, handle=b'REG-' + str(index).encode(), name=b'Name',
+        organization=b'Organization', street1=b'Street \xc4\x8d\xc5\xa5', street2=b'', street3=b'', city=b'City',
+        stateorprovince=b'', postalcode=b'12300', country=b'CZ', telephone=b'+420.123456789', fax=b'',
+        email=b'registrar@example.org', url=b'https://example.org/', credit=b'0.00', unspec_credit=b'0.00',
+        access=[], zones=[b'cz', b'0.2.4.e164.arpa'], hidden=False)
+
+
+def _make_rows(count):
+    return [_make_row(i) for i in range(count)]
+
+
+def _make_deep(depth):
+    value = None
+    for i in range(depth):
+        value = NodeStruct(b'node', [value])
+    return value
+
+
+def _make_timestamp_rows(count):
+    return [(IsoDate('2020-02-{:02d}'.format(i % 28 + 1)),
+             IsoDateTime('2020-02-{:02d}T12:14:{:02d}.123456+01:00'.format(i % 28 + 1, i % 60)))
+            for i in range(count)]
+
+
+RECODERS = (('recursive', CorbaRecoder), ('iterative', IterativeCorbaRecoder))
+
+
+def _register_recoder_benchmarks(name, recoder_class):
+    @benchmark
+    def decode_wide():
+        """Decode 10^4 wide structures."""
+        recoder = recoder_class('utf-8')
+        rows = _make_rows(10000)
+        return lambda: recoder.decode(rows)
+
+    @benchmark
+    def encode_wide():
+        """Encode 10^4 wide structures."""
+        recoder = recoder_class('utf-8')
+        rows = recoder.decode(_make_rows(10000))
+        return lambda: recoder.encode(rows)
+
+    @benchmark
+    def roundtrip_wide():
+        """Decode and encode 10^4 wide structures."""
+        recoder = recoder_class('utf-8')
+        rows = _make_rows(10000)
+        return lambda: recoder.encode(recoder.decode(rows))
+
+    @benchmark
+    def decode_deep():
+        """Decode 100 structures nested 100 levels deep."""
+        recoder = recoder_class('utf-8')
+        values = [_make_deep(100) for i in range(100)]
+        return lambda: recoder.decode(values)
+
+    @benchmark
+    def decode_sequence():
+        """Decode sequence of 10^5 strings."""
+        recoder = recoder_class('utf-8')
+        values = [b'value'] * 100000
+        return lambda: recoder.decode(values)
+
+    @benchmark
+    def decode_timestamps():
+        """Decode 10^4 rows of dates and date times."""
+        recoder = recoder_class('utf-8', iso_dates=True)
+        values = _make_timestamp_rows(10000)
+        return lambda: recoder.decode(values)
+
+    @benchmark
+    def decode_timestamps_memo():
+        """Decode 10^4 rows of dates and date times with memo."""
+        recoder = recoder_class('utf-8', iso_dates=True, iso_dates_memo=1024)
+        values = _make_timestamp_rows(10000)
+        return lambda: recoder.decode(values)
+
+    for function in BENCHMARKS[-7:]:
+        function.__name__ = '{}.{}'.format(name, function.__name__)
+
+
+for _name, _recoder_class in RECODERS:
+    _register_recoder_benchmarks(_name, _recoder_class)
+
+
+@benchmark
+def decode_iso_date_function():
+    """Decode 10^4 dates by `decode_iso_date`."""
+    values = [IsoDate('2020-02-{:02d}'.format(i % 28 + 1)) for i in range(10000)]
+    return lambda: [decode_iso_date(v) for v in values]
+
+
+@benchmark
+def decode_iso_datetime_function():
+    """Decode 10^4 date times by `decode_iso_datetime`."""
+    values = [IsoDateTime('2020-02-{:02d}T12:14:16.123456Z'.format(i % 28 + 1)) for i in range(10000)]
+    return lambda: [decode_iso_datetime(v) for v in values]
+
+
+class _Stub(object):
+    """Local stub of the corba object."""
+
+    def method(self, *args):
+        return sentinel.result
+
+    def get_rows(self):
+        return self.rows
+
+
+@benchmark
+def client_call():
+    """Perform 10^4 calls of a local stub."""
+    recoder = CorbaRecoder('utf-8')
+    recoder.add_recode_function(type(sentinel.result), recoder._identity, recoder._identity)
+    client = CorbaClient(_Stub(), recoder)
+
+    def run():
+        for i in range(10000):
+            client.method(b'argument', i)
+    return run
+
+
+@benchmark
+def client_call_rows():
+    """Perform a call of a local stub returning 10^4 wide structures."""
+    stub = _Stub()
+    stub.rows = _make_rows(10000)
+    client = CorbaClient(stub, CorbaRecoder('utf-8'))
+    return client.get_rows
+
+
+def run(names=None, repeat=5):
+    """Run benchmarks and return their results."""
+    results = {}
+    for function in BENCHMARKS:
+        name = function.__name__
+        if names and not any(n in name for n in names):
+            continue
+        timer = timeit.Timer(function())
+        times = sorted(timer.repeat(repeat=repeat, number=1))
+        results[name] = {'min': times[0], 'median': times[len(times) // 2], 'max': times[-1], 'repeat': repeat}
+        print('{:<45} {:>10.6f} {:>10.6f}'.format(name, times[0], results[name]['median']))
+    return {'python': sys.version.split()[0], 'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'pyfco': pyfco.__version__,
+            'created': datetime.utcnow().isoformat(), 'results': results}
+
+
+def compare(results, baseline, threshold):
+    """Print comparison of the results with the baseline and return names of the regressed benchmarks."""
+    regressions = []
+    for name, result in sorted(results['results'].items()):
+        if name not in baseline['results']:
+            continue
+        ratio = result['min'] / baseline['results'][name]['min']
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = ' REGRESSION'
+        baseline_min = baseline['results'][name]['min']
+        print('{:<45} {:>10.6f} {:>10.6f} {:>8.2f}x{}'.format(name, baseline_min, result['min'], ratio, flag))
+    return regressions
+
+
+def main(args=None):
+    """Run benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', help='run only benchmarks which contain any of the names')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions of each benchmark')
+    parser.add_argument('--output', help='store results to the JSON file')
+    parser.add_argument('--compare', help='compare results with the JSON file')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='ratio to the baseline considered to be a regression')
+    options = parser.parse_args(args)
+
+    print('{:<45} {:>10} {:>10}'.format('benchmark', 'min', 'median'))
+    results = run(options.names, options.repeat)
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print()
+        print('{:<45} {:>10} {:>10} {:>9}'.format('benchmark', 'baseline', 'current', 'ratio'))
+        if compare(results, baseline, options.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,7 +20,8 @@ from __future__ import unicode_literals
 
 from .client import CorbaClient, CorbaClientProxy
 from .name_service import CorbaNameServiceClient
-from .recoder import CorbaRecoder, c2u, u2c
+from .recoder import CorbaRecoder, IterativeCorbaRecoder, c2u, u2c
 
 __version__ = '1.16.3'
-__all__ = ['CorbaClient', 'CorbaClientProxy', 'CorbaNameServiceClient', 'CorbaRecoder', 'c2u', 'u2c']
+__all__ = ['CorbaClient', 'CorbaClientProxy', 'CorbaNameServiceClient', 'CorbaRecoder', 'IterativeCorbaRecoder', 'c2u',
+           'u2c']
@@ -0,0 +1,148 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Asyncio corba client.
+
+This module requires python 3.5 or newer.
+"""
+from __future__ import unicode_literals
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import CorbaClientProxy
+
+_DEFAULT = object()
+
+
+class AsyncCorbaClient(object):
+    """Asyncio corba client - wrapper over `CorbaClient` which returns awaitables.
+
+    Corba calls are performed in an executor, so they don't block the event loop.
+    Timed out calls are no longer awaited, but they still occupy a worker of the executor and a slot
+    of `max_concurrency` until they finish.
+
+    @ivar client: Corba client which performs the calls.
+    @type client: `CorbaClient`
+    @ivar executor: Executor for the Corba calls.
+    @type executor: `concurrent.futures.Executor`
+    @ivar timeout: Default timeout of the Corba calls in seconds, `None` means no timeout.
+    @type timeout: `float` or `None`
+    @ivar decode_in_executor: Whether to decode results in the executor as well.
+    @type decode_in_executor: `bool`
+    """
+
+    def __init__(self, client, executor=None, max_workers=10, timeout=None, max_concurrency=None,
+                 decode_in_executor=False):
+        """Initialize instance.
+
+        @param client: Corba client which performs the calls.
+        @type client: `CorbaClient`
+        @param executor: Executor for the Corba calls. If not provided, a dedicated thread pool is created.
+        @type executor: `concurrent.futures.Executor`
+        @param max_workers: Number of workers of the dedicated thread pool.
+        @type max_workers: `int`
+        @param timeout: Default timeout of the Corba calls in seconds, `None` means no timeout.
+        @type timeout: `float` or `None`
+        @param max_concurrency: Maximal number of Corba calls performed at once, `None` means no limit.
+        @type max_concurrency: `int` or `None`
+        @param decode_in_executor: Whether to decode results in the executor as well.
+        @type decode_in_executor: `bool`
+        """
+        self.client = client
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers)
+        self.executor = executor
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.decode_in_executor = decode_in_executor
+        # Semaphore is created on the first call, so it's bound to the running loop.
+        self._semaphore = None
+
+    def close(self):
+        """Shutdown the dedicated executor."""
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
+
+    async def _run(self, function):
+        """Run the function in the executor and return its result."""
+        loop = asyncio.get_event_loop()
+        if self.max_concurrency is None:
+            return await loop.run_in_executor(self.executor, function)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
+        await semaphore.acquire()
+        try:
+            future = loop.run_in_executor(self.executor, function)
+        except BaseException:
+            semaphore.release()
+            raise
+        # Slot is released once the call actually finishes, even if it's no longer awaited, e.g. after timeout.
+        future.add_done_callback(lambda future: semaphore.release())
+        return await asyncio.shield(future)
+
+    async def call(self, method, *args, timeout=_DEFAULT):
+        """Perform the Corba call and return its decoded result.
+
+        Decoding is recorded in metrics of the client only if it's performed in the executor.
+        Results of cached and coalesced methods are always decoded in the executor.
+
+        @param timeout: Timeout of the Corba call in seconds, `None` means no timeout.
+            If not provided, default timeout is used.
+        @raise asyncio.TimeoutError: If the call times out.
+        """
+        if timeout is _DEFAULT:
+            timeout = self.timeout
+        client = self.client
+        encoded_args, encode_time = client._encode(method, args)
+        if self.decode_in_executor or client._is_shared(method):
+            # Results of cached and coalesced methods are always decoded in the executor.
+            dispatch = functools.partial(client._dispatch, method, args, encoded_args, encode_time, client.lazy)
+            return await asyncio.wait_for(self._run(dispatch), timeout)
+        perform = functools.partial(client._perform, method, args, encoded_args, encode_time, decode=False)
+        result = await asyncio.wait_for(self._run(perform), timeout)
+        return client._decode(result, client.lazy)
+
+    def __getattr__(self, name):
+        """Publish CORBA object methods.
+
+        Wrappers are stored in the instance, so they're created only once for each method.
+
+        @raise AttributeError: If the Corba object doesn't have the method.
+        """
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        corba_object = self.client.corba_object
+        if not hasattr(corba_object, name):
+            raise AttributeError("Corba object {!r} has no method {!r}".format(corba_object, name))
+
+        def wrapper(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+        wrapper.__name__ = str(name)
+        self.__dict__[name] = wrapper
+        return wrapper
+
+
+class AsyncCorbaClientProxy(CorbaClientProxy):
+    """Proxy for asyncio Corba client instance.
+
+    @ivar client: Asyncio Corba client instance
+    @type client: `AsyncCorbaClient`
+    """
@@ -0,0 +1,316 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Load balancing of corba objects over several naming services and replicas."""
+from __future__ import unicode_literals
+
+import itertools
+import logging
+import threading
+
+from omniORB import CORBA
+
+from .name_service import CorbaNameServiceClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Strategies
+ROUND_ROBIN = 'round_robin'
+LEAST_OUTSTANDING = 'least_outstanding'
+
+
+class _Replica(object):
+    """Replica of the corba object.
+
+    @ivar obj: Corba object.
+    @ivar outstanding: Number of calls in progress.
+    @ivar healthy: Whether the replica is considered healthy.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.outstanding = 0
+        self.healthy = True
+
+    def __repr__(self):
+        return '<_Replica {!r} outstanding={} healthy={}>'.format(self.obj, self.outstanding, self.healthy)
+
+
+class BalancedObject(object):
+    """Corba object which distributes calls over several replicas.
+
+    Calls which fail with TRANSIENT error are repeated on the other replicas and the failed replica is considered
+    unhealthy. Unhealthy replicas are used only if there is no healthy one.
+    Replicas are considered healthy again once a call or a health check succeeds.
+
+    @ivar replicas: Replicas of the corba object.
+    @type replicas: [`_Replica`, ...]
+    @ivar strategy: Strategy of the replica selection, `ROUND_ROBIN` or `LEAST_OUTSTANDING`.
+    """
+
+    def __init__(self, objects, strategy=ROUND_ROBIN):
+        """Initialize instance.
+
+        @param objects: Replicas of the corba object.
+        @param strategy: Strategy of the replica selection, `ROUND_ROBIN` or `LEAST_OUTSTANDING`.
+        """
+        if not objects:
+            raise ValueError("At least one replica is required.")
+        if strategy not in (ROUND_ROBIN, LEAST_OUTSTANDING):
+            raise ValueError("Unknown strategy {!r}.".format(strategy))
+        self.replicas = [_Replica(obj) for obj in objects]
+        self.strategy = strategy
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add_replica(self, obj):
+        """Add replica of the corba object.
+
+        @param obj: Replica of the corba object.
+        @return: The added replica.
+        @rtype: `_Replica`
+        """
+        replica = _Replica(obj)
+        with self._lock:
+            # Replace the list, so it may be iterated without the lock.
+            self.replicas = self.replicas + [replica]
+        return replica
+
+    def replace_replica(self, replica, obj):
+        """Replace replica by other corba object, e.g. resolved again after restart of the server.
+
+        @param replica: Replica to be replaced.
+        @type replica: `_Replica`
+        @param obj: New replica of the corba object.
+        @return: The new replica.
+        @rtype: `_Replica`
+        """
+        new = _Replica(obj)
+        with self._lock:
+            self.replicas = [new if r is replica else r for r in self.replicas]
+        return new
+
+    def _select(self, tried):
+        """Return replica for the next call or `None` if all replicas were tried. Lock must be held."""
+        candidates = [r for r in self.replicas if r.healthy and r not in tried]
+        if not candidates:
+            candidates = [r for r in self.replicas if r not in tried]
+            if not candidates:
+                return None
+        # Rotate the candidates, so the ties are resolved in round robin manner.
+        offset = next(self._counter) % len(candidates)
+        candidates = candidates[offset:] + candidates[:offset]
+        if self.strategy == LEAST_OUTSTANDING:
+            return min(candidates, key=lambda r: r.outstanding)
+        return candidates[0]
+
+    def _invoke(self, method, *args):
+        """Perform the call on a replica, fail over to other replicas on TRANSIENT errors."""
+        tried = []
+        error = None
+        while True:
+            with self._lock:
+                replica = self._select(tried)
+                if replica is None:
+                    # All replicas failed, raise the last error.
+                    raise error
+                replica.outstanding += 1
+            try:
+                result = getattr(replica.obj, method)(*args)
+            except CORBA.TRANSIENT as transient:
+                _LOGGER.warning("%s failed on %r with %s.", method, replica.obj, transient)
+                replica.healthy = False
+                tried.append(replica)
+                error = transient
+            else:
+                replica.healthy = True
+                return result
+            finally:
+                with self._lock:
+                    replica.outstanding -= 1
+
+    def check_health(self):
+        """Check health of the replicas by `_non_existent` calls."""
+        for replica in list(self.replicas):
+            try:
+                healthy = not replica.obj._non_existent()
+            except CORBA.Exception as error:
+                _LOGGER.debug("Health check of %r failed with %s.", replica.obj, error)
+                healthy = False
+            if replica.healthy != healthy:
+                _LOGGER.info("Replica %r is %s.", replica.obj, 'healthy' if healthy else 'unhealthy')
+            replica.healthy = healthy
+
+    def __getattr__(self, name):
+        """Publish methods of the corba object."""
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        # Check the method exists
+        getattr(self.replicas[0].obj, name)
+
+        def method(*args):
+            return self._invoke(name, *args)
+        return method
+
+
+class BalancedNameServiceClient(object):
+    """Name service client which balances corba objects over several naming services and replicas.
+
+    Objects are resolved in all naming services, replicas may be registered under several names.
+    Resolved objects are `BalancedObject` instances, which may be wrapped by `CorbaClient`, including its policies.
+    Replicas which couldn't be resolved or which are unhealthy are resolved again by the health checks
+    and added to or replaced in the balanced objects, e.g. once their server is restarted with a new reference.
+
+    @ivar clients: Name service clients of the naming services.
+    @type clients: [`CorbaNameServiceClient`, ...]
+    @ivar strategy: Strategy of the replica selection, `ROUND_ROBIN` or `LEAST_OUTSTANDING`.
+    """
+
+    def __init__(self, host_ports=('localhost', ), context_name='fred', retries=5, strategy=ROUND_ROBIN):
+        """Initialize instance.
+
+        @param host_ports: Hosts and ports of the naming services. E.g. ['hostname:port', 'other:port'].
+        @param context_name: Context name for CosNaming.NameComponent context.
+        @param retries: Maximal number of retries on error of the naming services.
+        @param strategy: Strategy of the replica selection, `ROUND_ROBIN` or `LEAST_OUTSTANDING`.
+        """
+        self.clients = [CorbaNameServiceClient(host_port, context_name, retries) for host_port in host_ports]
+        self.strategy = strategy
+        # Resolved objects - `(names, idl_object)` => `BalancedObject`
+        self._objects = {}
+        # Sources of the replicas - `(names, idl_object)` => `[(client, name, _Replica or None), ...]`
+        # Replica is `None` if it couldn't be resolved.
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._health_stop = threading.Event()
+
+    def get_object(self, name, idl_object, replicas=()):
+        """Return balanced object, resolve it if necessary.
+
+        @param name: Name of NameComponent object. For example: "Logger"
+        @type name: C{six.text_type}
+        @param idl_object: Module object imported from IDL.
+        @type idl_object: C{classobj instance}
+        @param replicas: Names of other replicas of the object.
+        @type replicas: [C{six.text_type}, ...]
+        @rtype: C{BalancedObject}
+        @raise CORBA.Exception: If no replica could be resolved.
+        """
+        key = ((name, ) + tuple(replicas), idl_object)
+        with self._lock:
+            balanced = self._objects.get(key)
+        if balanced is not None:
+            return balanced
+
+        objects = []
+        sources = []
+        error = None
+        for client in self.clients:
+            for replica_name in key[0]:
+                try:
+                    obj = client.get_object(replica_name, idl_object)
+                except CORBA.Exception as resolve_error:
+                    _LOGGER.warning("Replica %s couldn't be resolved in %s: %s", replica_name, client.host_port,
+                                    resolve_error)
+                    sources.append((client, replica_name, False))
+                    error = resolve_error
+                else:
+                    objects.append(obj)
+                    sources.append((client, replica_name, True))
+        if not objects:
+            raise error
+        balanced = BalancedObject(objects, self.strategy)
+        # Replicas are created in the order of the objects.
+        replicas = iter(balanced.replicas)
+        sources = [(c, n, next(replicas) if resolved else None) for c, n, resolved in sources]
+        with self._lock:
+            if key not in self._objects:
+                self._objects[key] = balanced
+                self._sources[key] = sources
+            return self._objects[key]
+
+    def invalidate(self):
+        """Remove all resolved objects."""
+        with self._lock:
+            self._objects.clear()
+            self._sources.clear()
+
+    def _resolve_replicas(self):
+        """Resolve replicas which couldn't be resolved or which are unhealthy, update the balanced objects."""
+        with self._lock:
+            items = [(key, self._objects[key], list(sources)) for key, sources in self._sources.items()]
+        for key, balanced, sources in items:
+            for index, (client, replica_name, replica) in enumerate(sources):
+                if replica is not None and replica.healthy:
+                    continue
+                try:
+                    obj = client.get_object(replica_name, key[1])
+                except CORBA.Exception as error:
+                    _LOGGER.debug("Replica %s still couldn't be resolved in %s: %s", replica_name, client.host_port,
+                                  error)
+                    continue
+                _LOGGER.info("Replica %s was resolved in %s.", replica_name, client.host_port)
+                with self._lock:
+                    if self._objects.get(key) is not balanced:
+                        # Object was invalidated in the meantime.
+                        break
+                    if replica is None:
+                        replica = balanced.add_replica(obj)
+                    else:
+                        replica = balanced.replace_replica(replica, obj)
+                    self._sources[key][index] = (client, replica_name, replica)
+
+    def check_health(self):
+        """Check health of the replicas of all resolved objects.
+
+        Replicas which couldn't be resolved or which were unhealthy are resolved again before the check.
+        """
+        self._resolve_replicas()
+        with self._lock:
+            objects = list(self._objects.values())
+        for balanced in objects:
+            balanced.check_health()
+
+    def start_health_checks(self, interval=10.0):
+        """Start background thread which periodically checks health of the replicas.
+
+        @param interval: Number of seconds between the health checks.
+        """
+        if self._health_thread is not None:
+            raise RuntimeError("Health checks are already running.")
+        self._health_stop.clear()
+        self._health_thread = threading.Thread(target=self._run_health_checks, args=(interval, ),
+                                               name='pyfco-health-checks')
+        self._health_thread.daemon = True
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        """Stop the background health checks."""
+        if self._health_thread is None:
+            return
+        self._health_stop.set()
+        self._health_thread.join()
+        self._health_thread = None
+
+    def _run_health_checks(self, interval):
+        """Check health of the replicas until stopped."""
+        while not self._health_stop.wait(interval):
+            try:
+                self.check_health()
+            except Exception:
+                _LOGGER.exception("Health check failed.")
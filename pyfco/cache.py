@@ -0,0 +1,281 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Caches of the corba call results."""
+from __future__ import unicode_literals
+
+import copy
+import errno
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from timeit import default_timer
+
+import six
+from omniORB import StructBase
+from six.moves import cPickle as pickle
+
+from .name_service import CacheInfo
+from .pickling import dumps, loads
+from .recoder import _IMMUTABLE_TYPES
+
+
+def get_key(method, encoded_args):
+    """Return cache key of the corba call."""
+    return hashlib.sha1(dumps((method, encoded_args))).hexdigest()
+
+
+def copy_value(value):
+    """Return copy of the decoded value.
+
+    Lists, tuples, dictionaries and corba structures are copied, immutable values are shared.
+    Other values are copied by `copy.deepcopy`.
+    """
+    cls = type(value)
+    if cls in _IMMUTABLE_TYPES:
+        return value
+    elif cls is list:
+        return [copy_value(i) for i in value]
+    elif cls is tuple:
+        return tuple(copy_value(i) for i in value)
+    elif cls is dict:
+        return {k: copy_value(v) for k, v in six.iteritems(value)}
+    elif isinstance(value, StructBase):
+        result = cls.__new__(cls)
+        result.__dict__.update((k, copy_value(v)) for k, v in six.iteritems(value.__dict__))
+        return result
+    else:
+        return copy.deepcopy(value)
+
+
+@six.add_metaclass(ABCMeta)
+class ResponseCache(object):
+    """Base class for caches of the corba call results.
+
+    Subclasses have to implement `get`, `set`, `clear` and `__len__`.
+
+    @ivar ttl: Number of seconds the results are cached for.
+    @type ttl: `float`
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key):
+        """Return copy of the cached result.
+
+        @raise KeyError: If the result isn't cached or it expired.
+        """
+
+    @abstractmethod
+    def set(self, key, value):
+        """Store the result in the cache."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove all results from the cache."""
+
+    @abstractmethod
+    def __len__(self):
+        """Return number of the cached results."""
+
+    def cache_info(self):
+        """Return statistics of the cache.
+
+        @rtype: `CacheInfo`
+        """
+        return CacheInfo(self._hits, self._misses, self._invalidations, len(self))
+
+
+class LruCache(ResponseCache):
+    """In-process cache of the corba call results, least recently used results are dropped.
+
+    Results are copied when they're stored and returned, so callers can't modify the cached results.
+
+    @ivar maxsize: Maximal number of cached results.
+    @type maxsize: `int`
+    @ivar copier: Function which returns copy of the result.
+    """
+
+    def __init__(self, ttl, maxsize=128, copier=copy_value):
+        super(LruCache, self).__init__(ttl)
+        self.maxsize = maxsize
+        self.copier = copier
+        # Cached results - `key` => `(value, expiration)`
+        self._cache = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[1] <= default_timer():
+                if entry is not None:
+                    del self._cache[key]
+                self._misses += 1
+                raise KeyError(key)
+            self._hits += 1
+            # Move the result to the end.
+            del self._cache[key]
+            self._cache[key] = entry
+        return self.copier(entry[0])
+
+    def set(self, key, value):
+        value = self.copier(value)
+        with self._lock:
+            self._cache.pop(key, None)
+            self._cache[key] = (value, default_timer() + self.ttl)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += len(self._cache)
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class FileCache(ResponseCache):
+    """Cache of the corba call results in files, which may be shared by several processes.
+
+    Results are pickled by `pyfco.pickling.dumps`, IDL modules have to be imported in all the processes.
+    Results which can't be unpickled, e.g. because their types aren't registered, are considered missing.
+    Modification time of the files is set to the expiration of the results, so expired results can be found
+    without reading the files. Expired results are removed once they're requested or by `sweep`.
+    Counters are kept by each process.
+
+    @ivar directory: Directory with the cached results.
+    @ivar maxsize: Maximal number of cached results, `None` means no limit. Once the limit is exceeded,
+        expired results are removed and then the results which expire first. The directory is pruned
+        only after a tenth of `maxsize` results is set by the process, so the limit may be exceeded in between.
+    @type maxsize: `int` or `None`
+    """
+
+    suffix = '.pyfco'
+
+    def __init__(self, directory, ttl, maxsize=1024):
+        super(FileCache, self).__init__(ttl)
+        self.directory = directory
+        self.maxsize = maxsize
+        # Number of results set since the last pruning.
+        self._unpruned = 0
+
+    def _get_path(self, key):
+        """Return path to the file with the cached result."""
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _miss(self, key):
+        """Count miss and raise `KeyError`."""
+        with self._lock:
+            self._misses += 1
+        raise KeyError(key)
+
+    def get(self, key):
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                expiration, value = loads(cache_file.read())
+        except (IOError, OSError, EOFError, pickle.UnpicklingError, TypeError, AttributeError):
+            self._miss(key)
+        if expiration <= time.time():
+            self._remove(path)
+            self._miss(key)
+        with self._lock:
+            self._hits += 1
+        return value
+
+    def set(self, key, value):
+        expiration = time.time() + self.ttl
+        data = dumps((expiration, value))
+        handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(handle, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.utime(tmp_path, (expiration, expiration))
+            # Replace the file atomically, so other processes never read an incomplete result.
+            os.rename(tmp_path, self._get_path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        if self.maxsize is not None and self._count_unpruned():
+            self._prune(self.maxsize)
+
+    def _count_unpruned(self):
+        """Count set result and return whether the directory should be pruned."""
+        with self._lock:
+            self._unpruned += 1
+            if self._unpruned < max(self.maxsize // 10, 1):
+                return False
+            self._unpruned = 0
+            return True
+
+    def sweep(self):
+        """Remove expired results."""
+        self._prune(None)
+
+    def _prune(self, maxsize):
+        """Remove expired results and the results which expire first, until there is at most `maxsize` results."""
+        now = time.time()
+        expirations = []
+        for name in self._list():
+            path = os.path.join(self.directory, name)
+            try:
+                expiration = os.stat(path).st_mtime
+            except OSError as error:
+                # File may have been removed by other process.
+                if error.errno != errno.ENOENT:
+                    raise
+                continue
+            if expiration <= now:
+                self._remove(path)
+            else:
+                expirations.append((expiration, path))
+        if maxsize is not None and len(expirations) > maxsize:
+            expirations.sort()
+            for expiration, path in expirations[:len(expirations) - maxsize]:
+                self._remove(path)
+
+    def _remove(self, path):
+        """Remove file, if it exists."""
+        try:
+            os.remove(path)
+        except OSError as error:
+            if error.errno != errno.ENOENT:
+                raise
+
+    def _list(self):
+        """Return names of the files with the cached results."""
+        return [name for name in os.listdir(self.directory) if name.endswith(self.suffix)]
+
+    def clear(self):
+        names = self._list()
+        for name in names:
+            self._remove(os.path.join(self.directory, name))
+        with self._lock:
+            self._invalidations += len(names)
+
+    def __len__(self):
+        return len(self._list())
@@ -21,24 +21,138 @@ from __future__ import unicode_literals
 import logging
 import random
 import string
+import threading
+from multiprocessing.pool import ThreadPool
+from timeit import default_timer
 
-from omniORB import CORBA
+from omniORB import CORBA, StructBase
+
+from .cache import copy_value, get_key
+from .metrics import CORBA_EXCEPTION, OTHER_ERROR, SERVER_ERROR, USER_EXCEPTION, count_nodes
+from .recoder import get_struct_fields
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def sane_repr(obj, max_length):
-    """Return object representation limited to `max_length` characters."""
-    obj_repr = repr(obj)
-    if len(obj_repr) > max_length:
-        return obj_repr[:max_length] + ' [truncated]...'
+class _ReprLimitReached(Exception):
+    """Representation is longer than the limit."""
+
+
+_REPR_DELIMITERS = {list: ('[', ']'), tuple: ('(', ')')}
+
+
+def _write_struct_repr(obj, write, active):
+    """Write representation of the corba structure field by field, in the format of `omniORB.StructBase`."""
+    cls = type(obj)
+    fields = get_struct_fields(cls)
+    if fields is None:
+        write(repr(obj))
+        return
+    write((cls._NP_ClassName or '{}.{}'.format(cls.__module__, cls.__name__)) + '(')
+    if id(obj) in active:
+        # Recursive structure
+        write('...)')
+        return
+    active.add(id(obj))
+    for i, field in enumerate(fields):
+        if i:
+            write(', ')
+        write(field + '=')
+        if hasattr(obj, field):
+            _write_repr(getattr(obj, field), write, active)
+        else:
+            write('<not set>')
+    write(')')
+    active.discard(id(obj))
+
+
+def _write_repr(obj, write, active):
+    """Write representation of the object.
+
+    Lists, tuples, dictionaries and corba structures are written item by item.
+    """
+    cls = type(obj)
+    if cls in _REPR_DELIMITERS or cls is dict:
+        opening, closing = _REPR_DELIMITERS.get(cls, ('{', '}'))
+        if id(obj) in active:
+            # Recursive container
+            write(opening + '...' + closing)
+            return
+        active.add(id(obj))
+        write(opening)
+        if cls is dict:
+            for i, (key, value) in enumerate(obj.items()):
+                if i:
+                    write(', ')
+                _write_repr(key, write, active)
+                write(': ')
+                _write_repr(value, write, active)
+        else:
+            for i, item in enumerate(obj):
+                if i:
+                    write(', ')
+                _write_repr(item, write, active)
+            if cls is tuple and len(obj) == 1:
+                write(',')
+        write(closing)
+        active.discard(id(obj))
+    elif isinstance(obj, StructBase):
+        _write_struct_repr(obj, write, active)
     else:
-        return obj_repr
+        write(repr(obj))
+
+
+def sane_repr(obj, max_length):
+    """Return object representation limited to `max_length` characters.
+
+    Lists, tuples, dictionaries and corba structures are represented only until the limit is reached.
+    """
+    parts = []
+    length = [0]
+
+    def write(part):
+        parts.append(part)
+        length[0] += len(part)
+        if length[0] > max_length:
+            raise _ReprLimitReached
+
+    try:
+        _write_repr(obj, write, set())
+    except _ReprLimitReached:
+        return ''.join(parts)[:max_length] + ' [truncated]...'
+    return ''.join(parts)
 
 
 ALLOWED_CHARS = string.ascii_letters + string.digits
 
 
+def _get_call_id():
+    """Generate identifier to mark matching logs."""
+    return ''.join(random.choice(ALLOWED_CHARS) for i in range(4))
+
+
+class _Flight(object):
+    """Corba call in progress, which is awaited by other callers.
+
+    @ivar result: Private copy of the result for the followers.
+    @ivar error: Exception raised by the call.
+    @ivar followers: Number of callers awaiting the call.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+    def wait(self):
+        """Wait for the call and return copy of its result or raise its exception."""
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return copy_value(self.result)
+
+
 class CorbaClient(object):
     """Corba client - wrapper over Corba object.
 
@@ -47,7 +161,8 @@ class CorbaClient(object):
 
     max_length = 2048
 
-    def __init__(self, corba_object, recoder, server_error_cls=None):
+    def __init__(self, corba_object, recoder, server_error_cls=None, lazy=False, metrics=None,
+                 policy=None, method_policies=None, caches=None, coalesce=None):
         """Initialize instance.
 
         @param corba_object: Corba object to be wrapped.
@@ -56,44 +171,281 @@ class CorbaClient(object):
         @type recoder: `CorbaRecoder`
         @param server_error_cls: INTERNAL_SERVER_ERROR class - exception defined in IDL handled as server error.
         @type server_error_cls: `type`
+        @param lazy: Whether to decode sequences in results lazily, see `CorbaRecoder.decode_lazy`.
+        @type lazy: `bool`
+        @param metrics: Sink for metrics of the calls, see `pyfco.metrics`. If `None`, no metrics are collected.
+        @type metrics: `MetricsSink`
+        @param policy: Default policy of the calls - timeouts, retries etc., see `pyfco.policy`.
+        @type policy: `CallPolicy`
+        @param method_policies: Policies of the calls by method names, override the default policy.
+        @type method_policies: `{six.text_type: CallPolicy}`
+        @param caches: Caches of the results by method names, see `pyfco.cache`. Only methods without side effects
+            should be cached. Cached results are always decoded eagerly.
+        @type caches: `{six.text_type: ResponseCache}`
+        @param coalesce: Names of the methods whose concurrent calls with the same arguments are coalesced,
+            so only one of them is performed. Other callers get copies of its result or the same exception.
+            Only methods without side effects should be coalesced. Coalesced calls are always decoded eagerly.
+        @type coalesce: `{six.text_type, ...}`
         """
         self.corba_object = corba_object
         self.recoder = recoder
         self.server_error_cls = server_error_cls
+        self.lazy = lazy
+        self.metrics = metrics
+        self.policy = policy
+        self.method_policies = method_policies or {}
+        self.caches = caches or {}
+        self.coalesce = frozenset(coalesce or ())
+        # Calls in progress - `key` => `_Flight`
+        self._flights = {}
+        self._flights_lock = threading.Lock()
 
     # This method doesn't have **kwargs because Corba doesn't support it, at least not in the current version.
     def _call(self, method, *args):
         """Actually perform the Corba call."""
-        # Generate identifier to mark matching logs
-        call_id = ''.join(random.choice(ALLOWED_CHARS) for i in range(4))
-        _LOGGER.debug("[%s] %s(%r)", call_id, method, args)
+        encoded_args, encode_time = self._encode(method, args)
+        return self._dispatch(method, args, encoded_args, encode_time, lazy=self.lazy)
+
+    def lazy_call(self, method, *args):
+        """Perform the Corba call and return its result decoded lazily, see `CorbaRecoder.decode_lazy`.
+
+        Results of cached and coalesced methods are decoded eagerly.
+        """
+        encoded_args, encode_time = self._encode(method, args)
+        return self._dispatch(method, args, encoded_args, encode_time, lazy=True)
+
+    def _is_shared(self, method):
+        """Return whether results of the method are shared by its cache or coalescing."""
+        return method in self.caches or method in self.coalesce
+
+    def _dispatch(self, method, args, encoded_args, encode_time=0.0, lazy=False):
+        """Return decoded result of the Corba call from its cache, coalesced call or perform the call."""
+        cache = self.caches.get(method)
+        if cache is not None:
+            return self._cached_call(cache, method, args, encoded_args, encode_time)
+        if method in self.coalesce:
+            return self._coalesced_call(method, args, encoded_args, encode_time, get_key(method, encoded_args))
+        return self._perform(method, args, encoded_args, encode_time, lazy=lazy)
+
+    def _cached_call(self, cache, method, args, encoded_args, encode_time):
+        """Return result of the Corba call from the cache or perform the call and cache its result."""
+        key = get_key(method, encoded_args)
+        try:
+            result = cache.get(key)
+        except KeyError:
+            pass
+        else:
+            if self.metrics is not None:
+                self.metrics.record_cache_hit(method)
+            return result
+        if method in self.coalesce:
+            return self._coalesced_call(method, args, encoded_args, encode_time, key, cache)
+        result = self._perform(method, args, encoded_args, encode_time)
+        cache.set(key, result)
+        return result
+
+    def _coalesced_call(self, method, args, encoded_args, encode_time, key, cache=None):
+        """Perform the Corba call, unless the same call is already in progress, and return its decoded result.
+
+        @param cache: Cache of the result, only the performed call stores its result.
+        """
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+        if not leader:
+            return flight.wait()
+
+        try:
+            result = self._perform(method, args, encoded_args, encode_time)
+            if cache is not None:
+                # Cache the result before the flight ends, so later calls find it.
+                cache.set(key, result)
+            with self._flights_lock:
+                del self._flights[key]
+            if flight.followers:
+                # Result of the leader may be modified by its caller, followers copy a private copy.
+                flight.result = copy_value(result)
+        except BaseException as error:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.error = error
+            raise
+        finally:
+            flight.event.set()
+        return result
+
+    def _get_error_category(self, error):
+        """Return category of the error for metrics."""
+        if self.server_error_cls is not None and isinstance(error, self.server_error_cls):
+            return SERVER_ERROR
+        elif isinstance(error, CORBA.UserException):
+            return USER_EXCEPTION
+        elif isinstance(error, CORBA.Exception):
+            return CORBA_EXCEPTION
+        else:
+            return OTHER_ERROR
+
+    def _encode(self, method, args):
+        """Return encoded arguments of the Corba call and time spent in their encoding, record failed encoding."""
+        if self.metrics is None:
+            return self.recoder.encode(args), 0.0
+        start = default_timer()
+        try:
+            encoded_args = self.recoder.encode(args)
+        except Exception as error:
+            self.metrics.record(method, self._get_error_category(error), 0.0, 0.0, 0.0, 0)
+            raise
+        return encoded_args, default_timer() - start
+
+    def _perform(self, method, args, encoded_args, encode_time=0.0, lazy=False, decode=True):
+        """Perform the Corba call with encoded arguments, return its result and record its metrics.
+
+        All calls are performed by this method, so they're all recorded in metrics.
+
+        @param encode_time: Time spent in encoding of the arguments in seconds.
+        @param lazy: Whether to decode the result lazily.
+        @param decode: Whether to decode the result. If not, the result is returned undecoded
+            and its later decoding isn't recorded.
+        """
+        if self.metrics is None:
+            result = self._invoke_encoded(method, args, encoded_args)
+            return self._decode(result, lazy) if decode else result
+
+        start = default_timer()
+        invoke_time = 0.0
+        try:
+            result = self._invoke_encoded(method, args, encoded_args)
+            invoke_time = default_timer() - start
+            decoded = self._decode(result, lazy) if decode else result
+        except Exception as error:
+            self.metrics.record(method, self._get_error_category(error), encode_time, invoke_time, 0.0, 0)
+            raise
+        decode_time = default_timer() - start - invoke_time if decode else 0.0
+        self.metrics.record(method, None, encode_time, invoke_time, decode_time, count_nodes(result))
+        return decoded
+
+    def iter_call(self, method, *args, **kwargs):
+        """Perform the Corba call and return iterator over chunks of its decoded sequence result.
+
+        Items are released from the raw result as they are decoded, so only a single chunk is decoded at once.
+        Decoding of the chunks isn't recorded in metrics.
+        Results of cached and coalesced methods are decoded eagerly and only split into chunks.
+
+        @keyword chunk_size: Maximal number of items in a chunk, default is 1000.
+        @raise TypeError: If result isn't a sequence.
+        """
+        chunk_size = kwargs.pop('chunk_size', 1000)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments: {}".format(', '.join(sorted(kwargs))))
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive.")
+        encoded_args, encode_time = self._encode(method, args)
+        decode = not self._is_shared(method)
+        if decode:
+            result = self._perform(method, args, encoded_args, encode_time, decode=False)
+        else:
+            # Shared results are decoded eagerly and must not be modified.
+            result = self._dispatch(method, args, encoded_args, encode_time)
+        if not isinstance(result, (list, tuple)):
+            raise TypeError("Result of {} is not a sequence.".format(method))
+        return self._iter_chunks(list(result) if isinstance(result, tuple) or not decode else result, chunk_size,
+                                 decode)
+
+    def _iter_chunks(self, items, chunk_size, decode=True):
+        """Yield chunks of the items, decoded if requested, remove them from the list."""
+        # Reverse the items, so chunks can be cheaply removed from the end of the list.
+        items.reverse()
+        while items:
+            chunk = items[-chunk_size:]
+            del items[-chunk_size:]
+            chunk.reverse()
+            yield self._decode(chunk) if decode else chunk
 
-        # Encode strings
-        args = self.recoder.encode(args)
+    def map_calls(self, calls, max_workers=10):
+        """Perform the Corba calls concurrently and return list of their decoded results.
+
+        Arguments of all calls are encoded before the first call is performed, results are decoded in the threads.
+        If any of the calls fails, exception of the first failed call is raised once all calls are finished.
+
+        @param calls: Pairs of method name and its arguments, e.g. `[('getDomain', (1, )), ('getContact', (2, ))]`.
+        @param max_workers: Maximal number of calls performed at once.
+        @type max_workers: `int`
+        """
+        calls = [(method, tuple(args)) for method, args in calls]
+        calls = [(method, args) + self._encode(method, args) for method, args in calls]
+        if not calls:
+            return []
+        pool = ThreadPool(min(max_workers, len(calls)))
         try:
-            result = getattr(self.corba_object, method)(*args)
+            async_results = [pool.apply_async(self._dispatch, call, {'lazy': self.lazy}) for call in calls]
+            pool.close()
+            pool.join()
+            return [async_result.get() for async_result in async_results]
+        finally:
+            pool.terminate()
+
+    def _decode(self, result, lazy=False):
+        """Return decoded result of the Corba call."""
+        if lazy:
+            return self.recoder.decode_lazy(result)
+        if self.recoder.in_place:
+            # Result of the call isn't referenced by anyone else.
+            return self.recoder.decode_in_place(result)
+        return self.recoder.decode(result)
+
+    def _invoke_encoded(self, method, args, encoded_args):
+        """Perform the Corba call with encoded arguments and return its result undecoded."""
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        if debug:
+            call_id = _get_call_id()
+            _LOGGER.debug("[%s] %s(%r)", call_id, method, args)
+        else:
+            call_id = None
+
+        try:
+            policy = self.method_policies.get(method, self.policy)
+            if policy is None:
+                result = getattr(self.corba_object, method)(*encoded_args)
+            else:
+                result = policy.invoke(self.corba_object, method, encoded_args)
         except self.server_error_cls as error:
-            _LOGGER.error("[%s] %s failed with %s", call_id, method, error)
+            _LOGGER.error("[%s] %s failed with %s", call_id or _get_call_id(), method, error)
             raise
         except CORBA.UserException as error:
             # All other exceptions defined in IDL
-            _LOGGER.debug("[%s] %s failed with %s", call_id, method, error)
+            if debug:
+                _LOGGER.debug("[%s] %s failed with %s", call_id, method, error)
             raise
         except CORBA.Exception as error:
             # All other CORBA exceptions
-            _LOGGER.error("[%s] %s failed with %s", call_id, method, error)
+            _LOGGER.error("[%s] %s failed with %s", call_id or _get_call_id(), method, error)
             raise
 
-        # Log result before decoding
-        _LOGGER.debug("[%s] %s returned %s", call_id, method, sane_repr(result, self.max_length))
-
-        # Return decoded result
-        return self.recoder.decode(result)
+        if debug:
+            # Log result before decoding
+            _LOGGER.debug("[%s] %s returned %s", call_id, method, sane_repr(result, self.max_length))
+        return result
 
     def __getattr__(self, name):
-        """Publish CORBA object methods."""
+        """Publish CORBA object methods.
+
+        Wrappers are stored in the instance, so they're created only once for each method.
+
+        @raise AttributeError: If the Corba object doesn't have the method.
+        """
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        if not hasattr(self.corba_object, name):
+            raise AttributeError("Corba object {!r} has no method {!r}".format(self.corba_object, name))
+
         def wrapper(*args):
             return self._call(name, *args)
+        wrapper.__name__ = str(name)
+        self.__dict__[name] = wrapper
         return wrapper
 
 
@@ -101,6 +453,8 @@ class CorbaClient(object):
 class CorbaClientProxy(object):
     """Proxy for Corba client instance.
 
+    Methods of the client are stored in the proxy, they're dropped once the client is replaced.
+
     @ivar client: Corba client instance
     @type client: `CorbaClient`
     """
@@ -108,5 +462,26 @@ class CorbaClientProxy(object):
     def __init__(self, client):
         self.client = client
 
+    @property
+    def client(self):
+        """Return the Corba client."""
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        """Set the Corba client and drop the stored methods."""
+        self.__dict__.clear()
+        self._client = client
+
+    @client.deleter
+    def client(self):
+        """Delete the Corba client and drop the stored methods."""
+        self.__dict__.clear()
+
     def __getattr__(self, name):
-        return getattr(self.client, name)
+        if name.startswith('__') and name.endswith('__') or name in ('client', '_client'):
+            raise AttributeError(name)
+        value = getattr(self.client, name)
+        if callable(value):
+            self.__dict__[name] = value
+        return value
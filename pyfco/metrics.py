@@ -0,0 +1,178 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Metrics of corba calls."""
+from __future__ import unicode_literals
+
+import copy
+import threading
+from abc import ABCMeta, abstractmethod
+
+import six
+from omniORB import StructBase
+
+# Error categories
+SERVER_ERROR = 'server_error'
+USER_EXCEPTION = 'user_exception'
+CORBA_EXCEPTION = 'corba_exception'
+OTHER_ERROR = 'other'
+
+
+def count_nodes(value):
+    """Return approximate number of nodes in the corba value.
+
+    Only the first item of every list or tuple is walked, other items are assumed to be of the same size.
+    """
+    count = 0
+    stack = [(value, 1)]
+    while stack:
+        value, weight = stack.pop()
+        count += weight
+        if isinstance(value, (list, tuple)):
+            if value:
+                stack.append((value[0], weight * len(value)))
+        elif isinstance(value, StructBase):
+            stack.extend((field, weight) for field in six.itervalues(value.__dict__))
+    return count
+
+
+@six.add_metaclass(ABCMeta)
+class MetricsSink(object):
+    """Base class for sinks of the corba call metrics. Subclasses have to implement `record`."""
+
+    @abstractmethod
+    def record(self, method, error, encode_time, invoke_time, decode_time, nodes):
+        """Record metrics of a corba call.
+
+        @param method: Name of the called method.
+        @param error: Error category of the failed call or `None`.
+        @param encode_time: Time spent in encoding of the arguments in seconds.
+        @param invoke_time: Time spent in the remote invocation in seconds.
+        @param decode_time: Time spent in decoding of the result in seconds.
+        @param nodes: Approximate number of nodes in the result.
+        """
+
+    def record_cache_hit(self, method):
+        """Record result of a corba call returned from the cache, see `pyfco.cache`. Ignored by default.
+
+        @param method: Name of the called method.
+        """
+
+
+class MethodMetrics(object):
+    """Metrics of a single method.
+
+    @ivar count: Number of calls.
+    @ivar cache_hits: Number of results returned from the cache, they're not counted as calls.
+    @ivar errors: Number of errors by their categories.
+    @type errors: {six.text_type: int}
+    @ivar encode_time: Total time spent in encoding of the arguments in seconds.
+    @ivar invoke_time: Total time spent in the remote invocations in seconds.
+    @ivar decode_time: Total time spent in decoding of the results in seconds.
+    @ivar nodes: Approximate total number of nodes in the results.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.cache_hits = 0
+        self.errors = {}
+        self.encode_time = 0.0
+        self.invoke_time = 0.0
+        self.decode_time = 0.0
+        self.nodes = 0
+
+    def __repr__(self):
+        return '<MethodMetrics count={} errors={}>'.format(self.count, sum(self.errors.values()))
+
+
+class MemoryMetricsSink(MetricsSink):
+    """Metrics sink which keeps the metrics in memory."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_method_metrics(self, method):
+        """Return metrics of the method, create them if necessary. Lock must be held."""
+        metrics = self._metrics.get(method)
+        if metrics is None:
+            metrics = self._metrics[method] = MethodMetrics()
+        return metrics
+
+    def record(self, method, error, encode_time, invoke_time, decode_time, nodes):
+        with self._lock:
+            metrics = self._get_method_metrics(method)
+            metrics.count += 1
+            if error is not None:
+                metrics.errors[error] = metrics.errors.get(error, 0) + 1
+            metrics.encode_time += encode_time
+            metrics.invoke_time += invoke_time
+            metrics.decode_time += decode_time
+            metrics.nodes += nodes
+
+    def record_cache_hit(self, method):
+        with self._lock:
+            self._get_method_metrics(method).cache_hits += 1
+
+    def get_metrics(self):
+        """Return copy of the metrics by method names.
+
+        @rtype: {six.text_type: MethodMetrics}
+        """
+        with self._lock:
+            return {method: copy.deepcopy(metrics) for method, metrics in six.iteritems(self._metrics)}
+
+    def clear(self):
+        """Clear all metrics."""
+        with self._lock:
+            self._metrics.clear()
+
+
+def _escape_label(value):
+    """Escape value of the Prometheus label."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus(sink, prefix='pyfco'):
+    """Return metrics in Prometheus text format.
+
+    @param sink: Sink with the metrics.
+    @type sink: `MemoryMetricsSink`
+    @param prefix: Prefix of the metric names.
+    """
+    metrics = sorted(six.iteritems(sink.get_metrics()))
+    samples = (
+        ('calls_total', 'Number of corba calls.', lambda m: [((), m.count)]),
+        ('cache_hits_total', 'Number of results returned from the cache.', lambda m: [((), m.cache_hits)]),
+        ('errors_total', 'Number of failed corba calls.',
+         lambda m: [((('category', c), ), v) for c, v in sorted(m.errors.items())]),
+        ('encode_seconds_total', 'Time spent in encoding of the arguments.', lambda m: [((), m.encode_time)]),
+        ('invoke_seconds_total', 'Time spent in the remote invocations.', lambda m: [((), m.invoke_time)]),
+        ('decode_seconds_total', 'Time spent in decoding of the results.', lambda m: [((), m.decode_time)]),
+        ('result_nodes_total', 'Approximate number of nodes in the results.', lambda m: [((), m.nodes)]),
+    )
+    lines = []
+    for name, help_text, get_values in samples:
+        name = '{}_{}'.format(prefix, name)
+        lines.append('# HELP {} {}'.format(name, help_text))
+        lines.append('# TYPE {} counter'.format(name))
+        for method, method_metrics in metrics:
+            for labels, value in get_values(method_metrics):
+                labels = (('method', method), ) + labels
+                labels = ','.join('{}="{}"'.format(k, _escape_label(v)) for k, v in labels)
+                lines.append('{}{{{}}} {}'.format(name, labels, value))
+    return '\n'.join(lines) + '\n'
@@ -17,15 +17,147 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import unicode_literals
 
+import functools
 import logging
+import os
+import threading
+import time
 import warnings
+import weakref
+from collections import namedtuple
 
 import CosNaming
 import six
-from omniORB import CORBA, installTransientExceptionHandler
+from omniORB import CORBA, installSystemExceptionHandler, installTransientExceptionHandler
 
 _LOGGER = logging.getLogger(__name__)
 
+# Python 2 doesn't have monotonic clock.
+_monotonic = getattr(time, 'monotonic', time.time)
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'invalidations', 'size'])
+
+
+class OrbManager(object):
+    """Process-wide manager of the ORB and naming contexts.
+
+    ORB is initialized only once, naming contexts are shared for every host, port and TRANSIENT error handler.
+    Handlers are compared by equality, so clients with the same retry settings share the context.
+
+    @ivar orb: Initialized ORB.
+    @ivar orb_args: Arguments the ORB was initialized with.
+    """
+
+    def __init__(self):
+        self.orb = None
+        self.orb_args = None
+        # Naming contexts - `(host_port, retry_handler)` => context
+        self._contexts = {}
+        # Locks of the contexts being created - `(host_port, retry_handler)` => lock
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _get_orb(self, orb_args):
+        """Return ORB, initialize it if necessary. Lock must be held."""
+        if self.orb is None:
+            self.orb = CORBA.ORB_init(orb_args)
+            self.orb_args = orb_args
+        elif orb_args != self.orb_args:
+            _LOGGER.warning("ORB already initialized with %r, arguments %r are ignored.", self.orb_args, orb_args)
+        return self.orb
+
+    def get_orb(self, orb_args):
+        """Return ORB, initialize it if necessary.
+
+        @param orb_args: Arguments for CORBA initialization.
+        """
+        with self._lock:
+            return self._get_orb(orb_args)
+
+    def get_context(self, host_port, orb_args, retry_handler):
+        """Return naming context for host, port and handler, create it if necessary.
+
+        @param host_port: Host and port to the Corba service. E.g. 'hostname:port'.
+        @param orb_args: Arguments for CORBA initialization.
+        @param retry_handler: Handler for TRANSIENT errors of the naming context, it has to be hashable.
+            The handler is kept as long as the context.
+        """
+        key = (host_port, retry_handler)
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is not None:
+                return context
+            orb = self._get_orb(orb_args)
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Naming service is contacted only under the lock of the key, so it doesn't block other contexts.
+        with key_lock:
+            with self._lock:
+                context = self._contexts.get(key)
+            if context is None:
+                obj = orb.string_to_object('corbaname::' + host_port)
+                installTransientExceptionHandler(None, retry_handler, obj)
+                context = obj._narrow(CosNaming.NamingContext)
+                with self._lock:
+                    self._contexts[key] = context
+            return context
+
+    def invalidate(self, host_port=None):
+        """Remove naming contexts for host and port. If host and port is not provided, all contexts are removed."""
+        with self._lock:
+            if host_port is None:
+                self._contexts.clear()
+            else:
+                for key in [k for k in self._contexts if k[0] == host_port]:
+                    del self._contexts[key]
+
+    def after_fork(self):
+        """Drop naming contexts inherited from the parent process, call only in the forked child process.
+
+        It's called automatically for the default `orb_manager` with python 3.7+, other managers have to be reset
+        by the application.
+
+        The locks are replaced as well, since they may have been held by other threads of the parent process.
+        """
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._contexts.clear()
+
+
+orb_manager = OrbManager()
+if hasattr(os, 'register_at_fork'):
+    # Registered once for all clients, so the manager is reset before any of them warms up in the child.
+    os.register_at_fork(after_in_child=orb_manager.after_fork)
+
+
+class _RetryHandler(object):
+    """Handler of TRANSIENT errors of the naming context, retries the call up to the number of retries.
+
+    Handlers with the same number of retries are equal, so the naming context may be shared by several clients.
+    """
+
+    def __init__(self, retries):
+        self.retries = retries
+
+    def __call__(self, cookie, retries, exc):
+        _LOGGER.debug("Handling corba error %r - %r retries.", exc, retries)
+        return retries < self.retries
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.retries == other.retries
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self), self.retries))
+
+
+def _warm_up_forked(client_ref):
+    """Warm up the client in the forked process, unless it was deleted."""
+    client = client_ref()
+    if client is not None:
+        client._warm_up_child()
+
 
 class CorbaNameServiceClient(object):
     """Corba name service client connects to the corba server.
@@ -38,14 +170,22 @@ class CorbaNameServiceClient(object):
     @type context: C{CosNaming._objref_NamingContext instance}
     @ivar retries: Maximal number of retries on error.
     @type retries: int
+    @ivar cache_ttl: Number of seconds the resolved objects are cached for. If `None`, objects aren't cached.
+        Cached objects are removed from the cache on TRANSIENT or OBJECT_NOT_EXIST errors, so the next `get_object`
+        resolves them again. Calls of the cached objects aren't retried on TRANSIENT errors, the error is raised
+        to the caller, which may retry with a new object, e.g. by `pyfco.policy.CallPolicy`.
+    @type cache_ttl: C{float} or C{None}
 
     @cvar orb_args: Arguments for CORBA initialization.
     @type orb_args: [six.text_type, six.text_type, ...]
+    @cvar orb_manager: Manager of the ORB and naming contexts.
+    @type orb_manager: C{OrbManager}
     """
 
     orb_args = ['-ORBnativeCharCodeSet', 'UTF-8']
+    orb_manager = orb_manager
 
-    def __init__(self, host_port='localhost', context_name='fred', retries=5):
+    def __init__(self, host_port='localhost', context_name='fred', retries=5, cache_ttl=None):
         if isinstance(host_port, six.binary_type):
             warnings.warn("Passing 'host_port' as six.binary_type is deprecated. Please pass six.text_type.",
                           DeprecationWarning)
@@ -60,6 +200,16 @@ class CorbaNameServiceClient(object):
             self.context_name = context_name
         self.context = None
         self.retries = retries
+        self.cache_ttl = cache_ttl
+        # Cached objects - `(name, idl_object)` => `(object, expiration)`
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        # Warm up in the forked processes - `(parent_pid, objects)` or `None`
+        self._fork_warm_up = None
+        self._fork_registered = False
 
     def retry_handler(self, cookie, retries, exc):
         """Handle corba error and retry, unless number of retries is too high."""
@@ -69,8 +219,63 @@ class CorbaNameServiceClient(object):
         else:
             return True
 
+    def cache_info(self):
+        """Return statistics of the object cache.
+
+        @rtype: C{CacheInfo}
+        """
+        with self._cache_lock:
+            return CacheInfo(self._hits, self._misses, self._invalidations, len(self._cache))
+
+    def invalidate(self, name=None, idl_object=None):
+        """Remove object from the cache. If name is not provided, whole cache is cleared.
+
+        @param name: Name of NameComponent object.
+        @type name: C{six.text_type}
+        @param idl_object: Module object imported from IDL.
+        @type idl_object: C{classobj instance}
+        """
+        with self._cache_lock:
+            if name is None:
+                self._invalidations += len(self._cache)
+                self._cache.clear()
+            elif self._cache.pop((name, idl_object), None) is not None:
+                self._invalidations += 1
+
+    def _invalidate_handler(self, cookie, retries, exc):
+        """Handle corba TRANSIENT error on cached object - invalidate its cache entry, don't retry.
+
+        Retries of the stale object would be performed immediately and they would multiply with retries of the caller.
+        """
+        self.invalidate(*cookie)
+        return False
+
+    def _invalidate_system_handler(self, cookie, retries, exc):
+        """Handle corba system error on cached object - invalidate its cache entry if object doesn't exist."""
+        if isinstance(exc, CORBA.OBJECT_NOT_EXIST):
+            self.invalidate(*cookie)
+        return False
+
+    def _get_retry_handler(self):
+        """Return TRANSIENT error handler of the naming context.
+
+        Clients with the same number of retries share the handler. If `retry_handler` is overridden, it's used instead.
+        """
+        if six.get_unbound_function(type(self).retry_handler) is \
+                six.get_unbound_function(CorbaNameServiceClient.retry_handler):
+            return _RetryHandler(self.retries)
+        return self.retry_handler
+
     def connect(self):
-        """Connect to the corba server and attach TRANSIENT error handler."""
+        """Connect to the corba server and attach TRANSIENT error handler.
+
+        Naming context shared for the host and port is dropped and a new one is created.
+        """
+        self.orb_manager.invalidate(self.host_port)
+        self._connect()
+
+    def _connect(self):
+        """Connect to the corba server using naming context shared by all clients with the same `orb_manager`."""
         orb_args = []
         for orb_arg in self.orb_args:
             if isinstance(orb_arg, six.binary_type):
@@ -81,10 +286,7 @@ class CorbaNameServiceClient(object):
             elif isinstance(orb_arg, six.binary_type) and six.PY3:
                 orb_arg = orb_arg.decode()
             orb_args.append(orb_arg)
-        orb = CORBA.ORB_init(orb_args)
-        obj = orb.string_to_object('corbaname::' + self.host_port)
-        installTransientExceptionHandler(None, self.retry_handler, obj)
-        self.context = obj._narrow(CosNaming.NamingContext)
+        self.context = self.orb_manager.get_context(self.host_port, orb_args, self._get_retry_handler())
 
     def get_object(self, name, idl_object):
         """Get object from the corba server. Corba objects are loaded by omniORB.importIDL.
@@ -94,11 +296,103 @@ class CorbaNameServiceClient(object):
         @param idl_object: Module object imported from IDL.
         @type idl_object: C{classobj instance}
         """
-        if self.context is None:
-            self.connect()
         if isinstance(name, six.binary_type):
             warnings.warn("Passing 'name' as six.binary_type is deprecated. Please pass six.text_type.",
                           DeprecationWarning)
+        if self.cache_ttl is None:
+            return self._resolve(name, idl_object)
+
+        key = (name.decode() if isinstance(name, six.binary_type) else name, idl_object)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[1] > _monotonic():
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        obj = self._resolve(name, idl_object)
+        installTransientExceptionHandler(key, self._invalidate_handler, obj)
+        installSystemExceptionHandler(key, self._invalidate_system_handler, obj)
+        with self._cache_lock:
+            self._cache[key] = (obj, _monotonic() + self.cache_ttl)
+        return obj
+
+    def warm_up(self, objects, background=False):
+        """Connect to the corba server and resolve the objects in advance.
+
+        Resolved objects are cached if `cache_ttl` is set. Objects which can't be resolved are skipped.
+
+        @param objects: Pairs of name and module object imported from IDL.
+        @type objects: [(C{six.text_type}, C{classobj instance}), ...]
+        @param background: Whether to resolve the objects in a background thread, requires `cache_ttl`.
+        @type background: C{bool}
+        @return: Resolved objects by name and module object or the started background thread.
+        @rtype: C{{(six.text_type, classobj instance): CORBA.Object}} or C{threading.Thread}
+        @raise ValueError: If objects should be resolved in the background, but `cache_ttl` isn't set.
+        """
+        objects = list(objects)
+        if background:
+            if self.cache_ttl is None:
+                raise ValueError("Warm up in the background requires cache_ttl, resolved objects would be lost.")
+            thread = threading.Thread(target=self.warm_up, args=(objects, ), name='pyfco-warm-up')
+            thread.daemon = True
+            thread.start()
+            return thread
+
+        resolved = {}
+        for name, idl_object in objects:
+            try:
+                resolved[(name, idl_object)] = self.get_object(name, idl_object)
+            except CORBA.Exception as error:
+                _LOGGER.warning("Warm up of %s failed with %s.", name, error)
+        return resolved
+
+    def warm_up_at_fork(self, objects):
+        """Resolve the objects in a background thread in the processes forked by the current process.
+
+        Naming context and objects of the client inherited from the parent process are dropped in the child,
+        contexts of the default `orb_manager` are dropped by its own hook.
+        ORB must not be initialized in the parent process, omniORB doesn't support fork after its initialization.
+        Warm up is performed only in the processes forked directly by the current process, but in all of them,
+        including workers of `multiprocessing` with the fork start method. Call `cancel_warm_up_at_fork`
+        before forking processes which shouldn't warm up. Repeated calls replace the objects.
+        Hooks registered by `os.register_at_fork` can't be removed, but they don't keep the client alive.
+
+        @param objects: Pairs of name and module object imported from IDL.
+        @type objects: [(C{six.text_type}, C{classobj instance}), ...]
+        @return: Whether the warm up was registered, it requires `os.register_at_fork` (python 3.7+).
+        @rtype: C{bool}
+        @raise ValueError: If `cache_ttl` isn't set.
+        """
+        if self.cache_ttl is None:
+            raise ValueError("Warm up at fork requires cache_ttl, resolved objects would be lost.")
+        register_at_fork = getattr(os, 'register_at_fork', None)
+        if register_at_fork is None:
+            _LOGGER.warning("Warm up at fork is not supported.")
+            return False
+        self._fork_warm_up = (os.getpid(), list(objects))
+        if not self._fork_registered:
+            register_at_fork(after_in_child=functools.partial(_warm_up_forked, weakref.ref(self)))
+            self._fork_registered = True
+        return True
+
+    def cancel_warm_up_at_fork(self):
+        """Stop the warm up in the processes forked later."""
+        self._fork_warm_up = None
+
+    def _warm_up_child(self):
+        """Drop state inherited from the parent process and warm up the objects in the background."""
+        fork_warm_up = self._fork_warm_up
+        if fork_warm_up is None or fork_warm_up[0] != os.getppid():
+            return
+        self.context = None
+        self._cache_lock = threading.Lock()
+        self.invalidate()
+        self.warm_up(fork_warm_up[1], background=True)
+
+    def _resolve(self, name, idl_object):
+        """Resolve object in the naming context."""
+        if self.context is None:
+            self._connect()
         if isinstance(name, six.text_type) and six.PY2:
             name = name.encode()
         elif isinstance(name, six.binary_type) and six.PY3:
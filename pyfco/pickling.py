@@ -0,0 +1,104 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Pickling of values with corba structures and enum items."""
+from __future__ import unicode_literals
+
+from io import BytesIO
+
+from omniORB import EnumItem, StructBase, findType
+from six.moves import cPickle as pickle
+
+
+def _load_struct(repo_id, state):
+    """Return corba structure of the registered type."""
+    cls = findType(repo_id)[1]
+    obj = cls.__new__(cls)
+    obj.__dict__.update(state)
+    return obj
+
+
+def _load_enum(repo_id, value):
+    """Return enum item of the registered type."""
+    return findType(repo_id)[3][value]
+
+
+def _load_class(repo_id):
+    """Return corba structure class of the registered type."""
+    return findType(repo_id)[1]
+
+
+def _is_registered(cls):
+    """Return whether the class is registered corba structure class."""
+    descriptor = findType(getattr(cls, '_NP_RepositoryId', None))
+    return descriptor is not None and descriptor[1] is cls
+
+
+def _reduce(obj):
+    """Return reduce value for corba structures, their classes and enum items, `None` for other objects.
+
+    Classes of corba structures are deleted from the modules generated by omniidl,
+    so they are pickled by their repository IDs.
+    """
+    if isinstance(obj, StructBase):
+        if _is_registered(type(obj)):
+            return _load_struct, (obj._NP_RepositoryId, obj.__dict__)
+    elif isinstance(obj, EnumItem):
+        return _load_enum, (obj._parent_id, obj._v)
+    elif isinstance(obj, type) and issubclass(obj, StructBase) and _is_registered(obj):
+        return _load_class, (obj._NP_RepositoryId, )
+    return None
+
+
+if hasattr(pickle.Pickler, 'reducer_override'):
+    class _Pickler(pickle.Pickler):
+        """Pickler which supports corba types."""
+
+        def reducer_override(self, obj):
+            return _reduce(obj) or NotImplemented
+
+    def _get_pickler(file):
+        return _Pickler(file, pickle.HIGHEST_PROTOCOL)
+else:  # pragma: no cover
+    # Python < 3.8 - corba types are pickled as persistent IDs.
+    def _get_pickler(file):
+        pickler = pickle.Pickler(file, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = _reduce
+        return pickler
+
+
+def _persistent_load(pid):
+    """Load object pickled as persistent ID."""
+    function, args = pid
+    return function(*args)
+
+
+def dumps(obj):
+    """Return pickled object, which may contain corba structures and enum items.
+
+    Types of the corba structures and enum items have to be registered in the unpickling process.
+    """
+    buffer = BytesIO()
+    _get_pickler(buffer).dump(obj)
+    return buffer.getvalue()
+
+
+def loads(data):
+    """Return object pickled by `dumps`."""
+    unpickler = pickle.Unpickler(BytesIO(data))
+    unpickler.persistent_load = _persistent_load
+    return unpickler.load()
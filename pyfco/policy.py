@@ -0,0 +1,211 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Timeout, deadline, retry and circuit breaker policies of corba calls."""
+from __future__ import unicode_literals
+
+import logging
+import random
+import threading
+import time
+from timeit import default_timer
+
+import omniORB
+from omniORB import CORBA
+
+_LOGGER = logging.getLogger(__name__)
+
+# Call timeout of the current thread in milliseconds set by the policies, 0 means no timeout.
+_thread_timeout = threading.local()
+
+
+def _set_thread_timeout(timeout):
+    """Set call timeout of the current thread in milliseconds."""
+    omniORB.setClientThreadCallTimeout(timeout)
+    _thread_timeout.value = timeout
+
+
+class CircuitOpenError(Exception):
+    """Circuit breaker is open, the call wasn't performed."""
+
+
+class CircuitBreaker(object):
+    """Circuit breaker - fails fast after repeated communication errors.
+
+    The circuit opens after `threshold` consecutive errors. Once `reset_timeout` passes, a single trial call is allowed.
+    If it succeeds, the circuit closes, otherwise it opens again.
+    A breaker may be shared by several policies, e.g. by all methods of a single corba object.
+
+    @ivar threshold: Number of consecutive errors which open the circuit.
+    @type threshold: `int`
+    @ivar reset_timeout: Time in seconds after which a trial call is allowed.
+    @type reset_timeout: `float`
+    @ivar exceptions: Exceptions considered to be errors, other exceptions are considered to be successful calls.
+    @type exceptions: `tuple`
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30.0, exceptions=(CORBA.TRANSIENT, CORBA.COMM_FAILURE)):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.exceptions = exceptions
+        self._failures = 0
+        self._opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """Return whether the circuit is open."""
+        return self._opened is not None
+
+    def check(self):
+        """Check whether a call may be performed.
+
+        @raise CircuitOpenError: If the circuit is open.
+        """
+        with self._lock:
+            if self._opened is None:
+                return
+            if self._trial or default_timer() - self._opened < self.reset_timeout:
+                raise CircuitOpenError("Circuit is open after {} failures.".format(self._failures))
+            self._trial = True
+
+    def record(self, error=None):
+        """Record result of a call.
+
+        Exceptions which aren't `Exception` instances, e.g. `KeyboardInterrupt`, don't change the circuit,
+        they only end the trial call.
+
+        @param error: Exception raised by the call or `None`.
+        """
+        with self._lock:
+            trial, self._trial = self._trial, False
+            if error is not None and not isinstance(error, Exception):
+                # Call was interrupted, its result is unknown.
+                return
+            if isinstance(error, self.exceptions):
+                self._failures += 1
+                if trial or self._failures >= self.threshold:
+                    if self._opened is None:
+                        _LOGGER.warning("Circuit opened after %d failures.", self._failures)
+                    self._opened = default_timer()
+            else:
+                if self._opened is not None:
+                    _LOGGER.info("Circuit closed.")
+                self._failures = 0
+                self._opened = None
+
+
+class CallPolicy(object):
+    """Policy of corba calls - timeout, deadline, retries and circuit breaker.
+
+    Timeouts are set for the calling thread by `omniORB.setClientThreadCallTimeout` and restored after the call,
+    so they don't apply to other calls of the object. Timeouts set on the corba object take precedence over them.
+    If the policy has neither timeout nor deadline, timeout of the thread isn't changed.
+
+    @ivar timeout: Timeout of a single call in seconds, `None` means no timeout.
+    @type timeout: `float` or `None`
+    @ivar deadline: Total time of a call including retries in seconds, `None` means no deadline.
+    @type deadline: `float` or `None`
+    @ivar retries: Maximal number of retries.
+    @type retries: `int`
+    @ivar backoff: Delay before the first retry in seconds, doubled with every next retry.
+    @type backoff: `float`
+    @ivar max_backoff: Maximal delay between retries in seconds.
+    @type max_backoff: `float`
+    @ivar jitter: Whether to randomize the delays between retries.
+    @type jitter: `bool`
+    @ivar retry_exceptions: Exceptions on which the call is retried.
+    @type retry_exceptions: `tuple`
+    @ivar breaker: Circuit breaker of the calls or `None`.
+    @type breaker: `CircuitBreaker`
+    """
+
+    def __init__(self, timeout=None, deadline=None, retries=0, backoff=0.1, max_backoff=10.0, jitter=True,
+                 retry_exceptions=(CORBA.TRANSIENT, ), breaker=None):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_exceptions = retry_exceptions
+        self.breaker = breaker
+
+    def get_delay(self, retry):
+        """Return delay in seconds before the retry, numbered from 1."""
+        delay = min(self.backoff * 2 ** (retry - 1), self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def _get_timeout(self, deadline):
+        """Return timeout of the next call in seconds or `None`."""
+        if deadline is None:
+            return self.timeout
+        remaining = max(deadline - default_timer(), 0)
+        if self.timeout is None:
+            return remaining
+        return min(self.timeout, remaining)
+
+    def _perform(self, corba_object, method, args, deadline):
+        """Perform a single corba call with the timeout of the calling thread set."""
+        timeout = self._get_timeout(deadline)
+        if timeout is None:
+            return self._call(corba_object, method, args)
+        previous = getattr(_thread_timeout, 'value', 0)
+        # Timeout 0 means no timeout, make sure the time left to the deadline isn't rounded down to it.
+        _set_thread_timeout(max(int(round(timeout * 1000)), 1))
+        try:
+            return self._call(corba_object, method, args)
+        finally:
+            _set_thread_timeout(previous)
+
+    def _call(self, corba_object, method, args):
+        """Perform a single corba call guarded by the circuit breaker."""
+        if self.breaker is not None:
+            self.breaker.check()
+        try:
+            result = getattr(corba_object, method)(*args)
+        except BaseException as error:
+            # Record even interrupted calls, so the trial call of the breaker ends.
+            if self.breaker is not None:
+                self.breaker.record(error)
+            raise
+        if self.breaker is not None:
+            self.breaker.record()
+        return result
+
+    def invoke(self, corba_object, method, args):
+        """Perform the corba call according to the policy and return its result.
+
+        @raise CircuitOpenError: If the circuit breaker is open.
+        """
+        deadline = None if self.deadline is None else default_timer() + self.deadline
+        retry = 0
+        while True:
+            try:
+                return self._perform(corba_object, method, args, deadline)
+            except self.retry_exceptions as error:
+                retry += 1
+                if retry > self.retries:
+                    raise
+                delay = self.get_delay(retry)
+                if deadline is not None and default_timer() + delay >= deadline:
+                    raise
+                _LOGGER.info("%s failed with %s, retry %d in %.3f seconds.", method, error, retry, delay)
+                time.sleep(delay)
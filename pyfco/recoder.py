@@ -19,17 +19,79 @@ from __future__ import unicode_literals
 
 import codecs
 import copy
+import inspect
+import itertools
+import keyword
+import operator
 import re
-from datetime import datetime
+import threading
+import weakref
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime
+from timeit import default_timer
 
 import pytz
 import six
 from fred_idl.Registry import IsoDate, IsoDateTime
-from omniORB import EnumItem, StructBase
+from omniORB import EnumItem, StructBase, findType, tcInternal
+
+try:
+    from collections.abc import Sequence
+except ImportError:  # pragma: no cover
+    # Python 2
+    from collections import Sequence
 
 ISO_DATETIME_PATTERN = re.compile(r'^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})T'
                                   r'(?P<hour>\d{2}):(?P<minute>\d{2}):(?P<second>\d{2})(.(?P<microsecond>\d{6}))?'
                                   r'(?P<tzinfo>Z|[+-]\d{2}:?\d{2})$')
+ISO_TZINFO_PATTERN = re.compile(r'^(Z|[+-]\d{2}:?\d{2})$')
+IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+# Method of dictionaries which returns set-like view of the keys.
+_KEYS_METHOD = 'keys' if six.PY3 else 'viewkeys'
+
+# Python types of the values of the simple omniORB type descriptors.
+_STRING_TYPES = (six.binary_type, six.text_type)
+DESCRIPTOR_TYPES = {
+    tcInternal.tv_null: (type(None), ),
+    tcInternal.tv_void: (type(None), ),
+    tcInternal.tv_short: six.integer_types,
+    tcInternal.tv_long: six.integer_types,
+    tcInternal.tv_ushort: six.integer_types,
+    tcInternal.tv_ulong: six.integer_types,
+    tcInternal.tv_longlong: six.integer_types,
+    tcInternal.tv_ulonglong: six.integer_types,
+    tcInternal.tv_octet: six.integer_types,
+    tcInternal.tv_float: (float, ),
+    tcInternal.tv_double: (float, ),
+    tcInternal.tv_boolean: (bool, ),
+    tcInternal.tv_char: _STRING_TYPES,
+    tcInternal.tv_string: _STRING_TYPES,
+    tcInternal.tv_wchar: (six.text_type, ),
+    tcInternal.tv_wstring: (six.text_type, ),
+    tcInternal.tv_enum: (EnumItem, ),
+}
+
+
+# Use fast parsers from Python 3.7+ for the formats validated beforehand.
+FROMISOFORMAT = hasattr(date, 'fromisoformat')
+# Time zones for the time zone designators of the decoded date times, filled on demand.
+_TZINFOS = {'Z': pytz.utc}
+
+
+def _get_tzinfo(designator):
+    """Return time zone for ISO time zone designator, e.g. `Z` or `+01:00`, or `None` if it's not valid."""
+    try:
+        return _TZINFOS[designator]
+    except KeyError:
+        if not ISO_TZINFO_PATTERN.match(designator):
+            return None
+        hours = int(designator[1:3])
+        minutes = int(designator[3:].strip(':'))
+        offset = minutes + 60 * hours
+        if designator[0] == '-':
+            offset = -offset
+        tzinfo = _TZINFOS[designator] = pytz.FixedOffset(offset)
+        return tzinfo
 
 
 def decode_iso_date(value):
@@ -37,7 +99,14 @@ def decode_iso_date(value):
 
     @raise ValueError: If date can't be parsed.
     """
-    return datetime.strptime(value.value, '%Y-%m-%d').date()
+    text = value.value
+    # Parse the usual format directly, it's much faster than `strptime`.
+    if len(text) == 10 and text[4] == '-' and text[7] == '-' and (text[:4] + text[5:7] + text[8:]).isdigit():
+        if FROMISOFORMAT:
+            return date.fromisoformat(text)
+        else:  # pragma: no cover
+            return date(int(text[:4]), int(text[5:7]), int(text[8:]))
+    return datetime.strptime(text, '%Y-%m-%d').date()
 
 
 def encode_iso_date(value):
@@ -50,21 +119,28 @@ def decode_iso_datetime(value):
 
     @raise ValueError: If date time can't be parsed.
     """
-    match = ISO_DATETIME_PATTERN.match(value.value)
+    text = value.value
+    # Parse the usual format directly, it's much faster than the regular expression.
+    digits = text[:4] + text[5:7] + text[8:10] + text[11:13] + text[14:16] + text[17:19]
+    if len(text) >= 20 and text[4] == '-' and text[7] == '-' and text[10] == 'T' and text[13] == ':' \
+            and text[16] == ':' and digits.isdigit():
+        if text[19] == '.' and text[20:26].isdigit() and len(text) > 26:
+            local, tzinfo = text[:26], _get_tzinfo(text[26:])
+        else:
+            local, tzinfo = text[:19], _get_tzinfo(text[19:])
+        if tzinfo is not None:
+            if FROMISOFORMAT:
+                return datetime.fromisoformat(local).replace(tzinfo=tzinfo)
+            else:  # pragma: no cover
+                microsecond = int(local[20:]) if len(local) > 19 else 0
+                return datetime(int(text[:4]), int(text[5:7]), int(text[8:10]), int(text[11:13]),
+                                int(text[14:16]), int(text[17:19]), microsecond, tzinfo)
+
+    match = ISO_DATETIME_PATTERN.match(text)
     if match is None:
         raise ValueError("{} datetime can't be decoded.".format(value))
     kwargs = {k: int(v) for k, v in match.groupdict().items() if k != 'tzinfo' and v is not None}
-    tzinfo = match.group('tzinfo')
-    if tzinfo == 'Z':
-        kwargs['tzinfo'] = pytz.utc
-    else:
-        hours = int(tzinfo[1:3])
-        minutes = int(tzinfo[3:].strip(':'))
-        offset = minutes + 60 * hours
-        sign = tzinfo[0]
-        if sign == '-':
-            offset = -offset
-        kwargs['tzinfo'] = pytz.FixedOffset(offset)
+    kwargs['tzinfo'] = _get_tzinfo(match.group('tzinfo'))
     return datetime(**kwargs)
 
 
@@ -75,6 +151,305 @@ def encode_iso_datetime(value):
     return IsoDateTime(value.isoformat())
 
 
+def get_struct_descriptor(cls):
+    """Return omniORB type descriptor of the corba structure class or `None`, if it isn't registered."""
+    descriptor = findType(getattr(cls, '_NP_RepositoryId', None))
+    if descriptor is not None and descriptor[0] == tcInternal.tv_struct and descriptor[1] is cls:
+        return descriptor
+    return None
+
+
+def get_struct_fields(cls):
+    """Return names of the fields of the corba structure class in the order of its constructor arguments.
+
+    Fields are taken from the omniORB type descriptor of the structure, if it is registered,
+    or from the arguments of the `__init__` method otherwise.
+
+    @return: Field names or `None`, if they can't be determined.
+    """
+    descriptor = get_struct_descriptor(cls)
+    if descriptor is not None:
+        return tuple(descriptor[4::2])
+
+    try:
+        # Use newer call in Python 3
+        if hasattr(inspect, 'getfullargspec'):
+            spec = inspect.getfullargspec(cls.__init__)
+            if spec.kwonlyargs:
+                return None
+        else:
+            spec = inspect.getargspec(cls.__init__)
+    except TypeError:
+        # Constructor is not a python function.
+        return None
+    if spec.varargs is not None or len(spec.args) < 2:
+        return None
+    return tuple(spec.args[1:])
+
+
+def _compile_struct_recoder(cls, fields, recode, fallback, recoded=None):
+    """Return function which recodes corba structures of `cls` field by field.
+
+    @param cls: Corba structure class.
+    @param fields: Names of the structure fields.
+    @param recode: Function used to recode the field values.
+    @param fallback: Function used for instances with other attributes than `fields`,
+        e.g. if the constructor arguments are stored under other names.
+    @param recoded: Names of the fields to be recoded, other fields are kept as they are. All fields if `None`.
+    """
+    for field in fields:
+        if not IDENTIFIER_PATTERN.match(field) or keyword.iskeyword(field):
+            return fallback
+    if recoded is None:
+        recoded = fields
+    args = ', '.join(('recode(val.{})' if field in recoded else 'val.{}').format(field) for field in fields)
+    source = ('def recode_struct(val):\n'
+              '    if val.__dict__.{keys}() != fields:\n'
+              '        return fallback(val)\n'
+              '    return cls({args})\n').format(keys=_KEYS_METHOD, args=args)
+    namespace = {'cls': cls, 'recode': recode, 'fallback': fallback, 'fields': frozenset(fields)}
+    six.exec_(source, namespace)
+    return namespace['recode_struct']
+
+
+class MemoizedDecoder(object):
+    """Decode function with bounded LRU memo of the decoded values.
+
+    Values are memoized by their `value` attribute, which makes it suitable for `IsoDate` and `IsoDateTime` structures.
+    Only immutable objects should be returned by the decode function, since they are shared.
+
+    @ivar function: Decode function.
+    @ivar maxsize: Maximal number of memoized values.
+    @ivar hits: Number of values found in the memo.
+    @ivar misses: Number of values which had to be decoded.
+    """
+
+    def __init__(self, function, maxsize=1024):
+        self.function = function
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        key = value.value
+        with self._lock:
+            if key in self._memo:
+                self.hits += 1
+                # Move the value to the end
+                result = self._memo[key] = self._memo.pop(key)
+                return result
+        result = self.function(value)
+        with self._lock:
+            self.misses += 1
+            self._memo[key] = result
+            if len(self._memo) > self.maxsize:
+                self._memo.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Clear memoized values and counters."""
+        with self._lock:
+            self._memo.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+ProfileStat = namedtuple('ProfileStat', ['operation', 'type', 'count', 'time', 'own_time', 'max_depth'])
+
+
+class RecoderProfile(object):
+    """Profile of the values recoded by `CorbaRecoder`.
+
+    Values are profiled by the operation and their type - repository ID for the corba structures and class name
+    for other types. Time of a value includes the time of its children, own time doesn't.
+
+    @ivar started: Time when the profile was started.
+    @ivar stopped: Time when the profile was stopped or `None`.
+    """
+
+    def __init__(self):
+        self.started = default_timer()
+        self.stopped = None
+        # Statistics by operation and type - [count, time, own time, max depth]
+        self._stats = {}
+        self._lock = threading.Lock()
+        # Depth and times of the children of the values being recoded, per thread.
+        self._local = threading.local()
+
+    def wrap(self, function, cls, operation):
+        """Return recode function which profiles the values of the class."""
+        key = (operation, getattr(cls, '_NP_RepositoryId', None) or cls.__name__)
+        local = self._local
+
+        def profiled(val):
+            children = getattr(local, 'children', None)
+            if children is None:
+                children = local.children = []
+            children.append(0.0)
+            start = default_timer()
+            try:
+                return function(val)
+            finally:
+                elapsed = default_timer() - start
+                own_time = elapsed - children.pop()
+                depth = len(children) + 1
+                if children:
+                    children[-1] += elapsed
+                with self._lock:
+                    stat = self._stats.get(key)
+                    if stat is None:
+                        stat = self._stats[key] = [0, 0.0, 0.0, 0]
+                    stat[0] += 1
+                    stat[1] += elapsed
+                    stat[2] += own_time
+                    stat[3] = max(stat[3], depth)
+
+        profiled.__wrapped__ = function
+        return profiled
+
+    def get_stats(self):
+        """Return list of the statistics sorted by own time.
+
+        @rtype: [ProfileStat, ...]
+        """
+        with self._lock:
+            stats = [ProfileStat(operation, name, *stat) for (operation, name), stat in self._stats.items()]
+        return sorted(stats, key=lambda s: (-s.own_time, s.operation, s.type))
+
+    def report(self):
+        """Return text report of the profile."""
+        stopped = default_timer() if self.stopped is None else self.stopped
+        header = ('operation', 'type', 'count', 'time', 'own time', 'max depth')
+        lines = ['Recoder profile of {:.6f} seconds'.format(stopped - self.started),
+                 '{:<10}{:<40}{:>10}{:>12}{:>12}{:>10}'.format(*header)]
+        for stat in self.get_stats():
+            lines.append('{:<10}{:<40}{:>10}{:>12.6f}{:>12.6f}{:>10}'.format(*stat))
+        return '\n'.join(lines)
+
+
+# Marks items of `LazySequence` which weren't decoded yet.
+_NOT_DECODED = object()
+
+
+class LazySequence(Sequence):
+    """Sequence which decodes its items when they are accessed for the first time.
+
+    Decoded items are cached, the raw sequence is released once all items are decoded.
+    Slices are returned as lists of decoded items.
+    Items may be accessed from several threads, an item decoded concurrently is stored only once.
+    """
+
+    def __init__(self, raw, decode):
+        """Initialize instance.
+
+        @param raw: Sequence of the raw items.
+        @param decode: Function which decodes the raw item.
+        """
+        self._raw = raw
+        self._decode = decode
+        self._items = [_NOT_DECODED] * len(raw)
+        self._missing = len(raw)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if item is _NOT_DECODED:
+            with self._lock:
+                item = self._items[index]
+                raw = self._raw
+            if item is _NOT_DECODED:
+                # Decode without the lock, other items may be decoded meanwhile.
+                decoded = self._decode(raw[index])
+                with self._lock:
+                    item = self._items[index]
+                    if item is _NOT_DECODED:
+                        item = self._items[index] = decoded
+                        self._missing -= 1
+                        if not self._missing:
+                            self._raw = None
+        return item
+
+    def __iter__(self):
+        for index in range(len(self._items)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (LazySequence, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<{} of {} items, {} decoded>'.format(type(self).__name__, len(self._items),
+                                                     len(self._items) - self._missing)
+
+
+# Types of the values, which can't be changed in place, so their raw values may be reused when unchanged.
+_IMMUTABLE_TYPES = frozenset(six.integer_types + (float, bool, type(None), six.text_type, six.binary_type, date,
+                                                  datetime, EnumItem))
+
+
+class _ProvenanceTable(object):
+    """Weak side table of the raw values of the decoded structures.
+
+    Entries are kept only while the decoded structures are alive. Every entry contains
+     * the raw structure,
+     * names of the fields,
+     * decoded values of the fields,
+     * raw values of the fields,
+     * mutable fields - `index => items`, where items is a tuple of the items of a list or tuple, `None` otherwise.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def add(self, decoded, raw):
+        """Record raw structure of the decoded one."""
+        key = id(decoded)
+        try:
+            ref = weakref.ref(decoded, lambda ref: self._remove(key, ref))
+        except TypeError:
+            # Structure doesn't support weak references.
+            return
+        names = tuple(decoded.__dict__)
+        values = tuple(decoded.__dict__.values())
+        raw_values = tuple(raw.__dict__.get(name) for name in names)
+        mutable = {}
+        for index, value in enumerate(values):
+            if type(value) not in _IMMUTABLE_TYPES:
+                mutable[index] = tuple(value) if type(value) in (list, tuple) else None
+        self._entries[key] = (ref, raw, names, values, raw_values, mutable)
+
+    def _remove(self, key, ref):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is ref:
+            del self._entries[key]
+
+    def get(self, decoded):
+        """Return entry of the decoded structure without the reference or `None`."""
+        entry = self._entries.get(id(decoded))
+        if entry is None or entry[0]() is not decoded:
+            return None
+        return entry[1:]
+
+    def __len__(self):
+        return len(self._entries)
+
+
 class UnsupportedEncodingError(Exception):
     pass
 
@@ -83,17 +458,54 @@ class CorbaRecoder(object):
     """Encode and decode corba entities to python entities.
 
     Essentially converts corba strings to python strings (type depends on specified encoding).
+
+    @ivar skip_identity: Whether to use omniORB type descriptors to find structure fields which can't be changed
+        by decoding. Such fields are not decoded at all and structures with no such fields are returned as they are.
+    @ivar copy_skipped: Whether to return shallow copies of the structures skipped by decoding.
+    @ivar iso_dates: Whether to recode `IsoDate` and `IsoDateTime` structures to `date` and `datetime` objects.
+    @ivar memos: Memoized decoders of `IsoDate` and `IsoDateTime` structures by their classes.
+    @type memos: {type: MemoizedDecoder}
+    @ivar profile: Profile of the recoded values, `None` if profiling isn't started.
+    @type profile: RecoderProfile
+    @ivar provenance: Whether to keep raw values of the decoded structures, so encoding reuses their unchanged fields.
+        Raw structures are kept in memory while the decoded ones are alive.
+    @ivar in_place: Whether answers owned by the caller should be decoded in place, see `decode_in_place`.
     """
 
-    def __init__(self, coding='ascii'):
+    # Caches filled on demand, which are cleared when recode functions change.
+    _cache_attributes = ('_encode_cache', '_decode_cache', '_struct_encoders', '_struct_decoders', '_in_place_cache')
+
+    def __init__(self, coding='ascii', skip_identity=False, copy_skipped=False, iso_dates=False, iso_dates_memo=0,
+                 provenance=False, in_place=False):
+        """Initialize instance.
+
+        @param iso_dates_memo: Maximal number of decoded `IsoDate` and `IsoDateTime` values to be memoized,
+            zero disables the memo.
+        """
         try:
             codecs.lookup(coding)
             self.coding = coding
         except LookupError as e:
             raise UnsupportedEncodingError(e)
+        self.skip_identity = skip_identity
+        self.copy_skipped = copy_skipped
+        self.iso_dates = iso_dates
+        self.memos = {}
+        self.profile = None
+        self.provenance = provenance
+        self._provenance = _ProvenanceTable() if provenance else None
+        self.in_place = in_place
 
         self.encode_functions = {}
         self.decode_functions = {}
+        # Functions resolved for concrete classes, filled on demand.
+        self._encode_cache = {}
+        self._decode_cache = {}
+        # Functions compiled for corba structure classes, filled on demand.
+        self._struct_encoders = {}
+        self._struct_decoders = {}
+        # Decode functions of the classes, `None` for lists and structures decoded in place.
+        self._in_place_cache = {}
 
         # Strings encoding
         if six.PY2:
@@ -117,9 +529,48 @@ class CorbaRecoder(object):
         # Do not decode/encode enum items
         self.add_recode_function(EnumItem, self._identity, self._identity)
 
+        if iso_dates:
+            date_decoder = decode_iso_date
+            datetime_decoder = decode_iso_datetime
+            if iso_dates_memo:
+                date_decoder = self.memos[IsoDate] = MemoizedDecoder(decode_iso_date, iso_dates_memo)
+                datetime_decoder = self.memos[IsoDateTime] = MemoizedDecoder(decode_iso_datetime, iso_dates_memo)
+            self.add_recode_function(IsoDate, date_decoder, self._encode_struct)
+            self.add_recode_function(IsoDateTime, datetime_decoder, self._encode_struct)
+            self.add_recode_function(date, self._identity, encode_iso_date)
+            self.add_recode_function(datetime, self._identity, encode_iso_datetime)
+
     def add_recode_function(self, typeobj, decode_function, encode_function):
         self.decode_functions[typeobj] = decode_function
         self.encode_functions[typeobj] = encode_function
+        # New function may change the resolution of any class already resolved
+        # as well as the fields which need decoding.
+        self._clear_caches()
+
+    def _clear_caches(self):
+        for name in self._cache_attributes:
+            getattr(self, name).clear()
+
+    def start_profile(self):
+        """Start profiling of the recoded values and return the profile.
+
+        @rtype: RecoderProfile
+        """
+        self.profile = RecoderProfile()
+        self._clear_caches()
+        return self.profile
+
+    def stop_profile(self):
+        """Stop profiling of the recoded values and return the profile.
+
+        @rtype: RecoderProfile
+        """
+        profile = self.profile
+        if profile is not None:
+            profile.stopped = default_timer()
+        self.profile = None
+        self._clear_caches()
+        return profile
 
     def _identity(self, val):
         return val
@@ -140,9 +591,170 @@ class CorbaRecoder(object):
         """Iterate over iterable and recursively encode."""
         return type(val)([self.encode(x) for x in val])
 
+    def _needs_decode(self, descriptor, pending=frozenset()):
+        """Return whether values described by omniORB type descriptor may be changed by decoding.
+
+        @param pending: Repository IDs of the structures being inspected, used to stop on recursive types.
+        """
+        if isinstance(descriptor, six.integer_types):
+            kind = descriptor
+        else:
+            kind = descriptor[0]
+
+        if kind in DESCRIPTOR_TYPES:
+            return self._types_need_decode(DESCRIPTOR_TYPES[kind])
+        elif kind == tcInternal.tv_alias:
+            return self._needs_decode(descriptor[3], pending)
+        elif kind == tcInternal.tv__indirect:
+            target = descriptor[1][0]
+            if isinstance(target, six.string_types):
+                target = findType(target)
+            return target is None or self._needs_decode(target, pending)
+        elif kind in (tcInternal.tv_sequence, tcInternal.tv_array):
+            if descriptor[1] in (tcInternal.tv_octet, tcInternal.tv_char):
+                # Sequences of octets and characters are strings.
+                return self._types_need_decode(_STRING_TYPES)
+            function = self._get_decode_function(list)
+            return getattr(function, '__wrapped__', function) != self._decode_iter \
+                or self._needs_decode(descriptor[1], pending)
+        elif kind == tcInternal.tv_struct:
+            return self._struct_needs_decode(descriptor, pending)
+        else:
+            # Unions, anys, object references, etc. are decoded in any case.
+            return True
+
+    def _types_need_decode(self, types):
+        """Return whether instances of any of the types may be changed by decoding."""
+        functions = (self._get_decode_function(t) for t in types)
+        return any(getattr(f, '__wrapped__', f) != self._identity for f in functions)
+
+    def _struct_needs_decode(self, descriptor, pending):
+        """Return whether structures described by omniORB type descriptor may be changed by decoding."""
+        function = self._get_decode_function(descriptor[1])
+        # Profiled functions are wrapped.
+        function = getattr(function, '__wrapped__', function)
+        if function == self._identity:
+            return False
+        if function != self._decode_struct:
+            return True
+        if descriptor[2] in pending:
+            # Recursive structure, the result is determined by the other fields.
+            return False
+        pending = pending | {descriptor[2]}
+        return any(self._needs_decode(d, pending) for d in descriptor[5::2])
+
+    def _get_struct_decode_fields(self, cls):
+        """Return names of the fields of the structure class and names of the fields which need decoding.
+
+        @return: Pair of field names, `None` if they can't be determined,
+            and names of the fields to be decoded, `None` if all of them.
+        """
+        fields = get_struct_fields(cls)
+        recoded = None
+        if fields is not None and self.skip_identity:
+            descriptor = get_struct_descriptor(cls)
+            if descriptor is not None:
+                recoded = tuple(name for name, field_descriptor in zip(descriptor[4::2], descriptor[5::2])
+                                if self._needs_decode(field_descriptor))
+        return fields, recoded
+
+    def _get_skipped_function(self):
+        """Return function used for structures skipped by decoding."""
+        return copy.copy if self.copy_skipped else self._identity
+
+    def _compile_struct_decoder(self, cls):
+        """Return function which decodes structures of the class."""
+        fields, recoded = self._get_struct_decode_fields(cls)
+        if fields is None:
+            return self._decode_struct_attributes
+        if recoded is not None and not recoded:
+            return self._get_skipped_function()
+        return _compile_struct_recoder(cls, fields, self.decode, self._decode_struct_attributes, recoded)
+
     def _decode_struct(self, val):
         """Return decoded Corba structure.
 
+        Decodes all fields.
+        """
+        try:
+            function = self._struct_decoders[val.__class__]
+        except KeyError:
+            function = self._struct_decoders[val.__class__] = self._compile_struct_decoder(val.__class__)
+        if self._provenance is not None:
+            answer = function(val)
+            if answer is not val:
+                self._provenance.add(answer, val)
+            return answer
+        return function(val)
+
+    def _encode_struct(self, val):
+        """Return encoded Corba structure.
+
+        Encodes all fields.
+        """
+        if self._provenance is not None:
+            entry = self._provenance.get(val)
+            if entry is not None:
+                return self._encode_struct_provenance(val, *entry)
+        try:
+            function = self._struct_encoders[val.__class__]
+        except KeyError:
+            fields = get_struct_fields(val.__class__)
+            if fields is None:
+                function = self._encode_struct_attributes
+            else:
+                function = _compile_struct_recoder(val.__class__, fields, self.encode, self._encode_struct_attributes)
+            self._struct_encoders[val.__class__] = function
+        return function(val)
+
+    def _encode_struct_provenance(self, val, raw, names, values, raw_values, mutable):
+        """Return encoded Corba structure, reuse raw values of the unchanged fields.
+
+        Immutable fields are unchanged if they are equal to the decoded values, mutable fields only if they are
+        identical and their items or fields are unchanged as well.
+        """
+        fields = val.__dict__
+        if tuple(fields) != names or len(raw.__dict__) != len(names):
+            # Fields were added or removed.
+            return self._encode_struct_attributes(val)
+        current = tuple(fields.values())
+        changed = {}
+        if current != values:
+            # Encode replaced immutable fields.
+            for index in itertools.compress(itertools.count(), map(operator.is_not, current, values)):
+                if index not in mutable:
+                    encoded = self.encode(current[index])
+                    if encoded is not raw_values[index]:
+                        changed[names[index]] = encoded
+        for index, items in six.iteritems(mutable):
+            value = current[index]
+            raw_value = raw_values[index]
+            if value is values[index] and items is not None and self._items_unchanged(value, items, raw_value):
+                continue
+            encoded = self.encode(value)
+            if encoded is not raw_value:
+                changed[names[index]] = encoded
+        if not changed:
+            return raw
+        answer = raw.__class__.__new__(raw.__class__)
+        answer.__dict__.update(raw.__dict__)
+        answer.__dict__.update(changed)
+        return answer
+
+    def _items_unchanged(self, value, items, raw_value):
+        """Return whether items of the decoded list or tuple are unchanged, so its raw value can be reused."""
+        if len(value) != len(items) or len(raw_value) != len(items):
+            return False
+        for item, decoded, raw_item in zip(value, items, raw_value):
+            if item is not decoded:
+                return False
+            if type(item) not in _IMMUTABLE_TYPES and self.encode(item) is not raw_item:
+                return False
+        return True
+
+    def _decode_struct_attributes(self, val):
+        """Return decoded Corba structure.
+
         Decodes all attributes.
         """
         answer = copy.copy(val)
@@ -154,7 +766,7 @@ class CorbaRecoder(object):
                 answer.__dict__[name] = self.decode(item)
         return answer
 
-    def _encode_struct(self, val):
+    def _encode_struct_attributes(self, val):
         """Return encoded Corba structure.
 
         Encodes all attributes.
@@ -176,25 +788,275 @@ class CorbaRecoder(object):
         """Raise error on other types. Can be overridden to encode it."""
         raise ValueError("%s can not be encoded." % val)
 
-    def _get_parents(self, val):
-        """Return all parents of the instance."""
-        return (val.__class__, ) + val.__class__.__bases__
+    def _resolve_function(self, cls, functions, other_function):
+        """Return function registered for the closest parent of the class."""
+        for parent in inspect.getmro(cls):
+            if parent in functions:
+                return functions[parent]
+        else:
+            return other_function  # other unsupported type
+
+    def _get_decode_function(self, cls):
+        """Return function which decodes instances of the class."""
+        try:
+            return self._decode_cache[cls]
+        except KeyError:
+            function = self._resolve_function(cls, self.decode_functions, self._decode_other)
+            if self.profile is not None:
+                function = self.profile.wrap(function, cls, 'decode')
+            self._decode_cache[cls] = function
+            return function
+
+    def _get_encode_function(self, cls):
+        """Return function which encodes instances of the class."""
+        try:
+            return self._encode_cache[cls]
+        except KeyError:
+            function = self._resolve_function(cls, self.encode_functions, self._encode_other)
+            if self.profile is not None:
+                function = self.profile.wrap(function, cls, 'encode')
+            self._encode_cache[cls] = function
+            return function
 
     def decode(self, answer):
         """Return answer decoded from Corba to Python."""
-        for cls in self._get_parents(answer):
-            if cls in self.decode_functions:
-                return self.decode_functions[cls](answer)
-        else:
-            return self._decode_other(answer)  # other unsupported type
+        try:
+            function = self._decode_cache[answer.__class__]
+        except KeyError:
+            function = self._get_decode_function(answer.__class__)
+        return function(answer)
 
     def encode(self, answer):
         """Return answer encoded from Python to Corba."""
-        for cls in self._get_parents(answer):
-            if cls in self.encode_functions:
-                return self.encode_functions[cls](answer)
-        else:
-            return self._encode_other(answer)  # other unsupported type
+        try:
+            function = self._encode_cache[answer.__class__]
+        except KeyError:
+            function = self._get_encode_function(answer.__class__)
+        return function(answer)
+
+    def _get_in_place_function(self, cls):
+        """Return function which decodes instances of the class or `None` if they are decoded in place."""
+        try:
+            return self._in_place_cache[cls]
+        except KeyError:
+            function = self._get_decode_function(cls)
+            if getattr(function, '__wrapped__', function) in (self._decode_iter, self._decode_struct) \
+                    and issubclass(cls, (list, StructBase)):
+                function = None
+            self._in_place_cache[cls] = function
+            return function
+
+    def decode_in_place(self, answer):
+        """Return answer decoded from Corba to Python, lists and structures are modified in place.
+
+        Only the values which are changed by decoding are replaced, no lists and structures are copied.
+        The answer must not be used by anyone else. Tuples are decoded by `decode`, provenance is not recorded.
+        """
+        function = self._get_in_place_function(answer.__class__)
+        if function is not None:
+            return function(answer)
+        cache = self._in_place_cache
+        stack = [answer]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, list):
+                items = enumerate(value)
+                setter = value.__setitem__
+            else:
+                items = six.iteritems(value.__dict__)
+                setter = value.__dict__.__setitem__
+            for key, item in items:
+                try:
+                    function = cache[item.__class__]
+                except KeyError:
+                    function = self._get_in_place_function(item.__class__)
+                if function is None:
+                    stack.append(item)
+                else:
+                    decoded = function(item)
+                    if decoded is not item:
+                        setter(key, decoded)
+        return answer
+
+    def decode_lazy(self, answer):
+        """Return answer decoded from Corba to Python, lists and tuples are decoded lazily by `LazySequence`."""
+        function = self._get_decode_function(answer.__class__)
+        if getattr(function, '__wrapped__', function) == self._decode_iter:
+            return LazySequence(answer, self.decode)
+        return self.decode(answer)
+
+
+def _make_node(function, fields=None, recoded=None):
+    """Return node describing how `IterativeCorbaRecoder` walks instances of a list, tuple or structure class.
+
+    Node is a tuple of
+     * recode function used for instances which can't be walked,
+     * names of the structure fields, `None` for lists and tuples,
+     * function which returns tuple of values of the recoded fields,
+     * flags whether the fields are recoded, `None` if all of them,
+     * set of the field names, `None` for lists and tuples.
+    """
+    if fields is None:
+        return (function, None, None, None, None)
+    if recoded is None:
+        mask = None
+        walked = fields
+    else:
+        mask = tuple(field in recoded for field in fields)
+        walked = recoded
+    if len(walked) == 1:
+        field_getter = operator.attrgetter(walked[0])
+
+        def getter(val):
+            return (field_getter(val), )
+    else:
+        getter = operator.attrgetter(*walked)
+    return (function, fields, getter, mask, frozenset(fields))
+
+
+def _build_node(node, val, results):
+    """Return recoded value from its recoded children."""
+    fields = node[1]
+    if fields is None:
+        # Results are a new list already.
+        return results if val.__class__ is list else val.__class__(results)
+    mask = node[3]
+    if mask is None:
+        return val.__class__(*results)
+    recoded = iter(results)
+    return val.__class__(*[next(recoded) if m else getattr(val, f) for f, m in zip(fields, mask)])
+
+
+class IterativeCorbaRecoder(CorbaRecoder):
+    """Corba recoder which walks the values using an explicit stack instead of recursion.
+
+    Produces the same results as `CorbaRecoder`, but nesting of the values isn't limited by the recursion limit.
+    It's meant only for deeply nested values, it isn't faster than `CorbaRecoder` - walking the values
+    in python code is about 10-30 % slower than the recursive calls of the compiled structure recoders.
+    Lists, tuples and structures are walked only if they are recoded by the default recode functions,
+    other recode functions are called as they are.
+    When profiling or with provenance, values are recoded recursively by `CorbaRecoder`.
+    """
+
+    _cache_attributes = CorbaRecoder._cache_attributes + ('_decode_leaves', '_decode_nodes', '_encode_leaves',
+                                                          '_encode_nodes')
+
+    def __init__(self, *args, **kwargs):
+        # Recode functions of the classes, which are not walked, and nodes of the classes, which are. Filled on demand.
+        self._decode_leaves = {}
+        self._decode_nodes = {}
+        self._encode_leaves = {}
+        self._encode_nodes = {}
+        super(IterativeCorbaRecoder, self).__init__(*args, **kwargs)
+
+    def _add_decode_node(self, cls):
+        """Find out how to decode instances of the class.
+
+        @return: Pair of recode function, if instances are not walked, and node, if they are.
+        """
+        function = self._get_decode_function(cls)
+        if function == self._decode_iter:
+            node = self._decode_nodes[cls] = _make_node(function)
+            return None, node
+        elif function == self._decode_struct:
+            fields, recoded = self._get_struct_decode_fields(cls)
+            if recoded is not None and not recoded:
+                function = self._get_skipped_function()
+            elif fields is not None:
+                node = self._decode_nodes[cls] = _make_node(function, fields, recoded)
+                return None, node
+        self._decode_leaves[cls] = function
+        return function, None
+
+    def _add_encode_node(self, cls):
+        """Find out how to encode instances of the class.
+
+        @return: Pair of recode function, if instances are not walked, and node, if they are.
+        """
+        function = self._get_encode_function(cls)
+        fields = None
+        if function == self._encode_struct:
+            fields = get_struct_fields(cls)
+        if function == self._encode_iter or fields is not None:
+            node = self._encode_nodes[cls] = _make_node(function, fields)
+            return None, node
+        self._encode_leaves[cls] = function
+        return function, None
+
+    def _walk(self, answer, leaves, nodes, add_node):
+        """Return answer recoded by the nodes.
+
+        @param leaves: Cache of recode functions of the classes, which are not walked.
+        @param nodes: Cache of the nodes of the classes, which are walked.
+        @param add_node: Function which adds class to one of the caches and returns the added item.
+        """
+        get_leaf = leaves.get
+        get_node = nodes.get
+        viewkeys = six.viewkeys
+        # Frame being recoded - node and value being recoded, its children, children already recoded
+        # and index of the next child. Parent frames are kept in the stack.
+        node = value = None
+        children = (answer, )
+        results = []
+        append = results.append
+        index = 0
+        stack = []
+        while True:
+            count = len(children)
+            while index < count:
+                child = children[index]
+                index += 1
+                cls = child.__class__
+                function = get_leaf(cls)
+                if function is None:
+                    child_node = get_node(cls)
+                    if child_node is None:
+                        function, child_node = add_node(cls)
+                        if function is not None:
+                            append(function(child))
+                            continue
+                else:
+                    append(function(child))
+                    continue
+
+                fields = child_node[1]
+                if fields is None:
+                    if not child:
+                        append(cls())
+                        continue
+                    grandchildren = child
+                elif viewkeys(child.__dict__) == child_node[4]:
+                    grandchildren = child_node[2](child)
+                else:
+                    append(child_node[0](child))
+                    continue
+                stack.append((node, value, children, results, index))
+                node = child_node
+                value = child
+                children = grandchildren
+                results = []
+                append = results.append
+                index = 0
+                count = len(children)
+
+            if not stack:
+                return results[0]
+            recoded = _build_node(node, value, results)
+            node, value, children, results, index = stack.pop()
+            append = results.append
+            append(recoded)
+
+    def decode(self, answer):
+        """Return answer decoded from Corba to Python."""
+        if self.profile is not None or self.provenance:
+            return super(IterativeCorbaRecoder, self).decode(answer)
+        return self._walk(answer, self._decode_leaves, self._decode_nodes, self._add_decode_node)
+
+    def encode(self, answer):
+        """Return answer encoded from Python to Corba."""
+        if self.profile is not None or self.provenance:
+            return super(IterativeCorbaRecoder, self).encode(answer)
+        return self._walk(answer, self._encode_leaves, self._encode_nodes, self._add_encode_node)
 
 
 recoder = CorbaRecoder('utf-8')
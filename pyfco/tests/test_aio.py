@@ -0,0 +1,211 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Test `pyfco.aio` module."""
+from __future__ import unicode_literals
+
+import threading
+import unittest
+
+import six
+from mock import Mock, call, patch, sentinel
+from omniORB import CORBA
+
+from pyfco.cache import LruCache
+from pyfco.client import CorbaClient
+from pyfco.metrics import MemoryMetricsSink
+from pyfco.recoder import LazySequence
+
+from .test_client import CustomError, InternalServerError, SentinelRecoder
+
+if six.PY3:  # pragma: no cover
+    import asyncio
+
+    from pyfco.aio import AsyncCorbaClient, AsyncCorbaClientProxy
+
+
+@unittest.skipUnless(six.PY3, "This tests requires python 3 only")  # pragma: no cover
+class TestAsyncCorbaClient(unittest.TestCase):
+    """Test `AsyncCorbaClient` class."""
+
+    def setUp(self):
+        self.corba_object = Mock(spec=['method'])
+        self.corba_object.method.return_value = sentinel.result
+        self.client = CorbaClient(self.corba_object, SentinelRecoder(), InternalServerError)
+        self.async_client = AsyncCorbaClient(self.client, max_workers=2)
+        self.addCleanup(self.async_client.close)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(asyncio.set_event_loop, None)
+
+    def run_gather(self, *awaitables):
+        return self.loop.run_until_complete(asyncio.gather(*awaitables))
+
+    def test_call(self):
+        self.assertEqual(self.loop.run_until_complete(self.async_client.method(sentinel.arg)), sentinel.result)
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg)])
+
+    def test_unknown_method(self):
+        with self.assertRaisesRegexp(AttributeError, "has no method 'unknown'"):
+            self.async_client.unknown
+        with self.assertRaises(AttributeError):
+            self.async_client.__deepcopy__
+        self.assertEqual(self.corba_object.mock_calls, [])
+
+    def test_call_method(self):
+        self.assertEqual(self.loop.run_until_complete(self.async_client.call('method', sentinel.arg)),
+                         sentinel.result)
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg)])
+
+    def test_call_thread(self):
+        threads = []
+        self.corba_object.method.side_effect = lambda: threads.append(threading.current_thread())
+        self.loop.run_until_complete(self.async_client.method())
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_call_error(self):
+        self.corba_object.method.side_effect = CustomError
+        with self.assertRaises(CustomError):
+            self.loop.run_until_complete(self.async_client.method())
+
+    def test_call_corba_error(self):
+        self.corba_object.method.side_effect = CORBA.TRANSIENT
+        with self.assertRaises(CORBA.TRANSIENT):
+            self.loop.run_until_complete(self.async_client.method())
+
+    def test_call_executor(self):
+        executor = Mock(wraps=self.async_client.executor)
+        async_client = AsyncCorbaClient(self.client, executor=executor)
+        self.assertEqual(self.loop.run_until_complete(async_client.method()), sentinel.result)
+        self.assertEqual(len(executor.submit.mock_calls), 1)
+        async_client.close()
+        self.assertEqual(executor.shutdown.mock_calls, [])
+
+    def test_call_timeout(self):
+        event = threading.Event()
+        self.addCleanup(event.set)
+        self.corba_object.method.side_effect = lambda: event.wait(10)
+        self.async_client.timeout = 10
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(self.async_client.method(timeout=0.01))
+
+    def test_call_default_timeout(self):
+        event = threading.Event()
+        self.addCleanup(event.set)
+        self.corba_object.method.side_effect = lambda: event.wait(10)
+        self.async_client.timeout = 0.01
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(self.async_client.method())
+
+    def test_call_concurrent(self):
+        # All calls wait until all of them are performed.
+        barrier = threading.Barrier(2, timeout=10)
+        self.corba_object.method.side_effect = lambda arg: (barrier.wait(), arg)[1]
+        self.assertEqual(self.run_gather(self.async_client.method(sentinel.first),
+                                         self.async_client.method(sentinel.second)),
+                         [sentinel.first, sentinel.second])
+
+    def test_call_max_concurrency(self):
+        lock = threading.Lock()
+        running = []
+        maximum = []
+
+        def method(arg):
+            with lock:
+                running.append(arg)
+                maximum.append(len(running))
+            threading.Event().wait(0.01)
+            with lock:
+                running.remove(arg)
+            return arg
+
+        self.corba_object.method.side_effect = method
+        self.async_client.max_concurrency = 1
+        self.assertEqual(self.run_gather(self.async_client.method(sentinel.first),
+                                         self.async_client.method(sentinel.second)),
+                         [sentinel.first, sentinel.second])
+        self.assertEqual(maximum, [1, 1])
+
+    def test_call_max_concurrency_timeout(self):
+        # Timed out call occupies its slot until it finishes.
+        release = threading.Event()
+        self.addCleanup(release.set)
+        calls = []
+
+        def method(arg):
+            calls.append(arg)
+            if arg is sentinel.first:
+                release.wait(10)
+            return arg
+
+        self.corba_object.method.side_effect = method
+        self.async_client.max_concurrency = 1
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(self.async_client.method(sentinel.first, timeout=0.01))
+        second = self.loop.create_task(self.async_client.method(sentinel.second))
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.assertEqual(calls, [sentinel.first])
+
+        release.set()
+        self.assertEqual(self.loop.run_until_complete(second), sentinel.second)
+        self.assertEqual(calls, [sentinel.first, sentinel.second])
+
+    def test_call_decode(self):
+        self.corba_object.method.return_value = [sentinel.first]
+        self.client.lazy = True
+        result = self.loop.run_until_complete(self.async_client.method())
+        self.assertIsInstance(result, LazySequence)
+        self.assertEqual(result, [sentinel.first])
+
+    def test_metrics(self):
+        self.client.metrics = MemoryMetricsSink()
+        self.loop.run_until_complete(self.async_client.method())
+        self.async_client.decode_in_executor = True
+        self.loop.run_until_complete(self.async_client.method())
+        self.assertEqual(self.client.metrics.get_metrics()['method'].count, 2)
+
+    def test_call_cached(self):
+        self.client.caches = {'method': LruCache(ttl=10)}
+        self.assertEqual(self.loop.run_until_complete(self.async_client.method(b'arg')), sentinel.result)
+        self.assertEqual(self.loop.run_until_complete(self.async_client.method(b'arg')), sentinel.result)
+        self.assertEqual(self.corba_object.mock_calls, [call.method(b'arg')])
+
+    def test_call_decode_in_executor(self):
+        self.async_client.decode_in_executor = True
+        threads = []
+        with patch.object(self.client, '_decode', side_effect=lambda *args: threads.append(threading.current_thread())):
+            self.loop.run_until_complete(self.async_client.method())
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.current_thread(), threads)
+
+
+@unittest.skipUnless(six.PY3, "This tests requires python 3 only")  # pragma: no cover
+class TestAsyncCorbaClientProxy(unittest.TestCase):
+    """Test `AsyncCorbaClientProxy` class."""
+
+    def test_call(self):
+        corba_object = Mock(spec=['method'])
+        corba_object.method.return_value = sentinel.result
+        async_client = AsyncCorbaClient(CorbaClient(corba_object, SentinelRecoder(), InternalServerError))
+        self.addCleanup(async_client.close)
+        proxy = AsyncCorbaClientProxy(async_client)
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        self.assertEqual(loop.run_until_complete(proxy.method()), sentinel.result)
+        self.assertEqual(corba_object.mock_calls, [call.method()])
@@ -0,0 +1,269 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Test `pyfco.balancer` module."""
+from __future__ import unicode_literals
+
+import threading
+import unittest
+
+from mock import Mock, call, patch, sentinel
+from omniORB import CORBA
+
+from pyfco.balancer import LEAST_OUTSTANDING, BalancedNameServiceClient, BalancedObject
+from pyfco.client import CorbaClient
+from pyfco.policy import CallPolicy
+from pyfco.tests.test_client import InternalServerError, SentinelRecoder
+
+
+def _get_replica(name):
+    replica = Mock(spec=['method', '_non_existent'], name=name)
+    replica.method.return_value = name
+    replica._non_existent.return_value = False
+    return replica
+
+
+class TestBalancedObject(unittest.TestCase):
+    """Test `BalancedObject` class."""
+
+    def setUp(self):
+        self.first = _get_replica('first')
+        self.second = _get_replica('second')
+        self.balanced = BalancedObject([self.first, self.second])
+
+    def test_invalid(self):
+        with self.assertRaisesRegexp(ValueError, 'At least one replica'):
+            BalancedObject([])
+        with self.assertRaisesRegexp(ValueError, 'Unknown strategy'):
+            BalancedObject([self.first], strategy='random')
+
+    def test_round_robin(self):
+        self.assertEqual([self.balanced.method(sentinel.arg) for i in range(4)], ['first', 'second', 'first', 'second'])
+        self.assertEqual(self.first.mock_calls, [call.method(sentinel.arg)] * 2)
+
+    def test_least_outstanding(self):
+        self.balanced.strategy = LEAST_OUTSTANDING
+        self.balanced.replicas[0].outstanding = 1
+        self.assertEqual([self.balanced.method() for i in range(2)], ['second', 'second'])
+
+    def test_outstanding(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def method():
+            started.set()
+            release.wait()
+            return 'first'
+        self.first.method.side_effect = method
+        self.balanced.strategy = LEAST_OUTSTANDING
+        thread = threading.Thread(target=self.balanced.method)
+        thread.start()
+        started.wait()
+
+        self.assertEqual([r.outstanding for r in self.balanced.replicas], [1, 0])
+        self.assertEqual([self.balanced.method() for i in range(2)], ['second', 'second'])
+        release.set()
+        thread.join()
+        self.assertEqual([r.outstanding for r in self.balanced.replicas], [0, 0])
+
+    def test_failover(self):
+        self.first.method.side_effect = CORBA.TRANSIENT()
+
+        self.assertEqual([self.balanced.method() for i in range(3)], ['second', 'second', 'second'])
+
+        self.assertEqual(self.first.method.call_count, 1)
+        self.assertFalse(self.balanced.replicas[0].healthy)
+        self.assertTrue(self.balanced.replicas[1].healthy)
+
+    def test_failover_all(self):
+        self.first.method.side_effect = CORBA.TRANSIENT()
+        self.second.method.side_effect = CORBA.TRANSIENT()
+
+        with self.assertRaises(CORBA.TRANSIENT):
+            self.balanced.method()
+
+        self.assertEqual(self.first.method.call_count, 1)
+        self.assertEqual(self.second.method.call_count, 1)
+
+    def test_unhealthy_recovered(self):
+        for replica in self.balanced.replicas:
+            replica.healthy = False
+        self.assertEqual(self.balanced.method(), 'first')
+        self.assertTrue(self.balanced.replicas[0].healthy)
+
+    def test_other_error(self):
+        self.first.method.side_effect = InternalServerError()
+        with self.assertRaises(InternalServerError):
+            self.balanced.method()
+        self.assertEqual(self.second.mock_calls, [])
+
+    def test_check_health(self):
+        self.first._non_existent.side_effect = CORBA.TRANSIENT()
+        self.balanced.check_health()
+        self.assertEqual([r.healthy for r in self.balanced.replicas], [False, True])
+
+        self.first._non_existent.side_effect = None
+        self.second._non_existent.return_value = True
+        self.balanced.check_health()
+        self.assertEqual([r.healthy for r in self.balanced.replicas], [True, False])
+
+    def test_getattr(self):
+        with self.assertRaises(AttributeError):
+            self.balanced.unknown
+        with self.assertRaises(AttributeError):
+            self.balanced.__deepcopy__
+
+    def test_add_replica(self):
+        third = _get_replica('third')
+        self.balanced.add_replica(third)
+        self.assertEqual([r.obj for r in self.balanced.replicas], [self.first, self.second, third])
+        self.assertEqual([self.balanced.method() for i in range(3)], ['first', 'second', 'third'])
+
+    def test_replace_replica(self):
+        third = _get_replica('third')
+        self.balanced.replicas[0].healthy = False
+        replica = self.balanced.replace_replica(self.balanced.replicas[0], third)
+        self.assertEqual(self.balanced.replicas, [replica, self.balanced.replicas[1]])
+        self.assertEqual([r.obj for r in self.balanced.replicas], [third, self.second])
+        self.assertTrue(replica.healthy)
+
+    def test_client(self):
+        client = CorbaClient(self.balanced, SentinelRecoder(), InternalServerError)
+        self.assertEqual([client.method() for i in range(2)], ['first', 'second'])
+
+    def test_client_policy(self):
+        self.first.method.side_effect = CORBA.TRANSIENT()
+        client = CorbaClient(self.balanced, SentinelRecoder(), InternalServerError,
+                             policy=CallPolicy(timeout=1, retries=1, jitter=False))
+        with patch('pyfco.policy.omniORB.setClientThreadCallTimeout', autospec=True) as timeout_mock:
+            self.assertEqual(client.method(), 'second')
+        self.assertEqual(timeout_mock.mock_calls, [call(1000), call(0)])
+
+
+class TestBalancedNameServiceClient(unittest.TestCase):
+    """Test `BalancedNameServiceClient` class."""
+
+    def setUp(self):
+        self.client = BalancedNameServiceClient(['first:2809', 'second:2809'])
+        self.replicas = {}
+        for name_client in self.client.clients:
+            patcher = patch.object(name_client, 'get_object', side_effect=self._get_object(name_client.host_port))
+            self.addCleanup(patcher.stop)
+            patcher.start()
+
+    def _get_object(self, host_port):
+        def get_object(name, idl_object):
+            key = (host_port, name)
+            if key not in self.replicas:
+                self.replicas[key] = _get_replica('{}/{}'.format(*key))
+            return self.replicas[key]
+        return get_object
+
+    def test_init(self):
+        self.assertEqual([c.host_port for c in self.client.clients], ['first:2809', 'second:2809'])
+        self.assertEqual([c.context_name for c in self.client.clients], ['fred', 'fred'])
+
+    def test_get_object(self):
+        balanced = self.client.get_object('Logger', sentinel.idl_object, replicas=['Logger2'])
+
+        self.assertIsInstance(balanced, BalancedObject)
+        self.assertEqual([r.obj for r in balanced.replicas],
+                         [self.replicas[('first:2809', 'Logger')], self.replicas[('first:2809', 'Logger2')],
+                          self.replicas[('second:2809', 'Logger')], self.replicas[('second:2809', 'Logger2')]])
+        self.assertIs(self.client.get_object('Logger', sentinel.idl_object, replicas=['Logger2']), balanced)
+        self.assertIsNot(self.client.get_object('Logger', sentinel.idl_object), balanced)
+
+    def test_get_object_failed(self):
+        self.client.clients[0].get_object.side_effect = CORBA.TRANSIENT()
+
+        balanced = self.client.get_object('Logger', sentinel.idl_object)
+
+        self.assertEqual([r.obj for r in balanced.replicas], [self.replicas[('second:2809', 'Logger')]])
+
+    def test_get_object_failed_resolved(self):
+        self.client.clients[0].get_object.side_effect = CORBA.TRANSIENT()
+        balanced = self.client.get_object('Logger', sentinel.idl_object)
+
+        # Still unavailable
+        self.client.check_health()
+        self.assertEqual(len(balanced.replicas), 1)
+
+        self.client.clients[0].get_object.side_effect = self._get_object('first:2809')
+        self.client.check_health()
+
+        self.assertEqual([r.obj for r in balanced.replicas],
+                         [self.replicas[('second:2809', 'Logger')], self.replicas[('first:2809', 'Logger')]])
+        # Resolved replicas aren't resolved again.
+        self.client.check_health()
+        self.assertEqual(self.client.clients[0].get_object.call_count, 3)
+
+    def test_get_object_failed_invalidated(self):
+        self.client.clients[0].get_object.side_effect = CORBA.TRANSIENT()
+        self.client.get_object('Logger', sentinel.idl_object)
+        self.client.invalidate()
+        self.client.check_health()
+        self.assertEqual(self.client.clients[0].get_object.call_count, 1)
+
+    def test_get_object_all_failed(self):
+        for name_client in self.client.clients:
+            name_client.get_object.side_effect = CORBA.TRANSIENT()
+        with self.assertRaises(CORBA.TRANSIENT):
+            self.client.get_object('Logger', sentinel.idl_object)
+
+    def test_invalidate(self):
+        balanced = self.client.get_object('Logger', sentinel.idl_object)
+        self.client.invalidate()
+        self.assertIsNot(self.client.get_object('Logger', sentinel.idl_object), balanced)
+
+    def test_check_health(self):
+        balanced = self.client.get_object('Logger', sentinel.idl_object)
+        self.replicas[('first:2809', 'Logger')]._non_existent.return_value = True
+
+        self.client.check_health()
+
+        self.assertEqual([r.healthy for r in balanced.replicas], [False, True])
+
+    def test_check_health_resolve_unhealthy(self):
+        balanced = self.client.get_object('Logger', sentinel.idl_object)
+        old = self.replicas.pop(('first:2809', 'Logger'))
+        old._non_existent.side_effect = CORBA.TRANSIENT()
+        self.client.check_health()
+        self.assertEqual([r.healthy for r in balanced.replicas], [False, True])
+
+        # Unhealthy replica is resolved again, e.g. after restart of the server.
+        self.client.check_health()
+
+        new = self.replicas[('first:2809', 'Logger')]
+        self.assertEqual([r.obj for r in balanced.replicas], [new, self.replicas[('second:2809', 'Logger')]])
+        self.assertEqual([r.healthy for r in balanced.replicas], [True, True])
+        # Healthy replicas aren't resolved again.
+        self.client.check_health()
+        self.assertEqual(self.client.clients[0].get_object.call_count, 2)
+        self.assertEqual(self.client.clients[1].get_object.call_count, 1)
+
+    def test_health_checks(self):
+        checked = threading.Event()
+        with patch.object(self.client, 'check_health', side_effect=checked.set) as check_mock:
+            self.client.start_health_checks(0.01)
+            with self.assertRaisesRegexp(RuntimeError, 'already running'):
+                self.client.start_health_checks()
+            checked.wait()
+            self.client.stop_health_checks()
+        self.assertTrue(check_mock.called)
+        self.assertIsNone(self.client._health_thread)
+        # Stopping stopped checks is harmless
+        self.client.stop_health_checks()
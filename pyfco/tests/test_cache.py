@@ -0,0 +1,294 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Test `pyfco.cache` module."""
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+from mock import Mock, call, patch, sentinel
+
+from pyfco.cache import FileCache, LruCache, ResponseCache, copy_value, get_key
+from pyfco.client import CorbaClient
+from pyfco.metrics import MemoryMetricsSink
+from pyfco.name_service import CacheInfo
+from pyfco.tests.test_client import InternalServerError, SentinelRecoder
+from pyfco.tests.test_pickling import STATE_OK, PickleStruct
+from pyfco.utils import CorbaAssertMixin
+
+
+class TestGetKey(unittest.TestCase):
+    """Test `get_key` function."""
+
+    def test_key(self):
+        key = get_key('method', (b'arg', 42))
+        self.assertEqual(len(key), 40)
+        self.assertEqual(key, get_key('method', (b'arg', 42)))
+        self.assertNotEqual(key, get_key('other', (b'arg', 42)))
+        self.assertNotEqual(key, get_key('method', (b'arg', 43)))
+
+    def test_struct(self):
+        self.assertEqual(get_key('method', (PickleStruct('Gazpacho', STATE_OK), )),
+                         get_key('method', (PickleStruct('Gazpacho', STATE_OK), )))
+
+
+class TestCopyValue(unittest.TestCase):
+    """Test `copy_value` function."""
+
+    def test_copy(self):
+        value = [PickleStruct('Gazpacho', [STATE_OK]), (date(1970, 2, 1), ['x']), {'key': ['y']}, {'z'}]
+
+        result = copy_value(value)
+
+        self.assertIsNot(result, value)
+        self.assertIs(type(result[0]), PickleStruct)
+        self.assertIsNot(result[0], value[0])
+        self.assertEqual(result[0].name, 'Gazpacho')
+        self.assertIsNot(result[0].state, value[0].state)
+        self.assertIs(result[0].state[0], STATE_OK)
+        self.assertEqual(result[1], (date(1970, 2, 1), ['x']))
+        self.assertIsNot(result[1][1], value[1][1])
+        self.assertEqual(result[2], {'key': ['y']})
+        self.assertIsNot(result[2]['key'], value[2]['key'])
+        self.assertEqual(result[3], {'z'})
+        self.assertIsNot(result[3], value[3])
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test `ResponseCache` class."""
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            ResponseCache(ttl=10)
+
+
+class TestLruCache(CorbaAssertMixin, unittest.TestCase):
+    """Test `LruCache` class."""
+
+    def setUp(self):
+        patcher = patch('pyfco.cache.default_timer', return_value=100.0)
+        self.addCleanup(patcher.stop)
+        self.timer_mock = patcher.start()
+        self.cache = LruCache(ttl=10, maxsize=2)
+
+    def test_get(self):
+        value = [PickleStruct('Gazpacho', STATE_OK)]
+        self.cache.set('key', value)
+        value[0].name = 'Salmorejo'
+
+        result = self.cache.get('key')
+        self.assertEqual(result[0], PickleStruct('Gazpacho', STATE_OK))
+        result[0].name = 'Salmorejo'
+        self.assertEqual(self.cache.get('key')[0], PickleStruct('Gazpacho', STATE_OK))
+        self.assertEqual(self.cache.cache_info(), CacheInfo(2, 0, 0, 1))
+
+    def test_miss(self):
+        with self.assertRaises(KeyError):
+            self.cache.get('key')
+        self.assertEqual(self.cache.cache_info(), CacheInfo(0, 1, 0, 0))
+
+    def test_expired(self):
+        self.cache.set('key', sentinel.value)
+        self.timer_mock.return_value = 110.0
+        with self.assertRaises(KeyError):
+            self.cache.get('key')
+        self.assertEqual(self.cache.cache_info(), CacheInfo(0, 1, 0, 0))
+
+    def test_maxsize(self):
+        self.cache.set('first', 1)
+        self.cache.set('second', 2)
+        self.assertEqual(self.cache.get('first'), 1)
+        self.cache.set('third', 3)
+
+        self.assertEqual(self.cache.get('first'), 1)
+        self.assertEqual(self.cache.get('third'), 3)
+        with self.assertRaises(KeyError):
+            self.cache.get('second')
+
+    def test_clear(self):
+        self.cache.set('first', 1)
+        self.cache.set('second', 2)
+        self.cache.clear()
+        with self.assertRaises(KeyError):
+            self.cache.get('first')
+        self.assertEqual(self.cache.cache_info(), CacheInfo(0, 1, 2, 0))
+
+
+class TestFileCache(CorbaAssertMixin, unittest.TestCase):
+    """Test `FileCache` class."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = FileCache(self.directory, ttl=10)
+
+    def test_get(self):
+        value = [PickleStruct('Gazpacho', STATE_OK)]
+        self.cache.set('key', value)
+
+        result = self.cache.get('key')
+        self.assertEqual(result[0], value[0])
+        self.assertIsNot(result[0], value[0])
+        self.assertIs(result[0].state, STATE_OK)
+        self.assertEqual(os.listdir(self.directory), ['key.pyfco'])
+        self.assertEqual(FileCache(self.directory, ttl=10).get('key')[0], value[0])
+        self.assertEqual(self.cache.cache_info(), CacheInfo(1, 0, 0, 1))
+
+    def test_miss(self):
+        with self.assertRaises(KeyError):
+            self.cache.get('key')
+        self.assertEqual(self.cache.cache_info(), CacheInfo(0, 1, 0, 0))
+
+    def test_corrupted(self):
+        with open(os.path.join(self.directory, 'key.pyfco'), 'wb') as cache_file:
+            cache_file.write(b'')
+        with self.assertRaises(KeyError):
+            self.cache.get('key')
+
+    def test_unregistered(self):
+        self.cache.set('key', PickleStruct('Gazpacho', STATE_OK))
+        # Type of the structure isn't registered in this process.
+        with patch('pyfco.pickling.findType', return_value=None):
+            with self.assertRaises(KeyError):
+                self.cache.get('key')
+        self.assertEqual(self.cache.cache_info(), CacheInfo(0, 1, 0, 1))
+
+    def test_expired(self):
+        with patch('pyfco.cache.time.time', return_value=100.0):
+            self.cache.set('key', sentinel.value)
+        with patch('pyfco.cache.time.time', return_value=110.0):
+            with self.assertRaises(KeyError):
+                self.cache.get('key')
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(self.cache.cache_info(), CacheInfo(0, 1, 0, 0))
+
+    def test_maxsize(self):
+        self.cache.maxsize = 2
+        with patch('pyfco.cache.time.time', return_value=100.0):
+            self.cache.set('first', 1)
+        with patch('pyfco.cache.time.time', return_value=101.0):
+            self.cache.set('second', 2)
+            self.cache.set('third', 3)
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ['second.pyfco', 'third.pyfco'])
+
+    def test_maxsize_interval(self):
+        self.cache.maxsize = 20
+        for i in range(21):
+            self.cache.set('key{}'.format(i), i)
+        self.assertEqual(len(self.cache), 21)
+
+        with patch('pyfco.cache.os.stat', wraps=os.stat) as stat_mock:
+            self.cache.set('other', 0)
+        self.assertEqual(len(self.cache), 20)
+        self.assertEqual(len(stat_mock.mock_calls), 22)
+
+    def test_maxsize_expired(self):
+        self.cache.maxsize = 2
+        with patch('pyfco.cache.time.time', return_value=100.0):
+            self.cache.set('first', 1)
+        with patch('pyfco.cache.time.time', return_value=101.0):
+            self.cache.set('second', 2)
+        with patch('pyfco.cache.time.time', return_value=110.5):
+            self.cache.set('third', 3)
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ['second.pyfco', 'third.pyfco'])
+
+    def test_sweep(self):
+        with patch('pyfco.cache.time.time', return_value=100.0):
+            self.cache.set('first', 1)
+        with patch('pyfco.cache.time.time', return_value=105.0):
+            self.cache.set('second', 2)
+        with patch('pyfco.cache.time.time', return_value=110.0):
+            self.cache.sweep()
+
+        self.assertEqual(os.listdir(self.directory), ['second.pyfco'])
+        self.assertEqual(self.cache.cache_info(), CacheInfo(0, 0, 0, 1))
+
+    def test_clear(self):
+        self.cache.set('first', 1)
+        self.cache.set('second', 2)
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(self.cache.cache_info(), CacheInfo(0, 0, 2, 0))
+
+
+class TestCorbaClientCache(unittest.TestCase):
+    """Test `CorbaClient` with caches."""
+
+    def setUp(self):
+        self.corba_object = Mock(spec=['method', 'other'])
+        self.corba_object.method.side_effect = lambda *args: [sentinel.result]
+        self.cache = LruCache(ttl=10)
+        self.client = CorbaClient(self.corba_object, SentinelRecoder(), InternalServerError,
+                                  caches={'method': self.cache})
+
+    def test_cached(self):
+        result = self.client.method(b'arg')
+        self.assertEqual(result, [sentinel.result])
+        result.append(sentinel.other)
+
+        self.assertEqual(self.client.method(b'arg'), [sentinel.result])
+        self.assertEqual(self.client.method(b'other'), [sentinel.result])
+
+        self.assertEqual(self.corba_object.mock_calls, [call.method(b'arg'), call.method(b'other')])
+        self.assertEqual(self.cache.cache_info(), CacheInfo(1, 2, 0, 2))
+
+    def test_map_calls(self):
+        self.client.method(b'arg')
+        self.assertEqual(self.client.map_calls([('method', (b'arg', )), ('method', (b'arg', ))]),
+                         [[sentinel.result], [sentinel.result]])
+        self.assertEqual(self.corba_object.mock_calls, [call.method(b'arg')])
+
+    def test_lazy_call(self):
+        self.client.method(b'arg')
+        self.assertEqual(self.client.lazy_call('method', b'arg'), [sentinel.result])
+        self.assertEqual(self.corba_object.mock_calls, [call.method(b'arg')])
+
+    def test_iter_call(self):
+        self.corba_object.method.side_effect = lambda *args: [sentinel.first, sentinel.second]
+        self.client.method(b'arg')
+        self.assertEqual(list(self.client.iter_call('method', b'arg', chunk_size=1)),
+                         [[sentinel.first], [sentinel.second]])
+        self.assertEqual(self.client.method(b'arg'), [sentinel.first, sentinel.second])
+        self.assertEqual(self.corba_object.mock_calls, [call.method(b'arg')])
+
+    def test_not_cached(self):
+        self.corba_object.other.return_value = sentinel.result
+        self.client.other()
+        self.client.other()
+        self.assertEqual(self.corba_object.mock_calls, [call.other(), call.other()])
+
+    def test_error(self):
+        self.corba_object.method.side_effect = InternalServerError
+        with self.assertRaises(InternalServerError):
+            self.client.method()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_metrics(self):
+        self.client.metrics = MemoryMetricsSink()
+
+        self.client.method()
+        self.client.method()
+
+        metrics = self.client.metrics.get_metrics()['method']
+        self.assertEqual(metrics.count, 1)
+        self.assertEqual(metrics.cache_hits, 1)
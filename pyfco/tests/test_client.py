@@ -22,6 +22,7 @@ Tests for `pyfco.client` module
 from __future__ import unicode_literals
 
 import logging
+import threading
 import unittest
 from logging.handlers import BufferingHandler
 
@@ -31,7 +32,13 @@ from omniORB import CORBA
 from testfixtures import StringComparison
 
 from pyfco import CorbaRecoder
-from pyfco.client import CorbaClient, CorbaClientProxy, sane_repr
+from pyfco.cache import get_key
+from pyfco.client import CorbaClient, CorbaClientProxy, _Flight, sane_repr
+from pyfco.metrics import MemoryMetricsSink
+from pyfco.recoder import LazySequence
+from pyfco.tests.test_pickling import STATE_OK, PickleStruct
+
+STRUCT_NAME = 'pyfco.tests.test_pickling.PickleStruct'
 
 
 class TestSaneRepr(unittest.TestCase):
@@ -55,6 +62,44 @@ class TestSaneRepr(unittest.TestCase):
         else:  # pragma: no cover
             self.assertEqual(sane_repr('ěščřž', 1024), str("'ěščřž'"))
 
+    def test_sane_repr_containers(self):
+        values = ([], (), {}, [1, 'a', None], (1,), (1, 2), {'key': [1, (2, 3)]}, [[{}], ({'a': ()},)],
+                  ['ěščřž', 'ěščřž'.encode('utf-8')])
+        for value in values:
+            self.assertEqual(sane_repr(value, 1024), repr(value))
+            for max_length in range(len(repr(value))):
+                self.assertEqual(sane_repr(value, max_length), repr(value)[:max_length] + ' [truncated]...')
+
+    def test_sane_repr_recursive(self):
+        value = [1]
+        value.append(value)
+        value_dict = {}
+        value_dict['self'] = value_dict
+        self.assertEqual(sane_repr(value, 1024), repr(value))
+        self.assertEqual(sane_repr(value_dict, 1024), repr(value_dict))
+
+    def test_sane_repr_struct(self):
+        value = PickleStruct(42, [1, (2, 3)])
+        self.assertEqual(sane_repr(value, 1024), STRUCT_NAME + '(name=42, state=[1, (2, 3)])')
+        self.assertEqual(sane_repr([value], 30), '[' + STRUCT_NAME[:29] + ' [truncated]...')
+        del value.state
+        self.assertEqual(sane_repr(value, 1024), STRUCT_NAME + '(name=42, state=<not set>)')
+        value.state = value
+        self.assertEqual(sane_repr(value, 1024), STRUCT_NAME + '(name=42, state=' + STRUCT_NAME + '(...))')
+
+    def test_sane_repr_struct_bounded(self):
+        item = Mock()
+        item.__repr__ = Mock(return_value='item')
+        self.assertEqual(sane_repr(PickleStruct([item] * 1000, STATE_OK), 56),
+                         STRUCT_NAME + '(name=[item, item, [truncated]...')
+        self.assertEqual(item.__repr__.call_count, 2)
+
+    def test_sane_repr_bounded(self):
+        item = Mock()
+        item.__repr__ = Mock(return_value='item')
+        self.assertEqual(sane_repr([item] * 1000, 10), '[item, ite [truncated]...')
+        self.assertEqual(item.__repr__.call_count, 2)
+
 
 class SentinelRecoder(CorbaRecoder):
     """
@@ -155,9 +200,335 @@ class TestCorbaClient(unittest.TestCase):
         result = self.corba_client.method()
         self.assertEqual(result, 'ěščřžýáíé')
 
-    def test_unknown_method(self):
+    def test_lazy(self):
+        self.corba_object.method.return_value = [sentinel.first, sentinel.second]
+        corba_client = CorbaClient(self.corba_object, SentinelRecoder(), InternalServerError, lazy=True)
+
+        result = corba_client.method()
+
+        self.assertIsInstance(result, LazySequence)
+        self.assertEqual(result, [sentinel.first, sentinel.second])
+
+    def test_lazy_call(self):
+        self.corba_object.method.return_value = [sentinel.first, sentinel.second]
+
+        result = self.corba_client.lazy_call('method', sentinel.arg)
+
+        self.assertIsInstance(result, LazySequence)
+        self.assertEqual(result, [sentinel.first, sentinel.second])
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg)])
+
+    def test_method_cached(self):
+        method = self.corba_client.method
+        self.assertIs(self.corba_client.method, method)
+        self.assertEqual(method.__name__, 'method')
+        self.assertEqual(method(), self.corba_object.method.return_value)
+
+    def test_dunder_method(self):
         with self.assertRaises(AttributeError):
-            self.corba_client.unknown()
+            self.corba_client.__deepcopy__
+        self.assertNotIn('__deepcopy__', self.corba_client.__dict__)
+
+    def test_in_place(self):
+        result = [sentinel.first, sentinel.second]
+        self.corba_object.method.return_value = result
+        self.corba_client.recoder.in_place = True
+
+        with patch.object(self.corba_client.recoder, 'decode', autospec=True) as decode_mock:
+            self.assertIs(self.corba_client.method(), result)
+        self.assertEqual(decode_mock.mock_calls, [])
+        self.assertEqual(result, [sentinel.first, sentinel.second])
+
+    def test_metrics(self):
+        self.corba_client.metrics = MemoryMetricsSink()
+        self.corba_object.method.return_value = [sentinel.first, sentinel.second]
+
+        self.assertEqual(self.corba_client.method(sentinel.arg), [sentinel.first, sentinel.second])
+        self.assertIsInstance(self.corba_client.lazy_call('method'), LazySequence)
+
+        metrics = self.corba_client.metrics.get_metrics()['method']
+        self.assertEqual(metrics.count, 2)
+        self.assertEqual(metrics.errors, {})
+        self.assertEqual(metrics.nodes, 6)
+        self.assertGreater(metrics.invoke_time, 0)
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg), call.method()])
+
+    def test_metrics_errors(self):
+        self.corba_client.metrics = MemoryMetricsSink()
+        for error in (InternalServerError, CustomError, CORBA.TRANSIENT, ValueError):
+            self.corba_object.method.side_effect = error
+            with self.assertRaises(error):
+                self.corba_client.method()
+        with patch.object(self.corba_client.recoder, 'encode', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                self.corba_client.method()
+
+        metrics = self.corba_client.metrics.get_metrics()['method']
+        self.assertEqual(metrics.count, 5)
+        self.assertEqual(metrics.errors, {'server_error': 1, 'user_exception': 1, 'corba_exception': 1, 'other': 2})
+        self.assertEqual(metrics.decode_time, 0)
+        self.assertEqual(metrics.nodes, 0)
+
+    def test_metrics_encoded_once(self):
+        self.corba_client.metrics = MemoryMetricsSink()
+        self.corba_object.method.return_value = sentinel.result
+        with patch.object(self.corba_client.recoder, 'encode', wraps=self.corba_client.recoder.encode) as encode_mock:
+            self.corba_client.method(sentinel.arg)
+        self.assertEqual(encode_mock.mock_calls.count(call((sentinel.arg, ))), 1)
+
+    def test_metrics_map_calls(self):
+        self.corba_client.metrics = MemoryMetricsSink()
+
+        def method(arg):
+            if arg is sentinel.error:
+                raise CustomError
+            return [sentinel.first, sentinel.second]
+        self.corba_object.method.side_effect = method
+
+        with self.assertRaises(CustomError):
+            self.corba_client.map_calls([('method', (sentinel.arg, )), ('method', (sentinel.error, ))])
+
+        metrics = self.corba_client.metrics.get_metrics()['method']
+        self.assertEqual(metrics.count, 2)
+        self.assertEqual(metrics.nodes, 3)
+        self.assertEqual(metrics.errors, {'user_exception': 1})
+
+    def test_metrics_iter_call(self):
+        self.corba_client.metrics = MemoryMetricsSink()
+        self.corba_object.method.return_value = [sentinel.first, sentinel.second]
+
+        self.assertEqual(list(self.corba_client.iter_call('method', chunk_size=1)),
+                         [[sentinel.first], [sentinel.second]])
+
+        metrics = self.corba_client.metrics.get_metrics()['method']
+        self.assertEqual(metrics.count, 1)
+        self.assertEqual(metrics.nodes, 3)
+        self.assertEqual(metrics.decode_time, 0)
+
+    def _coalesced_calls(self, side_effect):
+        """Perform coalesced calls in threads, return results or errors of the leader and the follower."""
+        started = threading.Event()
+        release = threading.Event()
+        followed = threading.Event()
+
+        class FollowedFlight(_Flight):
+            """Flight which signals that a follower waits for it."""
+
+            def wait(self):
+                followed.set()
+                return super(FollowedFlight, self).wait()
+
+        def method(arg):
+            started.set()
+            release.wait()
+            return side_effect(arg)
+        self.corba_object.method.side_effect = method
+        self.corba_client.coalesce = {'method'}
+        results = {}
+
+        def run(name):
+            try:
+                results[name] = self.corba_client.method(sentinel.arg)
+            except Exception as error:
+                results[name] = error
+        leader = threading.Thread(target=run, args=('leader', ))
+        follower = threading.Thread(target=run, args=('follower', ))
+        with patch('pyfco.client._Flight', FollowedFlight):
+            leader.start()
+            started.wait()
+            follower.start()
+            # Follower waits for the leader
+            followed.wait()
+            self.assertEqual([f.followers for f in self.corba_client._flights.values()], [1])
+            release.set()
+            leader.join()
+            follower.join()
+
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg)])
+        return results['leader'], results['follower']
+
+    def test_coalesce(self):
+        leader, follower = self._coalesced_calls(lambda arg: [[arg]])
+
+        self.assertEqual(leader, [[sentinel.arg]])
+        self.assertEqual(follower, [[sentinel.arg]])
+        self.assertIsNot(leader, follower)
+        self.assertIsNot(leader[0], follower[0])
+        self.assertEqual(self.corba_client._flights, {})
+
+    def test_coalesce_private_copy(self):
+        # Leader modifies its result before the follower copies it.
+        followed = threading.Event()
+
+        class DelayedFlight(_Flight):
+            """Flight whose followers wait until the leader modifies its result."""
+
+            def wait(self):
+                followed.set()
+                self.event.wait()
+                leader_result.wait()
+                return super(DelayedFlight, self).wait()
+
+        leader_result = threading.Event()
+        started = threading.Event()
+        release = threading.Event()
+
+        def method(arg):
+            started.set()
+            release.wait()
+            return [arg]
+        self.corba_object.method.side_effect = method
+        self.corba_client.coalesce = {'method'}
+        results = []
+        follower = threading.Thread(target=lambda: results.append(self.corba_client.method(sentinel.arg)))
+
+        def run_leader():
+            result = self.corba_client.method(sentinel.arg)
+            result.append(sentinel.modified)
+            leader_result.set()
+        leader = threading.Thread(target=run_leader)
+        with patch('pyfco.client._Flight', DelayedFlight):
+            leader.start()
+            started.wait()
+            follower.start()
+            followed.wait()
+            release.set()
+            leader.join()
+            follower.join()
+
+        self.assertEqual(results, [[sentinel.arg]])
+
+    def test_coalesce_cached(self):
+        cache = Mock(spec=['get', 'set'])
+        cache.get.side_effect = KeyError
+        self.corba_client.caches = {'method': cache}
+
+        leader, follower = self._coalesced_calls(lambda arg: [arg])
+
+        self.assertEqual(follower, [sentinel.arg])
+        # Only the leader caches the result.
+        self.assertEqual(cache.set.mock_calls, [call(get_key('method', (sentinel.arg, )), leader)])
+
+    def test_coalesce_error(self):
+        error = CustomError()
+
+        def side_effect(arg):
+            raise error
+        leader, follower = self._coalesced_calls(side_effect)
+
+        self.assertIs(leader, error)
+        self.assertIs(follower, error)
+        self.assertEqual(self.corba_client._flights, {})
+
+    def test_coalesce_sequential(self):
+        self.corba_client.coalesce = {'method'}
+        self.corba_object.method.return_value = sentinel.result
+
+        self.assertEqual(self.corba_client.method(sentinel.arg), sentinel.result)
+        self.assertEqual(self.corba_client.method(sentinel.arg), sentinel.result)
+
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg), call.method(sentinel.arg)])
+
+    def test_coalesce_other_method(self):
+        client = CorbaClient(self.corba_object, SentinelRecoder(), InternalServerError, coalesce=['other'])
+        self.assertEqual(client.coalesce, frozenset(['other']))
+        self.corba_object.method.return_value = sentinel.result
+        with patch.object(client, '_coalesced_call') as coalesced_mock:
+            self.assertEqual(client.method(sentinel.arg), sentinel.result)
+        self.assertEqual(coalesced_mock.mock_calls, [])
+
+    def test_map_calls(self):
+        self.corba_object = Mock(spec=['method', 'other'])
+        self.corba_object.method.side_effect = lambda arg: arg
+        self.corba_object.other.return_value = sentinel.other_result
+        self.corba_client.corba_object = self.corba_object
+
+        calls = [('method', (sentinel.first, )), ('other', []), ('method', (sentinel.second, ))]
+        self.assertEqual(self.corba_client.map_calls(calls, max_workers=2),
+                         [sentinel.first, sentinel.other_result, sentinel.second])
+        six.assertCountEqual(self, self.corba_object.mock_calls,
+                             [call.method(sentinel.first), call.other(), call.method(sentinel.second)])
+
+    def test_map_calls_empty(self):
+        self.assertEqual(self.corba_client.map_calls([]), [])
+        self.assertEqual(self.corba_object.mock_calls, [])
+
+    def test_map_calls_concurrent(self):
+        # All calls wait until all of them are performed.
+        condition = threading.Condition()
+        started = []
+
+        def method(arg):
+            with condition:
+                started.append(arg)
+                condition.notify_all()
+                while len(started) < 3:
+                    condition.wait(1)
+            return arg
+
+        self.corba_object.method.side_effect = method
+        calls = [('method', (sentinel.first, )), ('method', (sentinel.second, )), ('method', (sentinel.third, ))]
+        self.assertEqual(self.corba_client.map_calls(calls), [sentinel.first, sentinel.second, sentinel.third])
+        self.assertEqual(len(started), 3)
+
+    def test_map_calls_encoded(self):
+        # Arguments are encoded before any call is performed
+        with patch.object(self.corba_client.recoder, 'encode', side_effect=[(), ValueError]):
+            with self.assertRaises(ValueError):
+                self.corba_client.map_calls([('method', ()), ('method', ())])
+        self.assertEqual(self.corba_object.mock_calls, [])
+
+    def test_map_calls_lazy(self):
+        self.corba_client.lazy = True
+        self.corba_object.method.return_value = [sentinel.first]
+        result = self.corba_client.map_calls([('method', ())])
+        self.assertIsInstance(result[0], LazySequence)
+        self.assertEqual(result, [[sentinel.first]])
+
+    def test_map_calls_error(self):
+        self.corba_object.method.side_effect = [sentinel.result, CustomError(), InternalServerError()]
+        with self.assertRaises(CustomError):
+            self.corba_client.map_calls([('method', ())] * 3, max_workers=1)
+        self.assertEqual(self.corba_object.mock_calls, [call.method()] * 3)
+        self.assertLogs(['DEBUG', 'DEBUG', 'DEBUG', 'DEBUG', 'DEBUG', 'ERROR'],
+                        ('method()', 'method returned', 'method()', 'method failed with .*CustomError', 'method()',
+                         'method failed with .*InternalServerError'))
+
+    def test_iter_call(self):
+        result = [sentinel.first, sentinel.second, sentinel.third]
+        self.corba_object.method.return_value = result
+
+        chunks = self.corba_client.iter_call('method', sentinel.arg, chunk_size=2)
+
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg)])
+        self.assertEqual(next(chunks), [sentinel.first, sentinel.second])
+        # Yielded items are released
+        self.assertEqual(result, [sentinel.third])
+        self.assertEqual(list(chunks), [[sentinel.third]])
+        self.assertEqual(result, [])
+
+    def test_iter_call_default(self):
+        self.corba_object.method.return_value = (sentinel.first, sentinel.second)
+        self.assertEqual(list(self.corba_client.iter_call('method')), [[sentinel.first, sentinel.second]])
+
+    def test_iter_call_empty(self):
+        self.corba_object.method.return_value = []
+        self.assertEqual(list(self.corba_client.iter_call('method')), [])
+
+    def test_iter_call_not_sequence(self):
+        with self.assertRaisesRegexp(TypeError, 'Result of method is not a sequence.'):
+            self.corba_client.iter_call('method')
+
+    def test_iter_call_invalid_args(self):
+        with self.assertRaisesRegexp(TypeError, 'Unexpected keyword arguments: other'):
+            self.corba_client.iter_call('method', chunk_size=10, other=sentinel.other)
+        with self.assertRaisesRegexp(ValueError, 'Chunk size must be positive.'):
+            self.corba_client.iter_call('method', chunk_size=0)
+        self.assertEqual(self.corba_object.mock_calls, [])
+
+    def test_unknown_method(self):
+        with self.assertRaisesRegexp(AttributeError, "has no method 'unknown'"):
+            self.corba_client.unknown
 
         self.assertEqual(self.corba_object.mock_calls, [])
 
@@ -185,6 +556,34 @@ class TestCorbaClient(unittest.TestCase):
         self.assertEqual(self.corba_object.mock_calls, [call.method()])
         self.assertLogs(['DEBUG', 'ERROR'], ('method()', 'method failed with CORBA.TRANSIENT'))
 
+    def test_call_no_debug(self):
+        logging.getLogger('pyfco.client').setLevel(logging.INFO)
+        with patch('pyfco.client.sane_repr', autospec=True) as repr_mock, \
+                patch('pyfco.client.random.choice', autospec=True) as choice_mock:
+            self.assertEqual(self.corba_client.method(), sentinel.result)
+
+        self.assertEqual(repr_mock.mock_calls, [])
+        self.assertEqual(choice_mock.mock_calls, [])
+        self.assertLogs([], ())
+
+    def test_error_no_debug(self):
+        logging.getLogger('pyfco.client').setLevel(logging.INFO)
+        self.corba_object.method.side_effect = CORBA.TRANSIENT
+        with self.assertRaises(CORBA.TRANSIENT):
+            self.corba_client.method()
+
+        self.assertLogs(['ERROR'], (r'\[\w{4}\] method failed with CORBA.TRANSIENT', ))
+
+    def test_user_exception_no_debug(self):
+        logging.getLogger('pyfco.client').setLevel(logging.INFO)
+        self.corba_object.method.side_effect = CustomError
+        with patch('pyfco.client.random.choice', autospec=True) as choice_mock:
+            with self.assertRaises(CustomError):
+                self.corba_client.method()
+
+        self.assertEqual(choice_mock.mock_calls, [])
+        self.assertLogs([], ())
+
 
 class TestCorbaClientProxy(unittest.TestCase):
     """
@@ -204,3 +603,44 @@ class TestCorbaClientProxy(unittest.TestCase):
 
         self.assertEqual(client_1.mock_calls, [call.foo()])
         self.assertEqual(client_2.mock_calls, [call.bar()])
+
+    def test_proxy_cached(self):
+        client_1 = Mock(spec=['foo', 'value'])
+        client_1.value = sentinel.value
+        client_2 = Mock(spec=['foo'])
+
+        proxy = CorbaClientProxy(client_1)
+        self.assertIs(proxy.foo, client_1.foo)
+        self.assertIs(proxy.foo, client_1.foo)
+        self.assertIs(proxy.value, client_1.value)
+        self.assertNotIn('value', proxy.__dict__)
+        proxy.client = client_2
+        self.assertIs(proxy.foo, client_2.foo)
+        with self.assertRaises(AttributeError):
+            proxy.value
+        with self.assertRaises(AttributeError):
+            proxy.__deepcopy__
+
+    def test_proxy_patch(self):
+        client_1 = Mock(spec=['foo'])
+        client_2 = Mock(spec=['foo'])
+
+        proxy = CorbaClientProxy(client_1)
+        proxy.foo()
+        with patch.object(proxy, 'client', client_2):
+            self.assertIs(proxy.client, client_2)
+            proxy.foo()
+        self.assertIs(proxy.client, client_1)
+        proxy.foo()
+
+        self.assertEqual(client_1.mock_calls, [call.foo(), call.foo()])
+        self.assertEqual(client_2.mock_calls, [call.foo()])
+
+    def test_proxy_delete(self):
+        client = Mock(spec=['foo'])
+        proxy = CorbaClientProxy(client)
+        proxy.foo()
+        del proxy.client
+        self.assertEqual(proxy.__dict__, {})
+        with self.assertRaises(AttributeError):
+            proxy.client
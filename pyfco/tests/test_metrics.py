@@ -0,0 +1,170 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Test `pyfco.metrics` module."""
+from __future__ import unicode_literals
+
+import unittest
+
+from fred_idl.Registry import IsoDate
+
+from pyfco.metrics import MemoryMetricsSink, MetricsSink, count_nodes, to_prometheus
+
+
+class TestCountNodes(unittest.TestCase):
+    """Test `count_nodes` function."""
+
+    def test_leaf(self):
+        self.assertEqual(count_nodes(None), 1)
+        self.assertEqual(count_nodes('Gazpacho'), 1)
+        self.assertEqual(count_nodes(IsoDate('1970-02-01')), 2)
+
+    def test_sequence(self):
+        self.assertEqual(count_nodes([]), 1)
+        self.assertEqual(count_nodes((1, 2, 3)), 4)
+        self.assertEqual(count_nodes([IsoDate('1970-02-01')] * 10), 21)
+        self.assertEqual(count_nodes([[1, 2], [3, 4], [5, 6]]), 10)
+
+    def test_approximate(self):
+        # Only the first item is walked
+        self.assertEqual(count_nodes([[], [1, 2, 3]]), 3)
+
+
+class TestMetricsSink(unittest.TestCase):
+    """Test `MetricsSink` class."""
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            MetricsSink()
+
+    def test_record_cache_hit(self):
+        class RecordSink(MetricsSink):
+            """Sink which records only calls."""
+
+            def record(self, method, error, encode_time, invoke_time, decode_time, nodes):
+                pass
+
+        # Ignored by default
+        RecordSink().record_cache_hit('method')
+
+
+class TestMemoryMetricsSink(unittest.TestCase):
+    """Test `MemoryMetricsSink` class."""
+
+    def test_record(self):
+        sink = MemoryMetricsSink()
+        sink.record('method', None, 0.5, 2.0, 1.0, 10)
+        sink.record('method', 'user_exception', 0.25, 1.0, 0.0, 0)
+        sink.record('other', 'corba_exception', 0.0, 1.0, 0.0, 0)
+
+        metrics = sink.get_metrics()
+
+        self.assertEqual(sorted(metrics), ['method', 'other'])
+        self.assertEqual(metrics['method'].count, 2)
+        self.assertEqual(metrics['method'].errors, {'user_exception': 1})
+        self.assertEqual(metrics['method'].encode_time, 0.75)
+        self.assertEqual(metrics['method'].invoke_time, 3.0)
+        self.assertEqual(metrics['method'].decode_time, 1.0)
+        self.assertEqual(metrics['method'].nodes, 10)
+        self.assertEqual(metrics['other'].count, 1)
+        self.assertEqual(metrics['other'].errors, {'corba_exception': 1})
+        self.assertEqual(repr(metrics['method']), '<MethodMetrics count=2 errors=1>')
+
+    def test_record_cache_hit(self):
+        sink = MemoryMetricsSink()
+        sink.record('method', None, 0.5, 2.0, 1.0, 10)
+        sink.record_cache_hit('method')
+        sink.record_cache_hit('other')
+
+        metrics = sink.get_metrics()
+
+        self.assertEqual(metrics['method'].count, 1)
+        self.assertEqual(metrics['method'].cache_hits, 1)
+        self.assertEqual(metrics['other'].count, 0)
+        self.assertEqual(metrics['other'].cache_hits, 1)
+
+    def test_get_metrics_copy(self):
+        sink = MemoryMetricsSink()
+        sink.record('method', 'user_exception', 0.0, 0.0, 0.0, 0)
+        metrics = sink.get_metrics()
+        sink.record('method', 'user_exception', 0.0, 0.0, 0.0, 0)
+        self.assertEqual(metrics['method'].count, 1)
+        self.assertEqual(metrics['method'].errors, {'user_exception': 1})
+
+    def test_clear(self):
+        sink = MemoryMetricsSink()
+        sink.record('method', None, 0.0, 0.0, 0.0, 0)
+        sink.clear()
+        self.assertEqual(sink.get_metrics(), {})
+
+
+class TestToPrometheus(unittest.TestCase):
+    """Test `to_prometheus` function."""
+
+    def test_empty(self):
+        self.assertEqual(to_prometheus(MemoryMetricsSink()),
+                         '# HELP pyfco_calls_total Number of corba calls.\n'
+                         '# TYPE pyfco_calls_total counter\n'
+                         '# HELP pyfco_cache_hits_total Number of results returned from the cache.\n'
+                         '# TYPE pyfco_cache_hits_total counter\n'
+                         '# HELP pyfco_errors_total Number of failed corba calls.\n'
+                         '# TYPE pyfco_errors_total counter\n'
+                         '# HELP pyfco_encode_seconds_total Time spent in encoding of the arguments.\n'
+                         '# TYPE pyfco_encode_seconds_total counter\n'
+                         '# HELP pyfco_invoke_seconds_total Time spent in the remote invocations.\n'
+                         '# TYPE pyfco_invoke_seconds_total counter\n'
+                         '# HELP pyfco_decode_seconds_total Time spent in decoding of the results.\n'
+                         '# TYPE pyfco_decode_seconds_total counter\n'
+                         '# HELP pyfco_result_nodes_total Approximate number of nodes in the results.\n'
+                         '# TYPE pyfco_result_nodes_total counter\n')
+
+    def test_metrics(self):
+        sink = MemoryMetricsSink()
+        sink.record('method', None, 0.5, 2.0, 1.0, 10)
+        sink.record('method', 'user_exception', 0.25, 1.0, 0.0, 0)
+        sink.record('a"b', 'corba_exception', 0.0, 1.0, 0.0, 0)
+        sink.record_cache_hit('method')
+
+        self.assertEqual(to_prometheus(sink, prefix='fred'),
+                         '# HELP fred_calls_total Number of corba calls.\n'
+                         '# TYPE fred_calls_total counter\n'
+                         'fred_calls_total{method="a\\"b"} 1\n'
+                         'fred_calls_total{method="method"} 2\n'
+                         '# HELP fred_cache_hits_total Number of results returned from the cache.\n'
+                         '# TYPE fred_cache_hits_total counter\n'
+                         'fred_cache_hits_total{method="a\\"b"} 0\n'
+                         'fred_cache_hits_total{method="method"} 1\n'
+                         '# HELP fred_errors_total Number of failed corba calls.\n'
+                         '# TYPE fred_errors_total counter\n'
+                         'fred_errors_total{method="a\\"b",category="corba_exception"} 1\n'
+                         'fred_errors_total{method="method",category="user_exception"} 1\n'
+                         '# HELP fred_encode_seconds_total Time spent in encoding of the arguments.\n'
+                         '# TYPE fred_encode_seconds_total counter\n'
+                         'fred_encode_seconds_total{method="a\\"b"} 0.0\n'
+                         'fred_encode_seconds_total{method="method"} 0.75\n'
+                         '# HELP fred_invoke_seconds_total Time spent in the remote invocations.\n'
+                         '# TYPE fred_invoke_seconds_total counter\n'
+                         'fred_invoke_seconds_total{method="a\\"b"} 1.0\n'
+                         'fred_invoke_seconds_total{method="method"} 3.0\n'
+                         '# HELP fred_decode_seconds_total Time spent in decoding of the results.\n'
+                         '# TYPE fred_decode_seconds_total counter\n'
+                         'fred_decode_seconds_total{method="a\\"b"} 0.0\n'
+                         'fred_decode_seconds_total{method="method"} 1.0\n'
+                         '# HELP fred_result_nodes_total Approximate number of nodes in the results.\n'
+                         '# TYPE fred_result_nodes_total counter\n'
+                         'fred_result_nodes_total{method="a\\"b"} 0\n'
+                         'fred_result_nodes_total{method="method"} 10\n')
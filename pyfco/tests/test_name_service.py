@@ -18,19 +18,177 @@
 """Test `pyfco.name_service` module."""
 from __future__ import unicode_literals
 
+import gc
+import os
+import threading
 import unittest
+import weakref
 
 import CosNaming
 import six
 from mock import Mock, call, patch, sentinel
-from testfixtures import ShouldWarn
+from omniORB import CORBA
+from testfixtures import LogCapture, ShouldWarn
 
-from pyfco.name_service import CorbaNameServiceClient
+from pyfco.name_service import CacheInfo, CorbaNameServiceClient, OrbManager, _RetryHandler, orb_manager
+
+
+class TestOrbManager(unittest.TestCase):
+    """Test `OrbManager` class."""
+
+    def setUp(self):
+        self.manager = OrbManager()
+        patcher = patch('pyfco.name_service.CORBA.ORB_init', autospec=True)
+        self.addCleanup(patcher.stop)
+        self.init_mock = patcher.start()
+        patcher = patch('pyfco.name_service.installTransientExceptionHandler', autospec=True)
+        self.addCleanup(patcher.stop)
+        self.install_mock = patcher.start()
+
+    def test_get_orb(self):
+        self.assertEqual(self.manager.get_orb(['-ORBarg']), self.init_mock.return_value)
+        self.assertEqual(self.manager.get_orb(['-ORBarg']), self.init_mock.return_value)
+        self.assertEqual(self.init_mock.call_args_list, [call(['-ORBarg'])])
+
+    def test_get_orb_args_mismatch(self):
+        self.manager.get_orb(['-ORBarg'])
+        with LogCapture('pyfco', propagate=False) as log_handler:
+            self.assertEqual(self.manager.get_orb(['-ORBother']), self.init_mock.return_value)
+        self.assertEqual(self.init_mock.call_args_list, [call(['-ORBarg'])])
+        log_handler.check(('pyfco.name_service', 'WARNING',
+                           "ORB already initialized with ['-ORBarg'], arguments ['-ORBother'] are ignored."))
+
+    def test_get_context(self):
+        obj = self.init_mock.return_value.string_to_object.return_value
+        obj._narrow.side_effect = [sentinel.context, sentinel.handler_context, sentinel.other_context]
+
+        self.assertEqual(self.manager.get_context('localhost', [], sentinel.handler), sentinel.context)
+        self.assertEqual(self.manager.get_context('localhost', [], sentinel.handler), sentinel.context)
+        self.assertEqual(self.manager.get_context('localhost', [], sentinel.other_handler), sentinel.handler_context)
+        self.assertEqual(self.manager.get_context('other', [], sentinel.handler), sentinel.other_context)
+
+        self.assertEqual(self.init_mock.mock_calls,
+                         [call([]),
+                          call().string_to_object('corbaname::localhost'),
+                          call().string_to_object()._narrow(CosNaming.NamingContext),
+                          call().string_to_object('corbaname::localhost'),
+                          call().string_to_object()._narrow(CosNaming.NamingContext),
+                          call().string_to_object('corbaname::other'),
+                          call().string_to_object()._narrow(CosNaming.NamingContext)])
+        self.assertEqual(self.install_mock.mock_calls,
+                         [call(None, sentinel.handler, obj), call(None, sentinel.other_handler, obj),
+                          call(None, sentinel.handler, obj)])
+
+    def test_get_context_threads(self):
+        contexts = []
+
+        def get_context():
+            contexts.append(self.manager.get_context('localhost', [], sentinel.handler))
+
+        threads = [threading.Thread(target=get_context) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(contexts), 10)
+        self.assertEqual(len(set(map(id, contexts))), 1)
+        self.assertEqual(self.init_mock.call_count, 1)
+        self.assertEqual(self.init_mock.return_value.string_to_object.call_count, 1)
+
+    def test_get_context_slow(self):
+        # Slow naming service doesn't block contexts of other hosts.
+        started = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def string_to_object(name):
+            if name == 'corbaname::slow':
+                started.set()
+                release.wait(10)
+            return Mock(name=name)
+        self.init_mock.return_value.string_to_object.side_effect = string_to_object
+        contexts = []
+        thread = threading.Thread(target=lambda: contexts.append(self.manager.get_context('slow', [], None)))
+        thread.start()
+        started.wait(10)
+
+        context = self.manager.get_context('localhost', [], None)
+
+        self.assertEqual(contexts, [])
+        release.set()
+        thread.join()
+        self.assertEqual(len(contexts), 1)
+        self.assertIsNot(contexts[0], context)
+
+    def test_invalidate(self):
+        obj = self.init_mock.return_value.string_to_object.return_value
+        obj._narrow.side_effect = [sentinel.context, sentinel.handler_context, sentinel.other_context,
+                                   sentinel.new_context, sentinel.new_handler_context, sentinel.new_other_context]
+        self.manager.get_context('localhost', [], sentinel.handler)
+        self.manager.get_context('localhost', [], sentinel.other_handler)
+        self.manager.get_context('other', [], sentinel.handler)
+
+        self.manager.invalidate('localhost')
+        self.assertEqual(self.manager.get_context('localhost', [], sentinel.handler), sentinel.new_context)
+        self.assertEqual(self.manager.get_context('localhost', [], sentinel.other_handler),
+                         sentinel.new_handler_context)
+        self.assertEqual(self.manager.get_context('other', [], sentinel.handler), sentinel.other_context)
+
+        self.manager.invalidate()
+        self.assertEqual(self.manager.get_context('other', [], sentinel.handler), sentinel.new_other_context)
+        self.assertEqual(self.init_mock.call_count, 1)
+
+    @unittest.skipUnless(hasattr(os, 'register_at_fork'), "Requires os.register_at_fork")
+    def test_after_fork_registered(self):
+        # Default manager is reset in the forked process.
+        key = ('localhost', None)
+        read_fd, write_fd = os.pipe()
+        orb_manager._contexts[key] = sentinel.context
+        # Lock held by other thread of the parent process
+        orb_manager._lock.acquire()
+        try:
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover
+                reset = key not in orb_manager._contexts and orb_manager._lock.acquire(False)
+                os.write(write_fd, b'1' if reset else b'0')
+                os._exit(0)
+        finally:
+            orb_manager._lock.release()
+            orb_manager._contexts.pop(key)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read_fd, 1), b'1')
+        os.close(read_fd)
+
+    def test_after_fork(self):
+        obj = self.init_mock.return_value.string_to_object.return_value
+        obj._narrow.side_effect = [sentinel.context, sentinel.new_context]
+        self.manager.get_context('localhost', [], sentinel.handler)
+        # Lock held by other thread of the parent process
+        self.manager._lock.acquire()
+
+        self.manager.after_fork()
+
+        self.assertEqual(self.manager.get_context('localhost', [], sentinel.handler), sentinel.new_context)
 
 
 class TestCorbaNameServiceClient(unittest.TestCase):
     """Test `CorbaNameServiceClient` class."""
 
+    def setUp(self):
+        patcher = patch.object(CorbaNameServiceClient, 'orb_manager', OrbManager())
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+    def test_retry_handler_shared(self):
+        handler = _RetryHandler(3)
+        self.assertTrue(handler(sentinel.cookie, 2, sentinel.exc))
+        self.assertFalse(handler(sentinel.cookie, 3, sentinel.exc))
+        self.assertEqual(handler, _RetryHandler(3))
+        self.assertEqual(hash(handler), hash(_RetryHandler(3)))
+        self.assertNotEqual(handler, _RetryHandler(4))
+
     def test_retry_handler(self):
         client = CorbaNameServiceClient(sentinel.orb, retries=3)
 
@@ -77,7 +235,7 @@ class TestCorbaNameServiceClient(unittest.TestCase):
                       call().string_to_object()._narrow(CosNaming.NamingContext)])
         self.assertEqual(init_mock.mock_calls, calls)
         self.assertEqual(install_mock.mock_calls,
-                         [call(None, corba_obj.retry_handler, init_mock.return_value.string_to_object.return_value)])
+                         [call(None, _RetryHandler(5), init_mock.return_value.string_to_object.return_value)])
 
     def test_corba_connect_bytes(self):
         class BytesCorbaNameServiceClient(CorbaNameServiceClient):
@@ -101,7 +259,59 @@ class TestCorbaNameServiceClient(unittest.TestCase):
                       call().string_to_object()._narrow(CosNaming.NamingContext)])
         self.assertEqual(init_mock.mock_calls, calls)
         self.assertEqual(install_mock.mock_calls,
-                         [call(None, corba_obj.retry_handler, init_mock.return_value.string_to_object.return_value)])
+                         [call(None, _RetryHandler(5), init_mock.return_value.string_to_object.return_value)])
+
+    def test_corba_connect_shared(self):
+        client = CorbaNameServiceClient()
+        other = CorbaNameServiceClient(context_name='other')
+        retries = CorbaNameServiceClient(retries=2)
+
+        with patch('pyfco.name_service.installTransientExceptionHandler', autospec=True) as install_mock:
+            with patch('pyfco.name_service.CORBA.ORB_init', autospec=True) as init_mock:
+                init_mock.return_value.string_to_object.return_value._narrow.side_effect = [
+                    sentinel.context, sentinel.retries_context]
+                client._connect()
+                other._connect()
+                retries._connect()
+
+        self.assertEqual(client.context, sentinel.context)
+        self.assertEqual(other.context, sentinel.context)
+        self.assertEqual(retries.context, sentinel.retries_context)
+        self.assertEqual(init_mock.call_count, 1)
+        obj = init_mock.return_value.string_to_object.return_value
+        self.assertEqual(install_mock.mock_calls,
+                         [call(None, _RetryHandler(5), obj), call(None, _RetryHandler(2), obj)])
+
+    def test_corba_connect_reconnect(self):
+        client = CorbaNameServiceClient()
+        other = CorbaNameServiceClient(context_name='other')
+
+        with patch('pyfco.name_service.installTransientExceptionHandler', autospec=True):
+            with patch('pyfco.name_service.CORBA.ORB_init', autospec=True) as init_mock:
+                init_mock.return_value.string_to_object.return_value._narrow.side_effect = [
+                    sentinel.context, sentinel.new_context]
+                client._connect()
+                other.connect()
+                client._connect()
+
+        self.assertEqual(client.context, sentinel.new_context)
+        self.assertEqual(other.context, sentinel.new_context)
+
+    def test_corba_connect_custom_handler(self):
+        class CustomClient(CorbaNameServiceClient):
+            """Client with custom retry handler."""
+
+            def retry_handler(self, cookie, retries, exc):
+                return False
+
+        client = CustomClient()
+
+        with patch('pyfco.name_service.installTransientExceptionHandler', autospec=True) as install_mock:
+            with patch('pyfco.name_service.CORBA.ORB_init', autospec=True) as init_mock:
+                client.connect()
+
+        self.assertEqual(install_mock.mock_calls,
+                         [call(None, client.retry_handler, init_mock.return_value.string_to_object.return_value)])
 
     def test_corba_get_object(self):
         corba_obj = CorbaNameServiceClient()
@@ -169,3 +379,192 @@ class TestCorbaNameServiceClient(unittest.TestCase):
                 call('fred', 'context'),
                 call('Logger', 'Object')
             ])
+
+
+@patch('pyfco.name_service.installSystemExceptionHandler', autospec=True)
+@patch('pyfco.name_service.installTransientExceptionHandler', autospec=True)
+@patch('pyfco.name_service._monotonic', autospec=True, return_value=100)
+class TestCorbaNameServiceClientCache(unittest.TestCase):
+    """Test `CorbaNameServiceClient` object cache."""
+
+    def setUp(self):
+        self.client = CorbaNameServiceClient(cache_ttl=10)
+        self.client.context = Mock()
+        patcher = patch.object(CosNaming, "NameComponent")
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+    def test_no_cache(self, monotonic_mock, transient_mock, system_mock):
+        self.client.cache_ttl = None
+        self.client.get_object('Logger', sentinel.idl_object)
+        self.client.get_object('Logger', sentinel.idl_object)
+        self.assertEqual(self.client.context.resolve.call_count, 2)
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 0, 0, 0))
+        self.assertEqual(transient_mock.mock_calls, [])
+        self.assertEqual(system_mock.mock_calls, [])
+
+    def test_cache(self, monotonic_mock, transient_mock, system_mock):
+        obj = self.client.context.resolve.return_value._narrow.return_value
+
+        self.assertEqual(self.client.get_object('Logger', sentinel.idl_object), obj)
+        self.assertEqual(self.client.get_object('Logger', sentinel.idl_object), obj)
+
+        self.assertEqual(self.client.context.resolve.call_count, 1)
+        self.assertEqual(self.client.cache_info(), CacheInfo(1, 1, 0, 1))
+        key = ('Logger', sentinel.idl_object)
+        self.assertEqual(transient_mock.mock_calls, [call(key, self.client._invalidate_handler, obj)])
+        self.assertEqual(system_mock.mock_calls, [call(key, self.client._invalidate_system_handler, obj)])
+
+    def test_cache_key(self, monotonic_mock, transient_mock, system_mock):
+        self.client.get_object('Logger', sentinel.idl_object)
+        self.client.get_object('Logger', sentinel.other_idl_object)
+        self.client.get_object('Other', sentinel.idl_object)
+        with ShouldWarn(DeprecationWarning("Passing 'name' as six.binary_type is deprecated. "
+                                           "Please pass six.text_type.")):
+            self.client.get_object(b'Logger', sentinel.idl_object)
+        self.assertEqual(self.client.context.resolve.call_count, 3)
+        self.assertEqual(self.client.cache_info(), CacheInfo(1, 3, 0, 3))
+
+    def test_cache_expired(self, monotonic_mock, transient_mock, system_mock):
+        self.client.get_object('Logger', sentinel.idl_object)
+        monotonic_mock.return_value = 109
+        self.client.get_object('Logger', sentinel.idl_object)
+        monotonic_mock.return_value = 110
+        self.client.get_object('Logger', sentinel.idl_object)
+        self.assertEqual(self.client.context.resolve.call_count, 2)
+        self.assertEqual(self.client.cache_info(), CacheInfo(1, 2, 0, 1))
+
+    def test_invalidate(self, monotonic_mock, transient_mock, system_mock):
+        self.client.get_object('Logger', sentinel.idl_object)
+        self.client.get_object('Other', sentinel.idl_object)
+
+        self.client.invalidate('Logger', sentinel.idl_object)
+        self.client.invalidate('Unknown', sentinel.idl_object)
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 2, 1, 1))
+        self.client.get_object('Logger', sentinel.idl_object)
+        self.assertEqual(self.client.context.resolve.call_count, 3)
+
+        self.client.invalidate()
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 3, 3, 0))
+
+    def test_invalidate_handler(self, monotonic_mock, transient_mock, system_mock):
+        self.client.get_object('Logger', sentinel.idl_object)
+        key = ('Logger', sentinel.idl_object)
+
+        self.assertFalse(self.client._invalidate_handler(key, 0, CORBA.TRANSIENT()))
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 1, 1, 0))
+        # Already invalidated
+        self.assertFalse(self.client._invalidate_handler(key, 0, CORBA.TRANSIENT()))
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 1, 1, 0))
+
+    def test_invalidate_system_handler(self, monotonic_mock, transient_mock, system_mock):
+        self.client.get_object('Logger', sentinel.idl_object)
+        key = ('Logger', sentinel.idl_object)
+
+        self.assertFalse(self.client._invalidate_system_handler(key, 0, CORBA.BAD_PARAM()))
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 1, 0, 1))
+        self.assertFalse(self.client._invalidate_system_handler(key, 0, CORBA.OBJECT_NOT_EXIST()))
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 1, 1, 0))
+
+    def test_warm_up(self, monotonic_mock, transient_mock, system_mock):
+        obj = self.client.context.resolve.return_value._narrow.return_value
+
+        resolved = self.client.warm_up([('Logger', sentinel.idl_object), ('Fred', sentinel.other_idl_object)])
+
+        self.assertEqual(resolved, {('Logger', sentinel.idl_object): obj, ('Fred', sentinel.other_idl_object): obj})
+        self.assertEqual(self.client.get_object('Logger', sentinel.idl_object), obj)
+        self.assertEqual(self.client.context.resolve.call_count, 2)
+        self.assertEqual(self.client.cache_info(), CacheInfo(1, 2, 0, 2))
+
+    def test_warm_up_error(self, monotonic_mock, transient_mock, system_mock):
+        obj = self.client.context.resolve.return_value._narrow.return_value
+        self.client.context.resolve.return_value._narrow.side_effect = [CORBA.TRANSIENT(), obj]
+
+        with LogCapture('pyfco', propagate=False) as log_handler:
+            resolved = self.client.warm_up([('Logger', sentinel.idl_object), ('Fred', sentinel.other_idl_object)])
+
+        self.assertEqual(resolved, {('Fred', sentinel.other_idl_object): obj})
+        log_handler.check(('pyfco.name_service', 'WARNING', 'Warm up of Logger failed with CORBA.TRANSIENT.'))
+
+    def test_warm_up_background(self, monotonic_mock, transient_mock, system_mock):
+        thread = self.client.warm_up([('Logger', sentinel.idl_object)], background=True)
+
+        self.assertIsInstance(thread, threading.Thread)
+        thread.join()
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 1, 0, 1))
+
+    def test_warm_up_background_no_cache(self, monotonic_mock, transient_mock, system_mock):
+        self.client.cache_ttl = None
+        with self.assertRaisesRegexp(ValueError, 'requires cache_ttl'):
+            self.client.warm_up([('Logger', sentinel.idl_object)], background=True)
+
+    def _get_os_mock(self):
+        os_mock = Mock(spec=['register_at_fork', 'getpid', 'getppid'])
+        os_mock.getpid.return_value = 42
+        os_mock.getppid.return_value = 42
+        return os_mock
+
+    def test_warm_up_at_fork(self, monotonic_mock, transient_mock, system_mock):
+        os_mock = self._get_os_mock()
+        with patch('pyfco.name_service.os', os_mock):
+            self.assertTrue(self.client.warm_up_at_fork([('Fred', sentinel.idl_object)]))
+            self.assertTrue(self.client.warm_up_at_fork([('Logger', sentinel.idl_object)]))
+        self.assertEqual(len(os_mock.register_at_fork.mock_calls), 1)
+        self.client.get_object('Fred', sentinel.idl_object)
+
+        with patch('pyfco.name_service.os', os_mock):
+            with patch.object(self.client, 'orb_manager') as orb_manager_mock:
+                with patch.object(self.client, 'warm_up') as warm_up_mock:
+                    os_mock.register_at_fork.call_args[1]['after_in_child']()
+
+        self.assertIsNone(self.client.context)
+        self.assertEqual(self.client.cache_info(), CacheInfo(0, 1, 1, 0))
+        # Manager is reset by its own hook.
+        self.assertEqual(orb_manager_mock.mock_calls, [])
+        self.assertEqual(warm_up_mock.mock_calls, [call([('Logger', sentinel.idl_object)], background=True)])
+
+    def _fork_child(self, os_mock):
+        """Run the registered hook and return calls of the warm up."""
+        with patch('pyfco.name_service.os', os_mock):
+            with patch.object(self.client, 'orb_manager'):
+                with patch.object(self.client, 'warm_up') as warm_up_mock:
+                    os_mock.register_at_fork.call_args[1]['after_in_child']()
+        return warm_up_mock.mock_calls
+
+    def test_warm_up_at_fork_grandchild(self, monotonic_mock, transient_mock, system_mock):
+        os_mock = self._get_os_mock()
+        with patch('pyfco.name_service.os', os_mock):
+            self.client.warm_up_at_fork([('Logger', sentinel.idl_object)])
+        os_mock.getppid.return_value = 43
+        self.assertEqual(self._fork_child(os_mock), [])
+
+    def test_warm_up_at_fork_cancel(self, monotonic_mock, transient_mock, system_mock):
+        os_mock = self._get_os_mock()
+        with patch('pyfco.name_service.os', os_mock):
+            self.client.warm_up_at_fork([('Logger', sentinel.idl_object)])
+        self.client.cancel_warm_up_at_fork()
+        self.assertEqual(self._fork_child(os_mock), [])
+
+    def test_warm_up_at_fork_deleted(self, monotonic_mock, transient_mock, system_mock):
+        os_mock = self._get_os_mock()
+        with patch('pyfco.name_service.os', os_mock):
+            self.client.warm_up_at_fork([('Logger', sentinel.idl_object)])
+        client_ref = weakref.ref(self.client)
+        del self.client
+        gc.collect()
+        self.assertIsNone(client_ref())
+        # Hook of the deleted client does nothing
+        os_mock.register_at_fork.call_args[1]['after_in_child']()
+
+    def test_warm_up_at_fork_no_cache(self, monotonic_mock, transient_mock, system_mock):
+        self.client.cache_ttl = None
+        with patch('pyfco.name_service.os', self._get_os_mock()) as os_mock:
+            with self.assertRaisesRegexp(ValueError, 'requires cache_ttl'):
+                self.client.warm_up_at_fork([('Logger', sentinel.idl_object)])
+        self.assertEqual(os_mock.register_at_fork.mock_calls, [])
+
+    def test_warm_up_at_fork_unsupported(self, monotonic_mock, transient_mock, system_mock):
+        with patch('pyfco.name_service.os', spec=[]):
+            with LogCapture('pyfco', propagate=False) as log_handler:
+                self.assertFalse(self.client.warm_up_at_fork([('Logger', sentinel.idl_object)]))
+        log_handler.check(('pyfco.name_service', 'WARNING', 'Warm up at fork is not supported.'))
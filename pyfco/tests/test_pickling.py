@@ -0,0 +1,94 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Test `pyfco.pickling` module."""
+from __future__ import unicode_literals
+
+import pickle
+import unittest
+
+import omniORB
+from mock import patch
+from omniORB import EnumItem, StructBase, tcInternal
+
+from pyfco.pickling import dumps, loads
+from pyfco.utils import CorbaAssertMixin
+
+
+class PickleStruct(StructBase):
+    """Corba structure with registered type descriptor."""
+
+    _NP_RepositoryId = "IDL:PickleStruct:1.0"
+
+    def __init__(self, name, state):
+        self.name = name
+        self.state = state
+
+
+STATE_OK = EnumItem("OK", 0)
+STATE_FAILED = EnumItem("FAILED", 1)
+for _item in (STATE_OK, STATE_FAILED):
+    _item._parent_id = "IDL:PickleState:1.0"
+
+omniORB.registerType("IDL:PickleState:1.0",
+                     (tcInternal.tv_enum, "IDL:PickleState:1.0", "PickleState", (STATE_OK, STATE_FAILED)), None)
+omniORB.registerType(PickleStruct._NP_RepositoryId,
+                     (tcInternal.tv_struct, PickleStruct, PickleStruct._NP_RepositoryId, "PickleStruct",
+                      "name", (tcInternal.tv_string, 0),
+                      "state", omniORB.findType("IDL:PickleState:1.0")),
+                     None)
+
+
+class UnregisteredStruct(StructBase):
+    """Corba structure without type descriptor."""
+
+    _NP_RepositoryId = "IDL:UnregisteredStruct:1.0"
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TestPickle(CorbaAssertMixin, unittest.TestCase):
+    """Test `dumps` and `loads` functions."""
+
+    def test_struct(self):
+        value = [PickleStruct('Gazpacho', STATE_OK), (PickleStruct('Salmorejo', STATE_FAILED), )]
+        with patch('pyfco.tests.test_pickling.PickleStruct', None):
+            # Class can't be found by its name
+            with self.assertRaises(pickle.PicklingError):
+                pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            result = loads(dumps(value))
+        self.assertEqual(len(result), 2)
+        self.assertIs(type(result[0]), PickleStruct)
+        self.assertEqual(result[0], PickleStruct('Gazpacho', STATE_OK))
+        self.assertIsInstance(result[1], tuple)
+        self.assertEqual(result[1][0], PickleStruct('Salmorejo', STATE_FAILED))
+
+    def test_enum(self):
+        result = loads(dumps([STATE_OK, STATE_FAILED]))
+        self.assertIs(result[0], STATE_OK)
+        self.assertIs(result[1], STATE_FAILED)
+
+    def test_class(self):
+        value = {PickleStruct: 'value'}
+        with patch('pyfco.tests.test_pickling.PickleStruct', None):
+            result = loads(dumps(value))
+        self.assertEqual(result, value)
+
+    def test_unregistered(self):
+        value = UnregisteredStruct(42)
+        self.assertEqual(loads(dumps(value)), value)
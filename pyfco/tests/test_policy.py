@@ -0,0 +1,300 @@
+#
+# Copyright (C) 2026  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+"""Test `pyfco.policy` module."""
+from __future__ import unicode_literals
+
+import threading
+import unittest
+
+from mock import Mock, call, patch, sentinel
+from omniORB import CORBA
+
+from pyfco.client import CorbaClient
+from pyfco.policy import CallPolicy, CircuitBreaker, CircuitOpenError
+from pyfco.tests.test_client import InternalServerError, SentinelRecoder
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test `CircuitBreaker` class."""
+
+    def setUp(self):
+        patcher = patch('pyfco.policy.default_timer', return_value=100.0)
+        self.addCleanup(patcher.stop)
+        self.timer_mock = patcher.start()
+        self.breaker = CircuitBreaker(threshold=2, reset_timeout=10.0)
+
+    def test_closed(self):
+        self.breaker.check()
+        self.breaker.record(CORBA.TRANSIENT())
+        self.breaker.check()
+        self.assertFalse(self.breaker.is_open)
+
+    def test_open(self):
+        self.breaker.record(CORBA.TRANSIENT())
+        self.breaker.record(CORBA.COMM_FAILURE())
+        self.assertTrue(self.breaker.is_open)
+        with self.assertRaisesRegexp(CircuitOpenError, 'after 2 failures'):
+            self.breaker.check()
+
+    def test_other_errors(self):
+        self.breaker.record(CORBA.TRANSIENT())
+        self.breaker.record(InternalServerError())
+        self.breaker.record(CORBA.TRANSIENT())
+        self.assertFalse(self.breaker.is_open)
+
+    def test_trial_success(self):
+        self.breaker.record(CORBA.TRANSIENT())
+        self.breaker.record(CORBA.TRANSIENT())
+        self.timer_mock.return_value = 110.0
+
+        self.breaker.check()
+        # Only a single trial call is allowed
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.check()
+        self.breaker.record()
+
+        self.assertFalse(self.breaker.is_open)
+        self.breaker.check()
+
+    def test_trial_failure(self):
+        self.breaker.record(CORBA.TRANSIENT())
+        self.breaker.record(CORBA.TRANSIENT())
+        self.timer_mock.return_value = 110.0
+
+        self.breaker.check()
+        self.breaker.record(CORBA.TRANSIENT())
+
+        self.assertTrue(self.breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.check()
+        self.timer_mock.return_value = 120.0
+        self.breaker.check()
+
+    def test_trial_interrupted(self):
+        self.breaker.record(CORBA.TRANSIENT())
+        self.breaker.record(CORBA.TRANSIENT())
+        self.timer_mock.return_value = 110.0
+
+        self.breaker.check()
+        self.breaker.record(KeyboardInterrupt())
+
+        # Circuit stays open, but other trial call is allowed.
+        self.assertTrue(self.breaker.is_open)
+        self.breaker.check()
+
+
+class TestCallPolicy(unittest.TestCase):
+    """Test `CallPolicy` class."""
+
+    def setUp(self):
+        self.corba_object = Mock(spec=['method'])
+        self.corba_object.method.return_value = sentinel.result
+        patcher = patch('pyfco.policy.omniORB.setClientThreadCallTimeout')
+        self.addCleanup(patcher.stop)
+        self.timeout_mock = patcher.start()
+        patcher = patch('pyfco.policy.time.sleep')
+        self.addCleanup(patcher.stop)
+        self.sleep_mock = patcher.start()
+
+    def test_invoke(self):
+        policy = CallPolicy()
+        self.assertEqual(policy.invoke(self.corba_object, 'method', (sentinel.arg, )), sentinel.result)
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg)])
+        self.assertEqual(self.timeout_mock.mock_calls, [])
+
+    def test_timeout(self):
+        policy = CallPolicy(timeout=1.5)
+        policy.invoke(self.corba_object, 'method', ())
+        self.assertEqual(self.timeout_mock.mock_calls, [call(1500), call(0)])
+
+    def test_deadline(self):
+        policy = CallPolicy(timeout=1.5, deadline=1.0)
+        with patch('pyfco.policy.default_timer', side_effect=[100.0, 100.2]):
+            policy.invoke(self.corba_object, 'method', ())
+        self.assertEqual(self.timeout_mock.mock_calls, [call(800), call(0)])
+
+    def test_deadline_passed(self):
+        policy = CallPolicy(deadline=1.0)
+        with patch('pyfco.policy.default_timer', side_effect=[100.0, 102.0]):
+            policy.invoke(self.corba_object, 'method', ())
+        self.assertEqual(self.timeout_mock.mock_calls, [call(1), call(0)])
+
+    def test_retries(self):
+        self.corba_object.method.side_effect = [CORBA.TRANSIENT(), CORBA.TRANSIENT(), sentinel.result]
+        policy = CallPolicy(retries=2, backoff=0.5, jitter=False)
+
+        self.assertEqual(policy.invoke(self.corba_object, 'method', ()), sentinel.result)
+
+        self.assertEqual(self.corba_object.method.call_count, 3)
+        self.assertEqual(self.sleep_mock.mock_calls, [call(0.5), call(1.0)])
+
+    def test_retries_exhausted(self):
+        self.corba_object.method.side_effect = CORBA.TRANSIENT()
+        policy = CallPolicy(retries=2, jitter=False)
+
+        with self.assertRaises(CORBA.TRANSIENT):
+            policy.invoke(self.corba_object, 'method', ())
+
+        self.assertEqual(self.corba_object.method.call_count, 3)
+
+    def test_retries_other_error(self):
+        self.corba_object.method.side_effect = CORBA.COMM_FAILURE()
+        policy = CallPolicy(retries=2)
+
+        with self.assertRaises(CORBA.COMM_FAILURE):
+            policy.invoke(self.corba_object, 'method', ())
+
+        self.assertEqual(self.corba_object.method.call_count, 1)
+
+    def test_retries_deadline(self):
+        self.corba_object.method.side_effect = [CORBA.TRANSIENT(), CORBA.TRANSIENT(), sentinel.result]
+        policy = CallPolicy(deadline=1.0, retries=2, backoff=0.5, jitter=False)
+
+        with patch('pyfco.policy.default_timer', side_effect=[100.0, 100.1, 100.2, 100.6, 100.7]):
+            with self.assertRaises(CORBA.TRANSIENT):
+                policy.invoke(self.corba_object, 'method', ())
+
+        self.assertEqual(self.corba_object.method.call_count, 2)
+        self.assertEqual(self.timeout_mock.mock_calls, [call(900), call(0), call(400), call(0)])
+        self.assertEqual(self.sleep_mock.mock_calls, [call(0.5)])
+
+    def test_get_delay(self):
+        policy = CallPolicy(backoff=1.0, max_backoff=3.0, jitter=False)
+        self.assertEqual([policy.get_delay(i) for i in range(1, 5)], [1.0, 2.0, 3.0, 3.0])
+
+    def test_get_delay_jitter(self):
+        policy = CallPolicy(backoff=1.0)
+        for i in range(100):
+            self.assertTrue(0 <= policy.get_delay(2) <= 2.0)
+
+    def test_breaker(self):
+        self.corba_object.method.side_effect = CORBA.TRANSIENT()
+        policy = CallPolicy(retries=5, breaker=CircuitBreaker(threshold=2))
+
+        with self.assertRaises(CircuitOpenError):
+            policy.invoke(self.corba_object, 'method', ())
+
+        self.assertEqual(self.corba_object.method.call_count, 2)
+
+    def test_breaker_trial_interrupted(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+        breaker.record(CORBA.TRANSIENT())
+        self.corba_object.method.side_effect = KeyboardInterrupt
+        policy = CallPolicy(breaker=breaker)
+
+        with self.assertRaises(KeyboardInterrupt):
+            policy.invoke(self.corba_object, 'method', ())
+
+        self.corba_object.method.side_effect = None
+        self.assertEqual(policy.invoke(self.corba_object, 'method', ()), sentinel.result)
+        self.assertFalse(breaker.is_open)
+
+
+class TestThreadTimeout(unittest.TestCase):
+    """Test restoring of the thread timeouts."""
+
+    def setUp(self):
+        patcher = patch('pyfco.policy.omniORB.setClientThreadCallTimeout')
+        self.addCleanup(patcher.stop)
+        self.timeout_mock = patcher.start()
+
+    def test_nested(self):
+        corba_object = Mock(spec=['method'])
+        inner = CallPolicy(timeout=2)
+        corba_object.method.side_effect = lambda: inner.invoke(Mock(spec=['other']), 'other', ())
+
+        CallPolicy(timeout=1).invoke(corba_object, 'method', ())
+
+        self.assertEqual(self.timeout_mock.mock_calls, [call(1000), call(2000), call(1000), call(0)])
+
+    def test_error(self):
+        corba_object = Mock(spec=['method'])
+        corba_object.method.side_effect = CORBA.COMM_FAILURE()
+
+        with self.assertRaises(CORBA.COMM_FAILURE):
+            CallPolicy(timeout=1).invoke(corba_object, 'method', ())
+
+        self.assertEqual(self.timeout_mock.mock_calls, [call(1000), call(0)])
+
+
+class TestCorbaClientPolicy(unittest.TestCase):
+    """Test `CorbaClient` with policies."""
+
+    def setUp(self):
+        self.corba_object = Mock(spec=['method', 'other'])
+        self.corba_object.method.return_value = sentinel.result
+        self.corba_object.other.return_value = sentinel.other
+        patcher = patch('pyfco.policy.omniORB.setClientThreadCallTimeout')
+        self.addCleanup(patcher.stop)
+        self.timeout_mock = patcher.start()
+
+    def test_no_policy(self):
+        client = CorbaClient(self.corba_object, SentinelRecoder(), InternalServerError)
+        self.assertEqual(client.method(), sentinel.result)
+        self.assertEqual(self.timeout_mock.mock_calls, [])
+
+    def test_policy(self):
+        client = CorbaClient(self.corba_object, SentinelRecoder(), InternalServerError, policy=CallPolicy(timeout=1),
+                             method_policies={'other': CallPolicy(timeout=2)})
+
+        self.assertEqual(client.method(sentinel.arg), sentinel.result)
+        self.assertEqual(client.other(), sentinel.other)
+
+        self.assertEqual(self.corba_object.mock_calls, [call.method(sentinel.arg), call.other()])
+        self.assertEqual(self.timeout_mock.mock_calls, [call(1000), call(0), call(2000), call(0)])
+
+    def test_policy_threads(self):
+        # Timeouts of the current threads
+        timeouts = {}
+        self.timeout_mock.side_effect = lambda timeout: timeouts.__setitem__(threading.current_thread(), timeout)
+        method_started = threading.Event()
+        other_started = threading.Event()
+
+        def method():
+            method_started.set()
+            other_started.wait()
+            return timeouts[threading.current_thread()]
+
+        def other():
+            other_started.set()
+            method_started.wait()
+            return timeouts[threading.current_thread()]
+
+        self.corba_object.method.side_effect = method
+        self.corba_object.other.side_effect = other
+        client = CorbaClient(self.corba_object, SentinelRecoder(), InternalServerError,
+                             method_policies={'method': CallPolicy(timeout=1), 'other': CallPolicy(timeout=2)})
+        results = {}
+        threads = [threading.Thread(target=lambda name=name: results.__setitem__(name, getattr(client, name)()))
+                   for name in ('method', 'other')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {'method': 1000, 'other': 2000})
+        self.assertEqual(sorted(timeouts.values()), [0, 0])
+
+    def test_method_policy(self):
+        client = CorbaClient(self.corba_object, SentinelRecoder(), InternalServerError,
+                             method_policies={'other': CallPolicy(timeout=2)})
+
+        self.assertEqual(client.method(), sentinel.result)
+        self.assertEqual(client.other(), sentinel.other)
+
+        self.assertEqual(self.timeout_mock.mock_calls, [call(2000), call(0)])
@@ -18,16 +18,20 @@
 from __future__ import unicode_literals
 
 import copy
+import gc
+import threading
 import unittest
 from datetime import date, datetime
 
+import omniORB
 import pytz
 import six
 from fred_idl.Registry import IsoDate, IsoDateTime
-from omniORB import EnumItem, StructBase
+from omniORB import EnumItem, StructBase, tcInternal
 
-from pyfco.recoder import CorbaRecoder, UnsupportedEncodingError, decode_iso_date, decode_iso_datetime, \
-    encode_iso_date, encode_iso_datetime
+from pyfco.recoder import CorbaRecoder, IterativeCorbaRecoder, LazySequence, MemoizedDecoder, \
+    UnsupportedEncodingError, decode_iso_date, decode_iso_datetime, encode_iso_date, encode_iso_datetime, \
+    get_struct_fields
 from pyfco.utils import CorbaAssertMixin
 
 TEST_ENUM_ITEM = EnumItem("MyEnumItem", 42)
@@ -39,6 +43,14 @@ class TestIsoDate(CorbaAssertMixin, unittest.TestCase):
     def test_decode(self):
         self.assertEqual(decode_iso_date(IsoDate('1970-02-01')), date(1970, 2, 1))
 
+    def test_decode_short(self):
+        self.assertEqual(decode_iso_date(IsoDate('1970-2-1')), date(1970, 2, 1))
+
+    def test_decode_invalid(self):
+        self.assertRaises(ValueError, decode_iso_date, IsoDate('1970-02-31'))
+        self.assertRaises(ValueError, decode_iso_date, IsoDate('1970-0A-01'))
+        self.assertRaises(ValueError, decode_iso_date, IsoDate('1970-02-01T12:14:16Z'))
+
     def test_encode(self):
         self.assertEqual(encode_iso_date(date(1970, 2, 1)), IsoDate('1970-02-01'))
 
@@ -87,8 +99,20 @@ class TestIsoDateTime(CorbaAssertMixin, unittest.TestCase):
         self.assertEqual(decode_iso_datetime(IsoDate('1970-02-01T12:14:16.000123+0200')),
                          datetime(1970, 2, 1, 12, 14, 16, 123, tzinfo=pytz.FixedOffset(120)))
 
+    def test_decode_separator(self):
+        self.assertEqual(decode_iso_datetime(IsoDate('1970-02-01T12:14:16,123456Z')),
+                         datetime(1970, 2, 1, 12, 14, 16, 123456, tzinfo=pytz.utc))
+
+    def test_decode_tzinfo_shared(self):
+        first = decode_iso_datetime(IsoDate('1970-02-01T12:14:16+0100'))
+        second = decode_iso_datetime(IsoDate('1970-02-02T12:14:16+0100'))
+        self.assertIs(first.tzinfo, second.tzinfo)
+
     def test_decode_invalid(self):
         self.assertRaises(ValueError, decode_iso_datetime, IsoDateTime('1970-02-31T04:06:08Z'))
+        self.assertRaises(ValueError, decode_iso_datetime, IsoDateTime('1970-02-03T04:06:08+01'))
+        self.assertRaises(ValueError, decode_iso_datetime, IsoDateTime('1970-02-03T04:06:08.123456'))
+        self.assertRaises(ValueError, decode_iso_datetime, IsoDateTime('1970-02-03 04:06:08Z'))
         self.assertRaises(ValueError, decode_iso_datetime, IsoDateTime('1970-02-03T04:06:08.666Z'))
         # Datetime without a zone
         self.assertRaises(ValueError, decode_iso_datetime, IsoDateTime('1970-02-03T04:06:08'))
@@ -148,6 +172,232 @@ class NodeStruct(StructBase):
         self.inner = inner
 
 
+class VarArgsStruct(StructBase):
+    """Corba structure without known fields."""
+
+    def __init__(self, *args):
+        for i, arg in enumerate(args):
+            setattr(self, 'field{}'.format(i), arg)
+
+
+class RenamedStruct(StructBase):
+    """Corba structure which stores constructor arguments under other names."""
+
+    def __init__(self, a, b):
+        self.x = a
+        self.y = b
+
+
+class SchemaStruct(StructBase):
+    """Corba structure with registered type descriptor."""
+
+    _NP_RepositoryId = "IDL:SchemaStruct:1.0"
+
+    def __init__(self, name, numbers, created, children):
+        self.name = name
+        self.numbers = numbers
+        self.created = created
+        self.children = children
+
+
+omniORB.registerType(SchemaStruct._NP_RepositoryId,
+                     (tcInternal.tv_struct, SchemaStruct, SchemaStruct._NP_RepositoryId, "SchemaStruct",
+                      "name", (tcInternal.tv_string, 0),
+                      "numbers", (tcInternal.tv_sequence, tcInternal.tv_long, 0),
+                      "created", omniORB.findType(IsoDateTime._NP_RepositoryId),
+                      "children",
+                      (tcInternal.tv_sequence, (tcInternal.tv__indirect, [SchemaStruct._NP_RepositoryId]), 0)),
+                     None)
+
+
+class AnyStruct(StructBase):
+    """Corba structure with any field."""
+
+    _NP_RepositoryId = "IDL:AnyStruct:1.0"
+
+    def __init__(self, value, data):
+        self.value = value
+        self.data = data
+
+
+omniORB.registerType(AnyStruct._NP_RepositoryId,
+                     (tcInternal.tv_struct, AnyStruct, AnyStruct._NP_RepositoryId, "AnyStruct",
+                      "value", tcInternal.tv_any,
+                      "data", (tcInternal.tv_sequence, tcInternal.tv_octet, 0)),
+                     None)
+
+
+class TestMemoizedDecoder(unittest.TestCase):
+    """Test `MemoizedDecoder` class."""
+
+    def test_memo(self):
+        decoder = MemoizedDecoder(decode_iso_date)
+
+        first = decoder(IsoDate('1970-02-01'))
+        second = decoder(IsoDate('1970-02-01'))
+        other = decoder(IsoDate('1970-02-02'))
+
+        self.assertEqual(first, date(1970, 2, 1))
+        self.assertIs(second, first)
+        self.assertEqual(other, date(1970, 2, 2))
+        self.assertEqual((decoder.hits, decoder.misses), (1, 2))
+
+    def test_maxsize(self):
+        decoder = MemoizedDecoder(decode_iso_date, maxsize=2)
+        first = decoder(IsoDate('1970-02-01'))
+        decoder(IsoDate('1970-02-02'))
+        # Use the first value, so the second is the least recently used.
+        decoder(IsoDate('1970-02-01'))
+        decoder(IsoDate('1970-02-03'))
+
+        self.assertIs(decoder(IsoDate('1970-02-01')), first)
+        decoder(IsoDate('1970-02-02'))
+        self.assertEqual((decoder.hits, decoder.misses), (2, 4))
+
+    def test_invalid(self):
+        decoder = MemoizedDecoder(decode_iso_date)
+        self.assertRaises(ValueError, decoder, IsoDate('invalid'))
+        self.assertRaises(ValueError, decoder, IsoDate('invalid'))
+        self.assertEqual((decoder.hits, decoder.misses), (0, 0))
+
+    def test_clear(self):
+        decoder = MemoizedDecoder(decode_iso_date)
+        first = decoder(IsoDate('1970-02-01'))
+        decoder(IsoDate('1970-02-01'))
+
+        decoder.clear()
+
+        self.assertEqual((decoder.hits, decoder.misses), (0, 0))
+        self.assertIsNot(decoder(IsoDate('1970-02-01')), first)
+        self.assertEqual((decoder.hits, decoder.misses), (0, 1))
+
+
+class TestLazySequence(unittest.TestCase):
+    """Test `LazySequence` class."""
+
+    def setUp(self):
+        self.decoded = []
+
+    def decode(self, value):
+        self.decoded.append(value)
+        return value * 2
+
+    def test_len(self):
+        sequence = LazySequence([1, 2, 3], self.decode)
+        self.assertEqual(len(sequence), 3)
+        self.assertEqual(self.decoded, [])
+
+    def test_getitem(self):
+        sequence = LazySequence([1, 2, 3], self.decode)
+        self.assertEqual(sequence[1], 4)
+        self.assertEqual(sequence[-1], 6)
+        self.assertEqual(sequence[1], 4)
+        self.assertEqual(self.decoded, [2, 3])
+        with self.assertRaises(IndexError):
+            sequence[3]
+
+    def test_slice(self):
+        sequence = LazySequence([1, 2, 3, 4], self.decode)
+        self.assertEqual(sequence[:2], [2, 4])
+        self.assertEqual(sequence[::-2], [8, 4])
+        self.assertEqual(self.decoded, [1, 2, 4])
+
+    def test_iter(self):
+        sequence = LazySequence((1, 2, 3), self.decode)
+        self.assertEqual(next(iter(sequence)), 2)
+        self.assertEqual(self.decoded, [1])
+        self.assertEqual(list(sequence), [2, 4, 6])
+        self.assertEqual(self.decoded, [1, 2, 3])
+
+    def test_release(self):
+        sequence = LazySequence([1, 2], self.decode)
+        sequence[0]
+        self.assertIsNotNone(sequence._raw)
+        sequence[1]
+        self.assertIsNone(sequence._raw)
+        self.assertEqual(list(sequence), [2, 4])
+
+    def test_concurrent(self):
+        entered = []
+        both_entered = threading.Event()
+
+        def decode(value):
+            entered.append(value)
+            if len(entered) == 2:
+                both_entered.set()
+            both_entered.wait()
+            return [value]
+        sequence = LazySequence([1, 2], decode)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(sequence[0])) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(entered, [1, 1])
+        self.assertIs(results[0], results[1])
+        self.assertEqual(sequence._missing, 1)
+        self.assertIsNotNone(sequence._raw)
+        self.assertEqual(sequence[1], [2])
+        self.assertIsNone(sequence._raw)
+
+    def test_eq(self):
+        sequence = LazySequence([1, 2], self.decode)
+        self.assertEqual(sequence, [2, 4])
+        self.assertEqual(sequence, (2, 4))
+        self.assertEqual(sequence, LazySequence([1, 2], self.decode))
+        self.assertNotEqual(sequence, [2])
+        self.assertNotEqual(sequence, 'other')
+
+    def test_repr(self):
+        sequence = LazySequence([1, 2], self.decode)
+        sequence[0]
+        self.assertEqual(repr(sequence), '<LazySequence of 2 items, 1 decoded>')
+
+
+class TestCorbaRecoderIsoDates(CorbaAssertMixin, unittest.TestCase):
+    """Test `CorbaRecoder` with `iso_dates` set."""
+
+    def test_decode(self):
+        rec = CorbaRecoder('utf-8', iso_dates=True)
+        self.assertEqual(rec.decode([IsoDate('1970-02-01'), IsoDateTime('1970-02-01T12:14:16Z')]),
+                         [date(1970, 2, 1), datetime(1970, 2, 1, 12, 14, 16, tzinfo=pytz.utc)])
+
+    def test_decode_memo(self):
+        rec = CorbaRecoder('utf-8', iso_dates=True, iso_dates_memo=16)
+
+        result = rec.decode([IsoDate('1970-02-01'), IsoDateTime('1970-02-01T12:14:16Z')] * 3)
+
+        self.assertEqual(result, [date(1970, 2, 1), datetime(1970, 2, 1, 12, 14, 16, tzinfo=pytz.utc)] * 3)
+        self.assertEqual((rec.memos[IsoDate].hits, rec.memos[IsoDate].misses), (2, 1))
+        self.assertEqual((rec.memos[IsoDateTime].hits, rec.memos[IsoDateTime].misses), (2, 1))
+
+    def test_no_memo(self):
+        self.assertEqual(CorbaRecoder('utf-8', iso_dates=True).memos, {})
+
+    def test_encode(self):
+        rec = CorbaRecoder('utf-8', iso_dates=True)
+        self.assertEqual(rec.encode(date(1970, 2, 1)), IsoDate('1970-02-01'))
+        self.assertEqual(rec.encode(datetime(1970, 2, 1, 12, 14, 16, tzinfo=pytz.utc)),
+                         IsoDateTime('1970-02-01T12:14:16+00:00'))
+        self.assertEqual(rec.encode(IsoDate('1970-02-01')), IsoDate('1970-02-01'))
+
+
+class TestGetStructFields(unittest.TestCase):
+    """Test `get_struct_fields` function."""
+
+    def test_registered(self):
+        self.assertEqual(get_struct_fields(IsoDate), ('value', ))
+
+    def test_init(self):
+        self.assertEqual(get_struct_fields(NodeStruct), ('text', 'inner'))
+
+    def test_unknown(self):
+        self.assertIsNone(get_struct_fields(VarArgsStruct))
+        self.assertIsNone(get_struct_fields(StructBase))
+
+
 class TestCorbaRecoder(unittest.TestCase):
 
     recoder_class = CorbaRecoder
@@ -593,6 +843,50 @@ class TestCorbaRecoder(unittest.TestCase):
         self.assertEqual(obj.inner.inner.text, 'C')
         self.assertIsNone(obj.inner.inner.inner)
 
+    def test_decode_struct_extra_attribute(self):
+        rec = self.recoder_class("utf-8")
+        obj = NodeStruct('A', None)
+        obj.extra = 'B'
+
+        output = rec.decode(obj)
+
+        self.assertEqual(output.__dict__, {'text': 'A', 'inner': None, 'extra': 'B'})
+
+    def test_encode_struct_extra_attribute(self):
+        rec = self.recoder_class("utf-8")
+        obj = NodeStruct('A', None)
+        obj.extra = 'B'
+
+        output = rec.encode(obj)
+
+        self.assertEqual(output.__dict__, {'text': 'A', 'inner': None, 'extra': 'B'})
+
+    def test_decode_struct_renamed_fields(self):
+        rec = self.recoder_class("utf-8")
+
+        output = rec.decode(RenamedStruct(b'1', [b'2']))
+
+        self.assertIsInstance(output, RenamedStruct)
+        self.assertEqual(output.__dict__, {'x': '1', 'y': ['2']} if six.PY2 else {'x': b'1', 'y': [b'2']})
+
+    def test_encode_struct_renamed_fields(self):
+        rec = self.recoder_class("utf-8")
+
+        output = rec.encode(RenamedStruct('1', ['2']))
+
+        self.assertIsInstance(output, RenamedStruct)
+        self.assertEqual(output.__dict__, {'x': b'1', 'y': [b'2']} if six.PY2 else {'x': '1', 'y': ['2']})
+
+    def test_decode_struct_unknown_fields(self):
+        rec = self.recoder_class("utf-8")
+        obj = VarArgsStruct('A', [])
+
+        output = rec.decode(obj)
+
+        self.assertIsInstance(output, VarArgsStruct)
+        self.assertIsNot(output, obj)
+        self.assertEqual(output.__dict__, {'field0': 'A', 'field1': []})
+
     def test_decode_other(self):
         """ Decoding object raise error """
         rec = self.recoder_class("utf-8")
@@ -605,6 +899,209 @@ class TestCorbaRecoder(unittest.TestCase):
         reg = object()
         self.assertRaises(ValueError, rec.encode, reg)
 
+    def test_decode_struct_grandchild(self):
+        # Whole MRO is used to find the recode function.
+        class ChildStruct(NodeStruct):
+            """Subclass of a corba structure."""
+
+        rec = self.recoder_class("utf-8")
+        obj = ChildStruct('A', None)
+
+        output = rec.decode(obj)
+
+        self.assertIsInstance(output, ChildStruct)
+        self.assertEqual(output.text, 'A')
+        self.assertIsNone(output.inner)
+
+    def test_add_recode_function_resolved(self):
+        rec = self.recoder_class("utf-8")
+        obj = object()
+        self.assertRaises(ValueError, rec.decode, obj)
+        self.assertRaises(ValueError, rec.encode, obj)
+
+        rec.add_recode_function(object, lambda val: 'decoded', lambda val: 'encoded')
+
+        self.assertEqual(rec.decode(obj), 'decoded')
+        self.assertEqual(rec.encode(obj), 'encoded')
+
+    def test_decode_lazy(self):
+        rec = self.recoder_class("utf-8")
+        obj = [NodeStruct(b'A', None), NodeStruct(b'B', None)]
+
+        output = rec.decode_lazy(obj)
+
+        self.assertIsInstance(output, LazySequence)
+        self.assertEqual(output[1].text, 'B' if six.PY2 else b'B')
+        self.assertIsInstance(output[1], NodeStruct)
+        self.assertIsNot(output[1], obj[1])
+
+    def test_decode_lazy_other(self):
+        rec = self.recoder_class("utf-8")
+        output = rec.decode_lazy(NodeStruct(b'A', [b'B']))
+        self.assertIsInstance(output, NodeStruct)
+        self.assertEqual(output.inner, ['B'] if six.PY2 else [b'B'])
+        self.assertIsInstance(output.inner, list)
+
+    def test_profile(self):
+        rec = self.recoder_class("utf-8")
+        obj = NodeStruct(b'A', [NodeStruct(b'B', None), SchemaStruct(b'C', [], None, [])])
+
+        profile = rec.start_profile()
+        self.assertIs(rec.profile, profile)
+        rec.decode(obj)
+        rec.encode(obj)
+        self.assertIs(rec.stop_profile(), profile)
+        self.assertIsNone(rec.profile)
+        rec.decode(obj)
+
+        stats = {(s.operation, s.type): s[2:] for s in profile.get_stats()}
+        self.assertEqual(sorted(stats), [
+            ('decode', 'IDL:SchemaStruct:1.0'), ('decode', 'NodeStruct'), ('decode', 'NoneType'),
+            ('decode', 'bytes' if six.PY3 else 'str'), ('decode', 'list'),
+            ('encode', 'IDL:SchemaStruct:1.0'), ('encode', 'NodeStruct'), ('encode', 'NoneType'),
+            ('encode', 'bytes' if six.PY3 else 'str'), ('encode', 'list')])
+        count, time, own_time, max_depth = stats[('decode', 'NodeStruct')]
+        self.assertEqual((count, max_depth), (2, 3))
+        self.assertGreaterEqual(time, own_time)
+        self.assertEqual(stats[('decode', 'list')][0], 3)
+        self.assertEqual(stats[('decode', 'list')][3], 4)
+        self.assertEqual(stats[('decode', 'NoneType')][0], 2)
+        self.assertEqual(stats[('decode', 'NoneType')][3], 4)
+        self.assertEqual(stats[('decode', 'IDL:SchemaStruct:1.0')][0], 1)
+        self.assertIsNotNone(profile.stopped)
+
+    def test_profile_report(self):
+        rec = self.recoder_class("utf-8")
+        profile = rec.start_profile()
+        rec.decode([None])
+
+        report = profile.report().splitlines()
+
+        self.assertRegexpMatches(report[0], r'^Recoder profile of \d+\.\d{6} seconds$')
+        self.assertEqual(report[1].split(), ['operation', 'type', 'count', 'time', 'own', 'time', 'max', 'depth'])
+        self.assertEqual(sorted(line.split()[:3] + line.split()[5:] for line in report[2:]),
+                         [['decode', 'NoneType', '1', '2'], ['decode', 'list', '1', '1']])
+
+    def test_profile_decode_lazy(self):
+        rec = self.recoder_class("utf-8")
+        rec.start_profile()
+        self.assertIsInstance(rec.decode_lazy([None]), LazySequence)
+
+    def test_stop_profile_not_started(self):
+        self.assertIsNone(self.recoder_class("utf-8").stop_profile())
+
+    def test_provenance_unchanged(self):
+        rec = self.recoder_class("utf-8", provenance=True)
+        raw = NodeStruct(b'A', [NodeStruct(b'B', None), b'C'])
+
+        decoded = rec.decode(raw)
+
+        self.assertIsNot(decoded, raw)
+        self.assertIs(rec.encode(decoded), raw)
+        self.assertIs(rec.encode(decoded.inner[0]), raw.inner[0])
+
+        # Field replaced by an equal value
+        decoded.text = bytes(bytearray(b'A'))
+        self.assertIs(rec.encode(decoded), raw)
+
+    def test_provenance_changed(self):
+        rec = self.recoder_class("utf-8", provenance=True)
+        raw = NodeStruct(b'A', [NodeStruct(b'B', None), NodeStruct(b'C', None)])
+        decoded = rec.decode(raw)
+
+        decoded.inner[1].text = b'D'
+        encoded = rec.encode(decoded)
+
+        self.assertIsNot(encoded, raw)
+        self.assertIs(encoded.text, raw.text)
+        self.assertIsNot(encoded.inner, raw.inner)
+        self.assertIs(encoded.inner[0], raw.inner[0])
+        self.assertEqual(encoded.inner[1].text, b'D')
+        self.assertIs(encoded.inner[1].inner, raw.inner[1].inner)
+        # Raw structures are unchanged
+        self.assertEqual(raw.inner[1].text, b'C')
+
+    def test_provenance_changed_list(self):
+        rec = self.recoder_class("utf-8", provenance=True)
+        raw = NodeStruct(b'A', [b'B'])
+        decoded = rec.decode(raw)
+
+        decoded.inner.append(b'C')
+        encoded = rec.encode(decoded)
+
+        self.assertIsNot(encoded, raw)
+        self.assertEqual(encoded.inner, [b'B', b'C'])
+        self.assertEqual(raw.inner, [b'B'])
+
+    def test_provenance_replaced_field(self):
+        rec = self.recoder_class("utf-8", provenance=True)
+        raw = NodeStruct(b'A', None)
+        decoded = rec.decode(raw)
+
+        decoded.text = b'B'
+        encoded = rec.encode(decoded)
+
+        self.assertIsInstance(encoded, NodeStruct)
+        self.assertEqual(encoded.text, b'B')
+        self.assertIsNone(encoded.inner)
+        self.assertEqual(raw.text, b'A')
+
+    def test_provenance_extra_field(self):
+        rec = self.recoder_class("utf-8", provenance=True)
+        raw = NodeStruct(b'A', None)
+        decoded = rec.decode(raw)
+
+        decoded.extra = b'B'
+        encoded = rec.encode(decoded)
+
+        self.assertIsNot(encoded, raw)
+        self.assertEqual(encoded.extra, b'B')
+
+    def test_provenance_released(self):
+        rec = self.recoder_class("utf-8", provenance=True)
+        decoded = rec.decode([NodeStruct(b'A', None), NodeStruct(b'B', None)])
+        self.assertEqual(len(rec._provenance), 2)
+        del decoded
+        gc.collect()
+        self.assertEqual(len(rec._provenance), 0)
+
+    def test_provenance_disabled(self):
+        rec = self.recoder_class("utf-8")
+        raw = NodeStruct(b'A', None)
+        self.assertIsNot(rec.encode(rec.decode(raw)), raw)
+
+    def test_decode_in_place(self):
+        rec = self.recoder_class("utf-8", iso_dates=True)
+        inner = [IsoDate('1970-02-01'), b'B']
+        raw = NodeStruct(IsoDate('1970-02-02'), [NodeStruct(b'A', inner), (IsoDate('1970-02-03'), )])
+
+        decoded = rec.decode_in_place(raw)
+
+        self.assertIs(decoded, raw)
+        self.assertEqual(decoded.text, date(1970, 2, 2))
+        self.assertIs(decoded.inner[0].inner, inner)
+        self.assertEqual(inner, [date(1970, 2, 1), b'B' if six.PY3 else 'B'])
+        self.assertEqual(decoded.inner[1], (date(1970, 2, 3), ))
+
+    def test_decode_in_place_value(self):
+        rec = self.recoder_class("utf-8", iso_dates=True)
+        self.assertEqual(rec.decode_in_place(IsoDate('1970-02-01')), date(1970, 2, 1))
+        self.assertEqual(rec.decode_in_place((IsoDate('1970-02-01'), )), (date(1970, 2, 1), ))
+
+    def test_decode_in_place_deep(self):
+        rec = self.recoder_class('utf-8', iso_dates=True)
+        raw = None
+        for i in range(10000):
+            raw = NodeStruct(IsoDate('1970-02-01'), [raw])
+
+        output = rec.decode_in_place(raw)
+
+        self.assertIs(output, raw)
+        for i in range(10000):
+            self.assertEqual(output.text, date(1970, 2, 1))
+            output = output.inner[0]
+        self.assertIsNone(output)
+
     def test_sanity_dec_enc(self):
         """ encode(decode(obj)) is equal to obj. """
         rec = self.recoder_class("utf-8")
@@ -650,3 +1147,118 @@ class TestCorbaRecoder(unittest.TestCase):
         self.assertEqual(type(res.__dict__['street1']), type(expected.__dict__['street1']))
         self.assertEqual(type(res.__dict__['vat']), type(expected.__dict__['vat']))
         self.assertEqual(type(res.__dict__['access']), type(expected.__dict__['access']))
+
+
+@unittest.skipUnless(six.PY3, "This tests requires python 3 only")  # pragma: no cover
+class TestCorbaRecoderSkipIdentity(unittest.TestCase):
+    """Test `CorbaRecoder` with `skip_identity` set."""
+
+    recoder_class = CorbaRecoder
+
+    def setUp(self):
+        self.struct = SchemaStruct('A', [1, 2], IsoDateTime('1970-02-01T12:14:16Z'),
+                                   [SchemaStruct('B', [], IsoDateTime('1970-02-01T12:14:17Z'), [])])
+
+    def test_decode_skipped(self):
+        rec = self.recoder_class('utf-8', skip_identity=True)
+        self.assertIs(rec.decode(self.struct), self.struct)
+
+    def test_decode_skipped_profile(self):
+        rec = self.recoder_class('utf-8', skip_identity=True)
+        profile = rec.start_profile()
+
+        self.assertIs(rec.decode(self.struct), self.struct)
+
+        self.assertEqual([(s.operation, s.type) for s in profile.get_stats()], [('decode', 'IDL:SchemaStruct:1.0')])
+
+    def test_decode_copy_skipped(self):
+        rec = self.recoder_class('utf-8', skip_identity=True, copy_skipped=True)
+
+        output = rec.decode(self.struct)
+
+        self.assertIsNot(output, self.struct)
+        self.assertEqual(output.__dict__, self.struct.__dict__)
+        self.assertIs(output.numbers, self.struct.numbers)
+
+    def test_decode_partial(self):
+        rec = self.recoder_class('utf-8', skip_identity=True)
+        self.assertIs(rec.decode(self.struct), self.struct)
+        rec.add_recode_function(IsoDateTime, decode_iso_datetime, encode_iso_datetime)
+
+        output = rec.decode(self.struct)
+
+        self.assertEqual(output.name, 'A')
+        self.assertIs(output.numbers, self.struct.numbers)
+        self.assertEqual(output.created, datetime(1970, 2, 1, 12, 14, 16, tzinfo=pytz.utc))
+        self.assertEqual(output.children[0].created, datetime(1970, 2, 1, 12, 14, 17, tzinfo=pytz.utc))
+        self.assertIs(output.children[0].numbers, self.struct.children[0].numbers)
+        # Original is not changed
+        self.assertIsInstance(self.struct.created, IsoDateTime)
+
+    def test_decode_custom_list(self):
+        rec = self.recoder_class('utf-8', skip_identity=True)
+        rec.add_recode_function(list, tuple, list)
+
+        output = rec.decode(self.struct)
+
+        self.assertEqual(output.numbers, (1, 2))
+
+    def test_decode_any(self):
+        rec = self.recoder_class('utf-8', skip_identity=True)
+        struct = AnyStruct('value', b'data')
+
+        output = rec.decode(struct)
+
+        self.assertIsNot(output, struct)
+        self.assertEqual(output.__dict__, struct.__dict__)
+
+    def test_decode_unregistered(self):
+        rec = self.recoder_class('utf-8', skip_identity=True)
+        struct = NodeStruct('A', None)
+
+        output = rec.decode(struct)
+
+        self.assertIsNot(output, struct)
+        self.assertEqual(output.__dict__, struct.__dict__)
+
+
+class TestIterativeCorbaRecoder(TestCorbaRecoder):
+    """Test `IterativeCorbaRecoder` class."""
+
+    recoder_class = IterativeCorbaRecoder
+
+    def test_decode_deep(self):
+        rec = self.recoder_class('utf-8')
+        obj = None
+        for i in range(10000):
+            obj = NodeStruct(b'A', [obj])
+
+        output = rec.decode(obj)
+
+        for i in range(10000):
+            self.assertIsInstance(output, NodeStruct)
+            self.assertIsInstance(output.text, six.text_type if six.PY2 else six.binary_type)
+            output = output.inner[0]
+        self.assertIsNone(output)
+
+    def test_encode_deep(self):
+        rec = self.recoder_class('utf-8')
+        obj = None
+        for i in range(10000):
+            obj = NodeStruct('A', (obj, ))
+
+        output = rec.encode(obj)
+
+        for i in range(10000):
+            self.assertIsInstance(output, NodeStruct)
+            self.assertIsInstance(output.text, six.binary_type if six.PY2 else six.text_type)
+            self.assertIsInstance(output.inner, tuple)
+            output = output.inner[0]
+        self.assertIsNone(output)
+
+
+@unittest.skipUnless(six.PY3, "This tests requires python 3 only")  # pragma: no cover
+class TestIterativeCorbaRecoderSkipIdentity(TestCorbaRecoderSkipIdentity):
+    """Test `IterativeCorbaRecoder` with `skip_identity` set."""
+
+    recoder_class = IterativeCorbaRecoder